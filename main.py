@@ -5,12 +5,17 @@ import random
 import asyncio
 import json
 import re
+import contextlib
+import copy
+import itertools
+import heapq
+from collections import deque
+from typing import Optional
 from datetime import datetime, timedelta
 from keep_alive import keep_alive 
 
 # Load environment variables
 
-keep_alive()
 TOKEN = os.getenv("TOKEN")
 
 intents = discord.Intents.default()
@@ -20,15 +25,25 @@ intents.members = True
 bot = commands.Bot(command_prefix="!", intents=intents)
 
 class Tournament:
-    def __init__(self):
+    def __init__(self, tournament_id=None, guild_id=None):
+        self.id = tournament_id
+        self.guild_id = guild_id
+        self.channel_ids = set()  # Channels whose commands default to this tournament
+        self.lock = asyncio.Lock()  # Serializes state changes, see tournament_lock
         self.players = []
         self.max_players = 0
+        self.waitlist = deque()  # Entrants waiting for a spot in registration order: players in 1v1, [player1, player2] in 2v2
+        self.waitlist_ids = set()  # User IDs of everyone on the waitlist
+        self.checkin_deadline = None  # When check-in closes, None if there is no check-in phase
+        self.checked_in = set()  # User IDs that checked in
         self.active = False
         self.channel = None
         self.target_channel = None
         self.message = None
         self.rounds = []
         self.results = []
+        self.match_winners = {}  # {match_index: winner} for the current round
+        self.match_log = []  # (round_num, winner, loser) of every recorded match, archived when the tournament ends
         self.eliminated = []
         self.fake_count = 1
         self.map = ""
@@ -36,21 +51,241 @@ class Tournament:
         self.prize = ""
         self.title = ""
         self.mode = "1v1"  # Can be "1v1" or "2v2"
+        self.format = "single"  # Can be "single", "seeded", "double", "swiss" or "groups"
+        self.format_options = {}  # Extra bracket engine settings, like group count for "groups"
+        self.bracket = None  # Bracket engine for formats other than single elimination
+        self.round_matches = []  # Bracket engine matches of the current round
+        self.round_messages = []  # Messages of the current round when it needs more than one embed
+        self.hoster_scheduler = None  # HosterScheduler of the current round
+        self.solo_queue = None  # "sp" or "rating": 2v2 players without a team are teamed up by it at start
+        self.solo_ids = set()  # User IDs registered through the solo queue
+        self.forfeit_minutes = MATCH_DEADLINE_MINUTES  # Minutes players get to confirm after a room code, 0 = no forfeits
+        self.match_deadlines = {}  # {(round_num, match_index): datetime the match forfeits at}
+        self.match_presence = {}  # {(round_num, match_index): user IDs that confirmed they are present}
+        self.events = []  # Append-only log of state changes since the start, an event's seq is its index
+        self.snapshots = []  # (event seq, state) checkpoints the event log is replayed from
+        self.sp_rewards = list(DEFAULT_SP_REWARDS)  # SP awarded by final placement, 1st place first
+
+def create_tournament(guild_id, channel):
+    """Create a new tournament in a guild, bound to its registration channel"""
+    tournament_id = str(next(tournament_ids))
+    tournament = Tournament(tournament_id, guild_id)
+    tournaments[tournament_id] = tournament
+    guild_tournaments.setdefault(guild_id, {})[tournament_id] = tournament
+    bind_tournament_channel(tournament, channel)
+    return tournament
+
+def bind_tournament_channel(tournament, channel):
+    """Make commands used in a channel default to this tournament"""
+    tournament.channel_ids.add(channel.id)
+    channel_tournaments[channel.id] = tournament.id
+
+def get_tournament(guild_id, channel_id=None, tournament_id=None):
+    """Get a guild's tournament by ID, by the channel it runs in, or the only one in the guild"""
+    if tournament_id:
+        tournament = tournaments.get(str(tournament_id))
+        return tournament if tournament and tournament.guild_id == guild_id else None
+
+    if channel_id in channel_tournaments:
+        tournament = tournaments.get(channel_tournaments[channel_id])
+        if tournament and tournament.guild_id == guild_id:
+            return tournament
+
+    guild_list = guild_tournaments.get(guild_id, {})
+    if len(guild_list) == 1:
+        return next(iter(guild_list.values()))
+    return None
+
+def get_guild_tournaments(guild_id):
+    """Get all tournaments of a guild"""
+    return list(guild_tournaments.get(guild_id, {}).values())
+
+def tournament_not_found(guild_id):
+    """Error message for when a command can't tell which tournament it is for"""
+    if len(guild_tournaments.get(guild_id, {})) > 1:
+        return "❌ Several tournaments are running. Add the tournament ID (see `!tournaments`)."
+    return "❌ No tournament has been created yet. Use `!create #channel` first."
+
+def remove_tournament(tournament):
+    """Remove a finished or cancelled tournament and reset its state"""
+    tournaments.pop(tournament.id, None)
+    guild_tournaments.get(tournament.guild_id, {}).pop(tournament.id, None)
+    for channel_id in tournament.channel_ids:
+        if channel_tournaments.get(channel_id) == tournament.id:
+            del channel_tournaments[channel_id]
+    tournament.__init__(tournament.id, tournament.guild_id)
+
+LOCK_WAIT_WARNING = 2.0  # Seconds of waiting for a tournament lock before it gets logged
+
+@contextlib.asynccontextmanager
+async def tournament_lock(tournament, action):
+    """Serialize a state change of a tournament and record how long it waited for the lock.
+
+    Commands and buttons that check and then change tournament state across awaits
+    (register, start, winner, ...) hold this so concurrent clicks can't interleave.
+    """
+    lock = tournament.lock
+    contended = lock.locked()
+    loop = asyncio.get_running_loop()
+    requested = loop.time()
+    async with lock:
+        record_lock_wait(tournament, action, loop.time() - requested, contended)
+        yield
+
+def record_lock_wait(tournament, action, waited, contended):
+    """Add one lock acquisition to the guild's lock-wait metrics"""
+    stats = lock_wait_stats.setdefault(tournament.guild_id, {}).setdefault(
+        action, {'count': 0, 'contended': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+    )
+    stats['count'] += 1
+    if contended:
+        stats['contended'] += 1
+    stats['total_wait'] += waited
+    stats['max_wait'] = max(stats['max_wait'], waited)
+
+    if waited >= LOCK_WAIT_WARNING:
+        print(f"Tournament {tournament.id}: {action} waited {waited:.2f}s for the tournament lock")
+
+BRACKET_FORMAT_NAMES = {
+    "single": "Single Elimination",
+    "seeded": "Seeded Single Elimination (SP)",
+    "double": "Double Elimination",
+    "swiss": "Swiss",
+    "groups": "Group Stage + Playoffs"
+}
+
+def parse_bracket_format(value):
+    """Parse a bracket format like 'double', 'double:sp' (seeded by SP) or 'groups:4:2' (groups:count:advancing).
+
+    Returns (format, options), or (None, None) if the format is unknown.
+    """
+    aliases = {"se": "single", "de": "double", "rr": "groups"}
+    name, *params = value.lower().split(':')
+    name = aliases.get(name, name)
+    if name not in BRACKET_FORMAT_NAMES:
+        return None, None
 
-def get_tournament(guild_id):
-    """Get tournament for specific guild"""
-    if guild_id not in tournaments:
-        tournaments[guild_id] = Tournament()
-    return tournaments[guild_id]
+    options = {}
+    if name == "groups":
+        try:
+            if len(params) > 0 and params[0]:
+                options['groups'] = int(params[0])
+            if len(params) > 1 and params[1]:
+                options['advance'] = int(params[1])
+        except ValueError:
+            return None, None
+        # Groups are labelled A-Z
+        if any(value < 1 for value in options.values()) or options.get('groups', 1) > 26:
+            return None, None
+    elif name == "double" and params == ["sp"]:
+        options['seeding'] = "sp"
+    elif params:
+        return None, None
+
+    return name, options
+
+INVITATION_MINUTES = 5  # How long a team invitation can be answered
+INVITATION_SWEEP_INTERVAL = 60  # Seconds between sweeps of expired invitations
+MAX_OPEN_INVITATIONS = 10  # Unanswered invitations one player can have out per guild
+
+class InvitationStore:
+    """Pending team invitations keyed by (guild_id, inviter_id, invitee_id) with expiry times.
+
+    Expiries also sit in a heap so sweep() evicts everything expired without scanning
+    live invitations. Heap entries of answered invitations are skipped, and the heap is
+    rebuilt when they outnumber the live ones, so memory follows the open invitations.
+    """
+    def __init__(self, max_per_inviter=MAX_OPEN_INVITATIONS):
+        self.max_per_inviter = max_per_inviter
+        self.expires = {}  # {(guild_id, inviter_id, invitee_id): datetime the invitation expires}
+        self.open_counts = {}  # {(guild_id, inviter_id): open invitations}
+        self.heap = []  # (expires_at, key)
+
+    def __len__(self):
+        return len(self.expires)
+
+    def add(self, guild_id, inviter_id, invitee_id, minutes=INVITATION_MINUTES):
+        """Store an invitation, returns an error message or None"""
+        key = (guild_id, inviter_id, invitee_id)
+        if self.is_pending(*key):
+            return "❌ You have already sent a team invitation to this user."
+        if self.open_counts.get(key[:2], 0) >= self.max_per_inviter:
+            return f"❌ You already have {self.max_per_inviter} open invitations. Wait until some are answered or expire."
+
+        expires_at = datetime.now() + timedelta(minutes=minutes)
+        self.expires[key] = expires_at
+        self.open_counts[key[:2]] = self.open_counts.get(key[:2], 0) + 1
+        heapq.heappush(self.heap, (expires_at, key))
+        return None
+
+    def is_pending(self, guild_id, inviter_id, invitee_id):
+        """Whether an unexpired invitation exists"""
+        key = (guild_id, inviter_id, invitee_id)
+        expires_at = self.expires.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= datetime.now():
+            self._evict(key)
+            return False
+        return True
+
+    def remove(self, guild_id, inviter_id, invitee_id):
+        """Drop an invitation, returns whether it was still pending"""
+        pending = self.is_pending(guild_id, inviter_id, invitee_id)
+        if pending:
+            self._evict((guild_id, inviter_id, invitee_id))
+            if len(self.heap) > 2 * len(self.expires) + 64:
+                self.heap = [(expires_at, key) for key, expires_at in self.expires.items()]
+                heapq.heapify(self.heap)
+        return pending
+
+    def sweep(self):
+        """Evict every expired invitation, returns how many were removed"""
+        now = datetime.now()
+        evicted = 0
+        while self.heap and self.heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self.heap)
+            if self.expires.get(key) == expires_at:
+                self._evict(key)
+                evicted += 1
+        return evicted
+
+    def _evict(self, key):
+        del self.expires[key]
+        inviter_key = key[:2]
+        self.open_counts[inviter_key] -= 1
+        if not self.open_counts[inviter_key]:
+            del self.open_counts[inviter_key]
 
 # Store user data (all server-specific)
 sp_data = {}  # {guild_id: {user_id: sp_amount}}
-tournaments = {}  # {guild_id: Tournament}
+tournaments = {}  # {tournament_id: Tournament}
+guild_tournaments = {}  # {guild_id: {tournament_id: Tournament}}
+channel_tournaments = {}  # {channel_id: tournament_id}
+tournament_ids = itertools.count(1)
+lock_wait_stats = {}  # {guild_id: {action: {'count', 'contended', 'total_wait', 'max_wait'}}}
+forfeit_timers = []  # Heap of (deadline, tournament_id, round_num, match_index) for every tournament
+MATCH_DEADLINE_MINUTES = 10  # Default no-show deadline after a room code is sent
+FORFEIT_CHECK_INTERVAL = 5  # Seconds between checks of the forfeit timer
 role_permissions = {}  # {guild_id: {'htr': [role_ids], 'adr': [role_ids], 'tlr': [role_ids]}}
 teams = {}  # {guild_id: {team_id: [player1, player2]}}
-team_invitations = {}  # {guild_id: {user_id: [inviter_id1, inviter_id2, ...]}}
+team_invitations = InvitationStore()  # Pending invitations by (guild_id, inviter_id, invitee_id)
 player_teams = {}  # {guild_id: {user_id: team_id}}
 log_channels = {}  # {guild_id: channel_id}
+player_stats = {}  # {guild_id: {user_id: {'tournaments', 'matches', 'wins', 'best_placement', 'head_to_head': {opponent_id: [wins, losses]}}}}
+ratings = {}  # {guild_id: {user_id: elo_rating}}
+tournament_presets = {}  # {guild_id: {name: {'title', 'map', 'abilities', 'setup', 'prize', 'sp_rewards'}}}
+DEFAULT_SP_REWARDS = [3, 2, 1, 1]  # SP for 1st to 4th place unless a preset sets its own table
+MAX_SP_PLACES = 8  # Longest SP table a preset can have
+MAX_PRESETS = 25  # Presets per guild, as many as !preset list can show in one embed
+tournament_schedules = {}  # {guild_id: {schedule_id: {'preset', 'channel_id', 'when', 'start_after', 'next_run', 'tournament_id', 'start_at'}}}
+schedule_timers = []  # Heap of (time, guild_id, schedule_id, action) for every schedule, rebuilt from tournament_schedules on load
+SCHEDULE_CHECK_INTERVAL = 30  # Seconds between checks of the schedule timer
+SCHEDULE_GRACE_MINUTES = 15  # Openings missed by longer than this (bot offline) are skipped
+MAX_START_AFTER_MINUTES = 720  # Longest registration window of a scheduled tournament, shorter than a day so occurrences never overlap
+MAX_SCHEDULES = 25  # Schedules per guild, as many as !schedules can show in one embed
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+TOURNAMENT_HISTORY_FILE = 'tournament_history.jsonl'  # One finished tournament per line, append only
 
 # Game state storage
 game_sessions = {}  # {channel_id: {'number': int, 'active': bool}}
@@ -184,17 +419,35 @@ def get_player_display_name(player, guild_id=None):
 
 # Load data
 def load_data():
-    global sp_data, role_permissions, teams, team_invitations, player_teams, log_channels, bracket_roles
+    global sp_data, role_permissions, teams, team_invitations, player_teams, log_channels, bracket_roles, player_stats, ratings, host_registrations, tournament_presets, tournament_schedules
     try:
         with open('user_data.json', 'r') as f:
             data = json.load(f)
             sp_data = data.get('sp_data', {})
+            player_stats = data.get('player_stats', {})
+            ratings = data.get('ratings', {})
+            host_registrations = data.get('host_registrations', {})
+            for guild_sessions in host_registrations.values():
+                for session in guild_sessions.values():
+                    session['hoster_set'] = set(session['hosters'])
+                    # Sessions saved before they had a creation time start their lifetime now
+                    session.setdefault('created', datetime.now().isoformat())
             role_permissions = data.get('role_permissions', {})
             log_channels = data.get('log_channels', {})
             bracket_roles = data.get('bracket_roles', {})
+            tournament_presets = data.get('tournament_presets', {})
+            tournament_schedules = data.get('tournament_schedules', {})
+            for guild_str, guild_schedules in list(tournament_schedules.items()):
+                for schedule_id, schedule in list(guild_schedules.items()):
+                    # Tournaments don't survive a restart, so neither do their pending starts
+                    if schedule.get('tournament_id') not in tournaments:
+                        schedule['tournament_id'] = schedule['start_at'] = None
+                    # One-offs that already ran, or lost their start just now, are done
+                    drop_finished_schedule(guild_str, schedule_id, schedule)
+            rebuild_schedule_timers()
             # Teams data is not loaded since it contains Discord objects
             teams = {}
-            team_invitations = {}
+            team_invitations = InvitationStore()
             player_teams = {}
     except FileNotFoundError:
         pass
@@ -207,7 +460,18 @@ def save_data():
         'sp_data': sp_data,
         'role_permissions': role_permissions,
         'log_channels': log_channels,
-        'bracket_roles': bracket_roles
+        'bracket_roles': bracket_roles,
+        'player_stats': player_stats,
+        'ratings': ratings,
+        'host_registrations': {
+            guild_str: {
+                event: {key: value for key, value in session.items() if key != 'hoster_set'}
+                for event, session in guild_sessions.items()
+            }
+            for guild_str, guild_sessions in host_registrations.items()
+        },
+        'tournament_presets': tournament_presets,
+        'tournament_schedules': tournament_schedules
         # Teams are not saved since they contain Discord objects
     }
     with open('user_data.json', 'w') as f:
@@ -282,8 +546,11 @@ def create_team(guild_id, player1, player2):
         teams[guild_str] = {}
         player_teams[guild_str] = {}
 
-    # Generate unique team ID
-    team_id = f"team_{len(teams[guild_str]) + 1}_{guild_id}"
+    # Generate unique team ID, skipping numbers still held after teams were removed
+    number = len(teams[guild_str]) + 1
+    while f"team_{number}_{guild_id}" in teams[guild_str]:
+        number += 1
+    team_id = f"team_{number}_{guild_id}"
 
     teams[guild_str][team_id] = [player1, player2]
     player_teams[guild_str][str(player1.id)] = team_id
@@ -348,8 +615,122 @@ async def on_ready():
     bot.add_view(TournamentConfigView(None))
     bot.add_view(HosterRegistrationView())
 
+    if not forfeit_timer.is_running():
+        forfeit_timer.start()
+    if not sweep_invitations.is_running():
+        sweep_invitations.start()
+    if not schedule_timer.is_running():
+        schedule_timer.start()
+    bot.add_dynamic_items(MatchWinnerSelect)
+
     print("🔧 Bot is ready and all systems operational!")
 
+def parse_tournament_setup(text):
+    """Parse "mode maxplayers [format]" setup text, like '1v1 8' or '2v2 4 double'.
+
+    Returns ((mode, max_players, bracket_format, format_options), None), or (None, error message).
+    """
+    parts = text.strip().split()
+    if len(parts) not in [2, 3]:
+        return None, "❌ Format should be: mode maxplayers [format] (e.g., '1v1 8' or '1v1 8 double')"
+
+    mode = parts[0].lower()
+    try:
+        max_players = int(parts[1])
+    except ValueError:
+        return None, "❌ Invalid format! Use: mode maxplayers (e.g., '1v1 8')"
+    bracket_format, format_options = parse_bracket_format(parts[2] if len(parts) == 3 else "single")
+
+    if not bracket_format:
+        return None, "❌ Format must be 'single', 'seeded', 'double[:sp]', 'swiss' or 'groups[:groups:advancing]'!"
+
+    if mode not in ["1v1", "2v2"]:
+        return None, "❌ Mode must be '1v1' or '2v2'!"
+
+    if bracket_format in ["swiss", "groups"]:
+        if max_players < 2 or max_players > 512:
+            return None, f"❌ For {BRACKET_FORMAT_NAMES[bracket_format]} format, max players must be between 2 and 512!"
+    elif mode == "2v2" and max_players not in [2, 4, 8, 16]:
+        return None, "❌ For 2v2 mode, max players (teams) must be 2, 4, 8, or 16!"
+    elif mode == "1v1" and max_players not in [2, 4, 8, 16, 32]:
+        return None, "❌ For 1v1 mode, max players must be 2, 4, 8, 16 or 32!"
+
+    return (mode, max_players, bracket_format, format_options), None
+
+def parse_sp_rewards(text):
+    """Parse an SP table like '5 3 2 1' (SP for 1st place first), None if it is not valid"""
+    try:
+        sp_rewards = [int(sp) for sp in text.replace(',', ' ').split()]
+    except ValueError:
+        return None
+    if not sp_rewards or len(sp_rewards) > MAX_SP_PLACES or any(sp < 0 for sp in sp_rewards):
+        return None
+    return sp_rewards
+
+async def open_tournament(guild_id, channel, settings):
+    """Create a tournament and post its registration message in channel.
+
+    settings holds 'title', 'map', 'abilities', 'setup' (mode maxplayers [format]) and 'prize',
+    plus an optional 'sp_rewards' table. Returns (tournament, None), or (None, error message).
+    """
+    setup, error = parse_tournament_setup(settings['setup'])
+    if error:
+        return None, error
+    mode, max_players, bracket_format, format_options = setup
+
+    # Create a new tournament; others in the server keep running
+    tournament = create_tournament(guild_id, channel)
+    tournament.max_players = max_players
+    tournament.mode = mode
+    tournament.format = bracket_format
+    tournament.format_options = format_options
+    tournament.channel = channel
+    tournament.target_channel = channel
+    tournament.title = settings['title']
+    tournament.map = settings['map']
+    tournament.abilities = settings['abilities']
+    tournament.prize = settings['prize']
+    tournament.sp_rewards = list(settings.get('sp_rewards') or DEFAULT_SP_REWARDS)
+    tournament.players = []
+    tournament.eliminated = []
+    tournament.active = False
+
+    embed = discord.Embed(title=f"🏆 {tournament.title}", color=0x00ff00)
+    embed.add_field(name="<:map:1409924163346370560> Map", value=tournament.map, inline=True)
+    embed.add_field(name="<:abilities:1402690411759407185> Abilities", value=tournament.abilities, inline=True)
+    embed.add_field(name="🎮 Mode", value=mode, inline=True)
+    embed.add_field(name="🗂️ Format", value=BRACKET_FORMAT_NAMES[bracket_format], inline=True)
+    embed.add_field(name="<:LotsOfGems:1383151614940151908> Prize", value=tournament.prize, inline=True)
+    embed.add_field(name="<:TrioIcon:1402690815771541685> Max Players", value=str(max_players), inline=True)
+
+    # Enhanced Stumble Guys rules with updated emojis
+    rules_text = (
+        "🔹 **NO TEAMING** - Teams are only allowed in designated team modes\n"
+        "🔸 **NO GRIEFING** - Don't intentionally sabotage other players\n"
+        "🔹 **NO EXPLOITING** - Use of glitches or exploits will result in disqualification\n"
+        "🔸 **FAIR PLAY** - Respect all players and play honorably\n"
+        "🔹 **NO RAGE QUITTING** - Leaving mid-match counts as a forfeit\n"
+        "🔸 **FOLLOW HOST** - Listen to tournament host instructions\n"
+        "🔹 **NO TOXICITY** - Keep chat friendly and respectful\n"
+        "🔸 **BE READY** - Join matches promptly when called\n"
+        "🔹 **NO ALTS** - One account per player only"
+    )
+
+    embed.add_field(name="<:notr:1409923674387251280> **Stumble Guys Tournament Rules**", value=rules_text, inline=False)
+
+    embed.set_footer(text=f"Tournament ID: {tournament.id}")
+
+    view = TournamentView(tournament.id)
+    # Update the participant count button to show correct max players
+    for item in view.children:
+        if hasattr(item, 'custom_id') and item.custom_id.split(':')[0] == "participant_count":
+            item.label = f"0/{max_players}"
+            break
+
+    # Send tournament message
+    tournament.message = await channel.send(embed=embed, view=view)
+    return tournament, None
+
 class TournamentConfigModal(discord.ui.Modal, title="Tournament Configuration"):
     def __init__(self, target_channel):
         super().__init__()
@@ -378,7 +759,7 @@ class TournamentConfigModal(discord.ui.Modal, title="Tournament Configuration"):
 
     mode_and_players_field = discord.ui.TextInput(
         label="🎮 Mode & Max Players",
-        placeholder="1v1 8 or 2v2 4 (format: mode maxplayers)",
+        placeholder="1v1 8 or 2v2 4 double (format: mode maxplayers [format])",
         default="",
         max_length=20
     )
@@ -391,94 +772,36 @@ class TournamentConfigModal(discord.ui.Modal, title="Tournament Configuration"):
     )
 
     async def on_submit(self, interaction: discord.Interaction):
-        try:
-            # Validate target channel
-            if not self.target_channel:
-                await interaction.response.send_message("❌ Invalid target channel. Please try again.", ephemeral=True)
-                return
-
-            # Parse mode and max players
-            mode_players_parts = self.mode_and_players_field.value.strip().split()
-            if len(mode_players_parts) != 2:
-                await interaction.response.send_message("❌ Format should be: mode maxplayers (e.g., '1v1 8')", ephemeral=True)
-                return
-
-            mode = mode_players_parts[0].lower()
-            max_players = int(mode_players_parts[1])
-
-            if mode not in ["1v1", "2v2"]:
-                await interaction.response.send_message("❌ Mode must be '1v1' or '2v2'!", ephemeral=True)
-                return
-
-            if mode == "2v2" and max_players not in [2, 4, 8, 16]:
-                await interaction.response.send_message("❌ For 2v2 mode, max players (teams) must be 2, 4, 8, or 16!", ephemeral=True)
-                return
-            elif mode == "1v1" and max_players not in [2, 4, 8, 16, 32]:
-                await interaction.response.send_message("❌ For 1v1 mode, max players must be 2, 4, 8, 16 or 32!", ephemeral=True)
-                return
-        except ValueError:
-            await interaction.response.send_message("❌ Invalid format! Use: mode maxplayers (e.g., '1v1 8')", ephemeral=True)
+        # Validate target channel
+        if not self.target_channel:
+            await interaction.response.send_message("❌ Invalid target channel. Please try again.", ephemeral=True)
             return
+
+        settings = {
+            'title': self.title_field.value,
+            'map': self.map_field.value,
+            'abilities': self.abilities_field.value,
+            'setup': self.mode_and_players_field.value,
+            'prize': self.prize_field.value,
+        }
+        try:
+            tournament, error = await open_tournament(interaction.guild.id, self.target_channel, settings)
         except Exception as e:
             print(f"Error in tournament config modal: {e}")
             await interaction.response.send_message("❌ An error occurred. Please try again.", ephemeral=True)
             return
-
-        # Get server-specific tournament and reset it
-        tournament = get_tournament(interaction.guild.id)
-        tournament.__init__()
-        tournament.max_players = max_players
-        tournament.mode = mode
-        tournament.channel = self.target_channel
-        tournament.target_channel = self.target_channel
-        tournament.title = self.title_field.value
-        tournament.map = self.map_field.value
-        tournament.abilities = self.abilities_field.value
-        tournament.prize = self.prize_field.value
-        tournament.players = []
-        tournament.eliminated = []
-        tournament.active = False
-
-        embed = discord.Embed(title=f"🏆 {tournament.title}", color=0x00ff00)
-        embed.add_field(name="<:map:1409924163346370560> Map", value=tournament.map, inline=True)
-        embed.add_field(name="<:abilities:1402690411759407185> Abilities", value=tournament.abilities, inline=True)
-        embed.add_field(name="🎮 Mode", value=mode, inline=True)
-        embed.add_field(name="<:LotsOfGems:1383151614940151908> Prize", value=tournament.prize, inline=True)
-        embed.add_field(name="<:TrioIcon:1402690815771541685> Max Players", value=str(max_players), inline=True)
-
-        # Enhanced Stumble Guys rules with updated emojis
-        rules_text = (
-            "🔹 **NO TEAMING** - Teams are only allowed in designated team modes\n"
-            "🔸 **NO GRIEFING** - Don't intentionally sabotage other players\n"
-            "🔹 **NO EXPLOITING** - Use of glitches or exploits will result in disqualification\n"
-            "🔸 **FAIR PLAY** - Respect all players and play honorably\n"
-            "🔹 **NO RAGE QUITTING** - Leaving mid-match counts as a forfeit\n"
-            "🔸 **FOLLOW HOST** - Listen to tournament host instructions\n"
-            "🔹 **NO TOXICITY** - Keep chat friendly and respectful\n"
-            "🔸 **BE READY** - Join matches promptly when called\n"
-            "🔹 **NO ALTS** - One account per player only"
-        )
-
-        embed.add_field(name="<:notr:1409923674387251280> **Stumble Guys Tournament Rules**", value=rules_text, inline=False)
-
-        view = TournamentView()
-        # Update the participant count button to show correct max players
-        for item in view.children:
-            if hasattr(item, 'custom_id') and item.custom_id == "participant_count":
-                item.label = f"0/{max_players}"
-                break
-
-        # Send tournament message
-        tournament.message = await self.target_channel.send(embed=embed, view=view)
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
+            return
 
         # Log tournament creation
-        details = f"Mode: {mode}, Max players: {max_players}, Map: {tournament.map}, Prize: {tournament.prize}"
+        details = f"ID: {tournament.id}, Mode: {tournament.mode}, Format: {tournament.format}, Max players: {tournament.max_players}, Map: {tournament.map}, Prize: {tournament.prize}"
         await log_command(interaction.guild.id, interaction.user, "Tournament Created", details)
 
         # Respond with success
-        await interaction.response.send_message("✅ Tournament created successfully!", ephemeral=True)
+        await interaction.response.send_message(f"✅ Tournament created successfully! (ID: {tournament.id})", ephemeral=True)
 
-        print(f"✅ Tournament created: {max_players} max players, Map: {tournament.map}")
+        print(f"✅ Tournament created: {tournament.max_players} max players, Map: {tournament.map}")
 
 class TournamentConfigView(discord.ui.View):
     def __init__(self, target_channel=None):
@@ -507,69 +830,329 @@ class TournamentConfigView(discord.ui.View):
             except Exception as follow_error:
                 print(f"Failed to send error message: {follow_error}")
 
+WAITLIST_SIZE = 50  # Max entrants waiting for a spot in one tournament
+
+def registered_count(tournament):
+    """Number of registered entrants (teams in 2v2)"""
+    return len(tournament.players) // 2 if tournament.mode == "2v2" else len(tournament.players)
+
+def waitlist_position(tournament, user_id):
+    """1-based waitlist position of a player or their team, or None if not waiting"""
+    if user_id not in tournament.waitlist_ids:
+        return None
+    for position, entrant in enumerate(tournament.waitlist, 1):
+        members = entrant if isinstance(entrant, list) else [entrant]
+        if any(member.id == user_id for member in members):
+            return position
+    return None
+
+def add_to_waitlist(tournament, entrant):
+    """Queue an entrant for the next free spot, returns its waitlist position"""
+    tournament.waitlist.append(entrant)
+    for member in (entrant if isinstance(entrant, list) else [entrant]):
+        tournament.waitlist_ids.add(member.id)
+    return len(tournament.waitlist)
+
+def remove_from_waitlist(tournament, user_id):
+    """Take a player or their team off the waitlist"""
+    position = waitlist_position(tournament, user_id)
+    if position is None:
+        return False
+    entrant = tournament.waitlist[position - 1]
+    del tournament.waitlist[position - 1]
+    for member in (entrant if isinstance(entrant, list) else [entrant]):
+        tournament.waitlist_ids.discard(member.id)
+    return True
+
+def free_player_slots(tournament):
+    """Number of players that still fit in, a team takes two"""
+    return tournament.max_players * (2 if tournament.mode == "2v2" else 1) - len(tournament.players)
+
+def promote_from_waitlist(guild_id, tournament):
+    """Move waiting entrants into free spots, returns the players who got in"""
+    promoted = []
+    too_big = []  # Teams waiting while only a solo slot is free keep their place
+    while tournament.waitlist and free_player_slots(tournament) > 0:
+        entrant = tournament.waitlist.popleft()
+        members = entrant if isinstance(entrant, list) else [entrant]
+        waiting = members
+
+        if tournament.mode == "2v2":
+            # The team may have changed while waiting, register it as it is now
+            team_id = get_team_id(guild_id, members[0].id)
+            if team_id:
+                members = get_team_members(guild_id, team_id)
+            elif tournament.solo_queue:
+                members = members[:1]
+            else:
+                members = []
+            if len(members) > free_player_slots(tournament):
+                too_big.append(entrant)
+                continue
+
+        for member in waiting:
+            tournament.waitlist_ids.discard(member.id)
+
+        if tournament.mode == "2v2":
+            if not members or (team_id and len(members) != 2) or any(member in tournament.players for member in members):
+                continue
+            if not team_id:
+                tournament.solo_ids.add(members[0].id)
+
+        tournament.players.extend(members)
+        promoted.extend(members)
+
+    tournament.waitlist.extendleft(reversed(too_big))
+    return promoted
+
+CHECKIN_MINUTES = 10  # Default length of the check-in window
+
+def prune_unchecked(tournament):
+    """Drop registered players who didn't check in, returns how many entrants were removed"""
+    if tournament.checkin_deadline is None:
+        return 0
+    before = registered_count(tournament)
+    tournament.players = [
+        player for player in tournament.players
+        if isinstance(player, FakePlayer) or player.id in tournament.checked_in
+    ]
+    tournament.checkin_deadline = None
+    return before - registered_count(tournament)
+
+def form_solo_teams(guild_id, tournament):
+    """Team up solo queue players into balanced teams and add them to the team registry.
+
+    Players are ranked by SP or rating and the strongest is paired with the weakest, which
+    keeps the spread of team totals as small as possible. Returns (teams, player left over or None).
+    """
+    solos = [
+        player for player in tournament.players
+        if player.id in tournament.solo_ids and not isinstance(player, FakePlayer) and not get_team_id(guild_id, player.id)
+    ]
+    tournament.solo_ids.clear()
+
+    leftover = None
+    if len(solos) % 2:
+        # The last player to register sits out
+        leftover = solos.pop()
+        tournament.players.remove(leftover)
+
+    skill = get_rating if tournament.solo_queue == "rating" else get_entrant_sp
+    ranked = sorted(solos, key=lambda player: skill(guild_id, player), reverse=True)
+    formed = []
+    for i in range(len(ranked) // 2):
+        team = [ranked[i], ranked[-1 - i]]
+        create_team(guild_id, *team)
+        formed.append(team)
+
+    # Keep the new teammates next to each other
+    solo_players = set(solos)
+    tournament.players = [player for player in tournament.players if player not in solo_players]
+    for team in formed:
+        tournament.players.extend(team)
+    if formed:
+        save_data()
+    return formed, leftover
+
+async def announce_solo_teams(destination, guild_id, tournament, formed, leftover):
+    """Post the teams the solo queue formed and tell a left over player they sit out"""
+    if formed:
+        team_list = "\n".join(f"• {get_team_display_name(guild_id, team)}" for team in formed)
+        await destination.send(f"🎲 Solo queue formed {len(formed)} team{'s' if len(formed) != 1 else ''}:\n{team_list}", delete_after=60)
+    if leftover:
+        await destination.send(f"🎲 {leftover.display_name} had no solo queue partner left and sits out this tournament.", delete_after=30)
+        dm_service.send(leftover, f"😕 An odd number of players joined the solo queue of **{tournament.title}**, so you had no teammate and were removed.")
+
+async def notify_promoted(tournament, players):
+    """DM players who were moved from the waitlist into the tournament, with a check-in reminder while check-in is open"""
+    message = f"🎉 A spot opened up in **{tournament.title}**! You were moved from the waitlist and are now registered."
+    if tournament.checkin_deadline:
+        # They missed the check-in reminders, without checking in they would be dropped at start
+        minutes_left = max(1, -(-int((tournament.checkin_deadline - datetime.now()).total_seconds()) // 60))
+        channel_text = f" in {tournament.channel.mention}" if tournament.channel else ""
+        message += f"\n⏰ Check-in is open! Press **Check In** on the tournament message{channel_text} within {minutes_left} minutes or you will be removed."
+    for player in players:
+        dm_service.send(player, message)
+
 class TournamentView(discord.ui.View):
-    def __init__(self):
+    def __init__(self, tournament_id=None, checkin=False):
         super().__init__(timeout=None)
+        self.tournament_id = tournament_id
+        if not checkin:
+            self.remove_item(self.checkin_button)
+        if tournament_id:
+            # Each registration message gets its own custom_ids so presses go straight to its tournament
+            for item in self.children:
+                item.custom_id = f"{item.custom_id}:{tournament_id}"
+
+    def get_view_tournament(self, interaction):
+        return get_tournament(interaction.guild.id, interaction.channel.id, self.tournament_id)
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         return True
 
-    @discord.ui.button(label="Register", style=discord.ButtonStyle.green, custom_id="tournament_register")
-    async def register_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        try:
-            tournament = get_tournament(interaction.guild.id)
-
-            # Check tournament state
-            if tournament.max_players == 0:
-                return await interaction.response.send_message("❌ No tournament has been created yet.", ephemeral=True)
-            if tournament.active:
-                return await interaction.response.send_message("⚠️ Tournament already started.", ephemeral=True)
-
-            # For 2v2 mode, check if user is in a team
-            if tournament.mode == "2v2":
-                team_id = get_team_id(interaction.guild.id, interaction.user.id)
-                if not team_id:
-                    return await interaction.response.send_message("❌ You need to be in a team to register for 2v2 tournaments! Use `!invite @teammate` to create a team.", ephemeral=True)
-
-                # Check if team is already registered
-                team_members = get_team_members(interaction.guild.id, team_id)
-                if any(member in tournament.players for member in team_members):
-                    return await interaction.response.send_message("❌ Your team is already registered.", ephemeral=True)
+    def update_participant_count(self, tournament):
+        for item in self.children:
+            if hasattr(item, 'custom_id') and item.custom_id.split(':')[0] == "participant_count":
+                item.label = f"{registered_count(tournament)}/{tournament.max_players}"
+                if tournament.checkin_deadline:
+                    checked = len(tournament.checked_in) // 2 if tournament.mode == "2v2" else len(tournament.checked_in)
+                    item.label = f"{checked}/{registered_count(tournament)} checked in"
+                elif tournament.waitlist:
+                    item.label += f" (+{len(tournament.waitlist)} waiting)"
+                break
 
-                # Check if tournament is full (max_players represents number of teams in 2v2)
-                current_teams = len(tournament.players) // 2
-                if current_teams >= tournament.max_players:
-                    return await interaction.response.send_message("❌ Tournament is full.", ephemeral=True)
+    def register_entrant(self, interaction, tournament):
+        """Add the clicking player (or their whole team) to the tournament, returns (error, confirmation)"""
+        # Check tournament state
+        if tournament.max_players == 0:
+            return "❌ No tournament has been created yet.", None
+        if tournament.active:
+            return "⚠️ Tournament already started.", None
+        if tournament.checkin_deadline:
+            return "⚠️ Registration is closed, check-in is running.", None
+
+        # For 2v2 mode, check if user is in a team
+        if tournament.mode == "2v2":
+            team_id = get_team_id(interaction.guild.id, interaction.user.id)
+            if not team_id:
+                if tournament.solo_queue:
+                    return self.register_solo(interaction, tournament)
+                return "❌ You need to be in a team to register for 2v2 tournaments! Use `!invite @teammate` to create a team.", None
+
+            # Check if team is already registered
+            team_members = get_team_members(interaction.guild.id, team_id)
+            if any(member in tournament.players for member in team_members):
+                return "❌ Your team is already registered.", None
+
+            # Check if tournament is full (max_players represents number of teams in 2v2)
+            current_teams = len(tournament.players) // 2
+            if current_teams >= tournament.max_players:
+                return self.join_waitlist(tournament, list(team_members), interaction.user.id)
+
+            tournament.players.extend(team_members)
+            team_name = get_team_display_name(interaction.guild.id, team_members)
+            return None, f"✅ Team {team_name} registered! ({len(tournament.players) // 2}/{tournament.max_players} teams)"
+
+        # 1v1 mode
+        if interaction.user in tournament.players:
+            return "❌ You are already registered.", None
+
+        # Check if there's space
+        if len(tournament.players) >= tournament.max_players:
+            return self.join_waitlist(tournament, interaction.user, interaction.user.id)
+
+        tournament.players.append(interaction.user)
+        return None, f"✅ {interaction.user.display_name} registered! ({len(tournament.players)}/{tournament.max_players})"
+
+    def register_solo(self, interaction, tournament):
+        """Register a 2v2 player without a team, they get a teammate when the tournament starts"""
+        if interaction.user in tournament.players:
+            return "❌ You are already registered.", None
+
+        # Two solo players take up one team spot
+        if len(tournament.players) >= tournament.max_players * 2:
+            return self.join_waitlist(tournament, [interaction.user], interaction.user.id)
+
+        tournament.players.append(interaction.user)
+        tournament.solo_ids.add(interaction.user.id)
+        return None, f"✅ {interaction.user.display_name} joined the solo queue! You'll get a teammate when the tournament starts. ({len(tournament.players) // 2}/{tournament.max_players} teams)"
+
+    def join_waitlist(self, tournament, entrant, user_id):
+        """Put an entrant on a full tournament's waitlist, returns (error, confirmation)"""
+        position = waitlist_position(tournament, user_id)
+        if position is not None:
+            return f"⏳ You are already on the waitlist (#{position}).", None
+        if len(tournament.waitlist) >= WAITLIST_SIZE:
+            return "❌ Tournament and waitlist are full.", None
+
+        position = add_to_waitlist(tournament, entrant)
+        return None, f"⏳ Tournament is full. You are #{position} on the waitlist and will be registered automatically when a spot opens up."
+
+    def unregister_entrant(self, interaction, tournament):
+        """Remove the clicking player (or their whole team) from the tournament, returns (error, confirmation)"""
+        if tournament.max_players == 0:
+            return "❌ No tournament has been created yet.", None
+        if tournament.active:
+            return "⚠️ Tournament already started.", None
+
+        if remove_from_waitlist(tournament, interaction.user.id):
+            return None, "✅ You left the waitlist."
 
-                tournament.players.extend(team_members)
-                team_name = get_team_display_name(interaction.guild.id, team_members)
+        if tournament.mode == "2v2":
+            if interaction.user.id in tournament.solo_ids and interaction.user in tournament.players:
+                tournament.players.remove(interaction.user)
+                tournament.solo_ids.discard(interaction.user.id)
+                tournament.checked_in.discard(interaction.user.id)
+                return None, f"✅ {interaction.user.display_name} left the solo queue! ({len(tournament.players) // 2}/{tournament.max_players} teams)"
+
+            team_id = get_team_id(interaction.guild.id, interaction.user.id)
+            if not team_id:
+                return "❌ You are not in a team.", None
+
+            team_members = get_team_members(interaction.guild.id, team_id)
+            if not any(member in tournament.players for member in team_members):
+                return "❌ Your team is not registered.", None
+
+            # Remove entire team
+            for member in team_members:
+                if member in tournament.players:
+                    tournament.players.remove(member)
+                tournament.checked_in.discard(member.id)
+
+            team_name = get_team_display_name(interaction.guild.id, team_members)
+            return None, f"✅ Team {team_name} unregistered! ({len(tournament.players) // 2}/{tournament.max_players} teams)"
+
+        # 1v1 mode
+        if interaction.user not in tournament.players:
+            return "❌ You are not registered.", None
+
+        tournament.players.remove(interaction.user)
+        tournament.checked_in.discard(interaction.user.id)
+        return None, f"✅ {interaction.user.display_name} unregistered! ({len(tournament.players)}/{tournament.max_players})"
+
+    def check_in_entrant(self, interaction, tournament):
+        """Check in the clicking player (or their whole team), returns (error, confirmation)"""
+        if tournament.active:
+            return "⚠️ Tournament already started.", None
+        if not tournament.checkin_deadline:
+            return "❌ Check-in is not open.", None
+        if datetime.now() > tournament.checkin_deadline:
+            return "❌ Check-in has closed.", None
+        if interaction.user not in tournament.players:
+            return "❌ You are not registered.", None
+        if interaction.user.id in tournament.checked_in:
+            return "✅ You are already checked in.", None
 
-                for item in self.children:
-                    if hasattr(item, 'custom_id') and item.custom_id == "participant_count":
-                        teams_registered = len(tournament.players) // 2
-                        item.label = f"{teams_registered}/{tournament.max_players}"
-                        break
+        if tournament.mode == "2v2":
+            # One check-in counts for the whole team
+            team_id = get_team_id(interaction.guild.id, interaction.user.id)
+            for member in get_team_members(interaction.guild.id, team_id) if team_id else [interaction.user]:
+                tournament.checked_in.add(member.id)
+            return None, "✅ Your team is checked in!"
 
-                await interaction.response.edit_message(view=self)
-                await interaction.followup.send(f"✅ Team {team_name} registered! ({len(tournament.players) // 2}/{tournament.max_players} teams)", ephemeral=True)
+        tournament.checked_in.add(interaction.user.id)
+        return None, "✅ You are checked in!"
 
-            else:  # 1v1 mode
-                if interaction.user in tournament.players:
-                    return await interaction.response.send_message("❌ You are already registered.", ephemeral=True)
+    @discord.ui.button(label="Register", style=discord.ButtonStyle.green, custom_id="tournament_register")
+    async def register_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            tournament = self.get_view_tournament(interaction)
 
-                # Check if there's space
-                if len(tournament.players) >= tournament.max_players:
-                    return await interaction.response.send_message("❌ Tournament is full.", ephemeral=True)
+            if not tournament:
+                return await interaction.response.send_message("❌ No tournament has been created yet.", ephemeral=True)
 
-                tournament.players.append(interaction.user)
+            # Check and change the player list under the lock so a start or another click can't interleave
+            async with tournament_lock(tournament, "register"):
+                error, confirmation = self.register_entrant(interaction, tournament)
+                self.update_participant_count(tournament)
 
-                for item in self.children:
-                    if hasattr(item, 'custom_id') and item.custom_id == "participant_count":
-                        item.label = f"{len(tournament.players)}/{tournament.max_players}"
-                        break
+            if error:
+                return await interaction.response.send_message(error, ephemeral=True)
 
-                await interaction.response.edit_message(view=self)
-                await interaction.followup.send(f"✅ {interaction.user.display_name} registered! ({len(tournament.players)}/{tournament.max_players})", ephemeral=True)
+            # Acknowledge right away, the counter on the message is edited at most once per interval
+            await interaction.response.send_message(confirmation, ephemeral=True)
+            registration_editor.queue(interaction.message, view=self)
 
         except Exception as e:
             print(f"Error in register_button: {e}")
@@ -584,51 +1167,23 @@ class TournamentView(discord.ui.View):
     @discord.ui.button(label="Unregister", style=discord.ButtonStyle.red, custom_id="tournament_unregister")
     async def unregister_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
-            tournament = get_tournament(interaction.guild.id)
+            tournament = self.get_view_tournament(interaction)
 
-            if tournament.max_players == 0:
+            if not tournament:
                 return await interaction.response.send_message("❌ No tournament has been created yet.", ephemeral=True)
-            if tournament.active:
-                return await interaction.response.send_message("⚠️ Tournament already started.", ephemeral=True)
-
-            if tournament.mode == "2v2":
-                team_id = get_team_id(interaction.guild.id, interaction.user.id)
-                if not team_id:
-                    return await interaction.response.send_message("❌ You are not in a team.", ephemeral=True)
 
-                team_members = get_team_members(interaction.guild.id, team_id)
-                if not any(member in tournament.players for member in team_members):
-                    return await interaction.response.send_message("❌ Your team is not registered.", ephemeral=True)
+            async with tournament_lock(tournament, "unregister"):
+                error, confirmation = self.unregister_entrant(interaction, tournament)
+                promoted = promote_from_waitlist(interaction.guild.id, tournament) if not error else []
+                self.update_participant_count(tournament)
 
-                # Remove entire team
-                for member in team_members:
-                    if member in tournament.players:
-                        tournament.players.remove(member)
+            if error:
+                return await interaction.response.send_message(error, ephemeral=True)
 
-                team_name = get_team_display_name(interaction.guild.id, team_members)
-
-                for item in self.children:
-                    if hasattr(item, 'custom_id') and item.custom_id == "participant_count":
-                        teams_registered = len(tournament.players) // 2
-                        item.label = f"{teams_registered}/{tournament.max_players}"
-                        break
-
-                await interaction.response.edit_message(view=self)
-                await interaction.followup.send(f"✅ Team {team_name} unregistered! ({len(tournament.players) // 2}/{tournament.max_players} teams)", ephemeral=True)
-
-            else:  # 1v1 mode
-                if interaction.user not in tournament.players:
-                    return await interaction.response.send_message("❌ You are not registered.", ephemeral=True)
-
-                tournament.players.remove(interaction.user)
-
-                for item in self.children:
-                    if hasattr(item, 'custom_id') and item.custom_id == "participant_count":
-                        item.label = f"{len(tournament.players)}/{tournament.max_players}"
-                        break
-
-                await interaction.response.edit_message(view=self)
-                await interaction.followup.send(f"✅ {interaction.user.display_name} unregistered! ({len(tournament.players)}/{tournament.max_players})", ephemeral=True)
+            # Acknowledge right away, the counter on the message is edited at most once per interval
+            await interaction.response.send_message(confirmation, ephemeral=True)
+            registration_editor.queue(interaction.message, view=self)
+            await notify_promoted(tournament, promoted)
 
         except Exception as e:
             print(f"Error in unregister_button: {e}")
@@ -644,182 +1199,55 @@ class TournamentView(discord.ui.View):
     async def participant_count(self, interaction: discord.Interaction, button: discord.ui.Button):
         pass
 
-    @discord.ui.button(label="🚀 Start Tournament", style=discord.ButtonStyle.primary, custom_id="start_tournament")
-    async def start_tournament(self, interaction: discord.Interaction, button: discord.ui.Button):
+    @discord.ui.button(label="✅ Check In", style=discord.ButtonStyle.green, custom_id="tournament_checkin")
+    async def checkin_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
-            tournament = get_tournament(interaction.guild.id)
-
-            if not has_permission(interaction.user, interaction.guild.id, 'tlr') and not interaction.user.guild_permissions.manage_channels:
-                return await interaction.response.send_message("❌ You don't have permission to start tournaments.", ephemeral=True)
+            tournament = self.get_view_tournament(interaction)
 
-            if tournament.max_players == 0:
+            if not tournament:
                 return await interaction.response.send_message("❌ No tournament has been created yet.", ephemeral=True)
 
-            if tournament.active:
-                return await interaction.response.send_message("❌ Tournament already started.", ephemeral=True)
-
-            # Check minimum requirements
-            if tournament.mode == "2v2":
-                min_teams = 1  # Need at least 1 team to start
-                current_teams = len(tournament.players) // 2
-                if current_teams < min_teams:
-                    return await interaction.response.send_message("❌ Not enough teams to start tournament (minimum 1 team).", ephemeral=True)
-            else:
-                if len(tournament.players) < 1:
-                    return await interaction.response.send_message("❌ Not enough players to start tournament (minimum 1 player).", ephemeral=True)
-
-            await interaction.response.send_message("🚀 Starting tournament...", ephemeral=True)
+            async with tournament_lock(tournament, "checkin"):
+                error, confirmation = self.check_in_entrant(interaction, tournament)
+                self.update_participant_count(tournament)
 
-            # Auto-fill with bots to make even number
-            if tournament.mode == "2v2":
-                current_teams = len(tournament.players) // 2
-                # Add bots one by one until we have an even number of teams
-                while current_teams % 2 != 0:
-                    # Create bot team
-                    bot1_name = f"Bot{tournament.fake_count}"
-                    bot1_id = 761557952975420886 + tournament.fake_count
-                    bot1 = FakePlayer(bot1_name, bot1_id)
-                    tournament.fake_count += 1
-
-                    bot2_name = f"Bot{tournament.fake_count}"
-                    bot2_id = 761557952975420886 + tournament.fake_count
-                    bot2 = FakePlayer(bot2_name, bot2_id)
-                    tournament.fake_count += 1
-
-                    tournament.players.extend([bot1, bot2])
-                    current_teams += 1
-
-                # Group players by teams (keep real teams together)
-                team_groups = []
-                processed_players = set()
-
-                for player in tournament.players:
-                    if player in processed_players or isinstance(player, FakePlayer):
-                        continue
-
-                    team_id = get_team_id(interaction.guild.id, player.id)
-                    if team_id:
-                        teammate = get_teammate(interaction.guild.id, player.id)
-                        if teammate and teammate in tournament.players:
-                            team_groups.append([player, teammate])
-                            processed_players.add(player)
-                            processed_players.add(teammate)
-                        else:
-                            # Player has team but teammate not in tournament
-                            team_groups.append([player])
-                            processed_players.add(player)
-                    else:
-                        # Player not in a team
-                        team_groups.append([player])
-                        processed_players.add(player)
+            if error:
+                return await interaction.response.send_message(error, ephemeral=True)
 
-                # Add fake player teams
-                fake_players = [p for p in tournament.players if isinstance(p, FakePlayer)]
-                for i in range(0, len(fake_players), 2):
-                    if i + 1 < len(fake_players):
-                        team_groups.append([fake_players[i], fake_players[i+1]])
+            await interaction.response.send_message(confirmation, ephemeral=True)
+            registration_editor.queue(interaction.message, view=self)
 
-                # Shuffle team order but keep teammates together
-                random.shuffle(team_groups)
-                tournament.players = []
-                for team in team_groups:
-                    tournament.players.extend(team)
-
-            else:
-                # Add bots one by one until we have an even number of players
-                while len(tournament.players) % 2 != 0:
-                    bot_name = f"Bot{tournament.fake_count}"
-                    bot_id = 761557952975420886 + tournament.fake_count
-                    bot = FakePlayer(bot_name, bot_id)
-                    tournament.players.append(bot)
-                    tournament.fake_count += 1
+        except Exception as e:
+            print(f"Error in checkin_button: {e}")
+            try:
+                if not interaction.response.is_done():
+                    await interaction.response.send_message("❌ An error occurred. Please try again.", ephemeral=True)
+                else:
+                    await interaction.followup.send("❌ An error occurred. Please try again.", ephemeral=True)
+            except Exception as follow_error:
+                print(f"Failed to send error message: {follow_error}")
 
-                # Shuffle players for 1v1
-                random.shuffle(tournament.players)
+    @discord.ui.button(label="🚀 Start Tournament", style=discord.ButtonStyle.primary, custom_id="start_tournament")
+    async def start_tournament(self, interaction: discord.Interaction, button: discord.ui.Button):
+        try:
+            tournament = self.get_view_tournament(interaction)
 
-            tournament.active = True
-            tournament.results = []
-            tournament.rounds = []
+            if not has_permission(interaction.user, interaction.guild.id, 'tlr') and not interaction.user.guild_permissions.manage_channels:
+                return await interaction.response.send_message("❌ You don't have permission to start tournaments.", ephemeral=True)
 
-            if tournament.mode == "2v2":
-                # Create team pairs for 2v2
-                team_pairs = []
-                for i in range(0, len(tournament.players), 4):
-                    team_a = [tournament.players[i], tournament.players[i+1]]
-                    team_b = [tournament.players[i+2], tournament.players[i+3]]
-                    team_pairs.append((team_a, team_b))
-                tournament.rounds.append(team_pairs)
-                current_round = team_pairs
-            else:
-                round_pairs = [(tournament.players[i], tournament.players[i+1]) for i in range(0, len(tournament.players), 2)]
-                tournament.rounds.append(round_pairs)
-                current_round = round_pairs
+            if not tournament or tournament.max_players == 0:
+                return await interaction.response.send_message("❌ No tournament has been created yet.", ephemeral=True)
 
-            embed = discord.Embed(
-                title=f"🏆 {tournament.title} - Round 1",
-                description=f"**Map:** {tournament.map}\n**Abilities:** {tournament.abilities}",
-                color=0x3498db
-            )
+            # Same start as !start and scheduled starts, rounds and notices go to this channel
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            was_active = tournament.active
+            await start_tournament(TimerContext(interaction.channel), tournament)
+            await log_command(interaction.guild.id, interaction.user, "Start Button", f"Tournament {tournament.id}, Players: {len(tournament.players)}")
 
-            if tournament.mode == "2v2":
-                for i, match in enumerate(current_round, 1):
-                    team_a, team_b = match
-                    # Get bracket names for team members WITH emojis
-                    team_a_display = []
-                    team_b_display = []
-
-                    guild_str = str(interaction.guild.id)
-
-                    for player in team_a:
-                        player_name = get_player_display_name(player, interaction.guild.id)
-                        if guild_str in bracket_roles and str(player.id) in bracket_roles[guild_str] and not isinstance(player, FakePlayer):
-                            emojis = ''.join(bracket_roles[guild_str][str(player.id)])
-                            player_name = f"{player_name} {emojis}"
-                        team_a_display.append(player_name)
-
-                    for player in team_b:
-                        player_name = get_player_display_name(player, interaction.guild.id)
-                        if guild_str in bracket_roles and str(player.id) in bracket_roles[guild_str] and not isinstance(player, FakePlayer):
-                            emojis = ''.join(bracket_roles[guild_str][str(player.id)])
-                            player_name = f"{player_name} {emojis}"
-                        team_b_display.append(player_name)
-
-                    team_a_str = " & ".join(team_a_display)
-                    team_b_str = " & ".join(team_b_display)
-
-                    embed.add_field(
-                        name=f"⚔️ Match {i}",
-                        value=f"**{team_a_str}** <:VS:1402690899485655201> **{team_b_str}**\n<:Crown:1409926966236283012> Winner: *Waiting...*",
-                        inline=False
-                    )
+            if tournament.active and not was_active:
+                await interaction.followup.send("✅ Tournament started successfully!", ephemeral=True)
             else:
-                for i, match in enumerate(current_round, 1):
-                    a, b = match
-                    # Get bracket names
-                    player_a = get_player_display_name(a, interaction.guild.id)
-                    player_b = get_player_display_name(b, interaction.guild.id)
-
-                    guild_str = str(interaction.guild.id)
-                    if guild_str in bracket_roles and str(a.id) in bracket_roles[guild_str] and not isinstance(a, FakePlayer):
-                        emojis = ''.join(bracket_roles[guild_str][str(a.id)])
-                        player_a = f"{player_a} {emojis}"
-
-                    if guild_str in bracket_roles and str(b.id) in bracket_roles[guild_str] and not isinstance(b, FakePlayer):
-                        emojis = ''.join(bracket_roles[guild_str][str(b.id)])
-                        player_b = f"{player_b} {emojis}"
-
-                    embed.add_field(
-                        name=f"⚔️ Match {i}",
-                        value=f"**{player_a}** <:VS:1402690899485655201> **{player_b}**\n<:Crown:1409926966236283012> Winner: *Waiting...*",
-                        inline=False
-                    )
-
-            embed.set_footer(text="Use !winner @player to record match results")
-
-            # Create a new view without buttons for active tournament
-            active_tournament_view = discord.ui.View()
-            tournament.message = await interaction.channel.send(embed=embed, view=active_tournament_view)
-            await interaction.followup.send("✅ Tournament started successfully!", ephemeral=True)
+                await interaction.followup.send("❌ The tournament could not be started, see the channel for why.", ephemeral=True)
 
         except Exception as e:
             print(f"Error in start_tournament: {e}")
@@ -833,12 +1261,13 @@ class TournamentView(discord.ui.View):
 
 class TeamInvitationView(discord.ui.View):
     def __init__(self, inviter, invitee, guild_id):
-        super().__init__(timeout=300)  # 5 minute timeout
+        super().__init__(timeout=INVITATION_MINUTES * 60)
         self.inviter = inviter
         self.invitee = invitee
         self.guild_id = guild_id
 
     async def on_timeout(self):
+        team_invitations.remove(self.guild_id, self.inviter.id, self.invitee.id)
         # Disable all buttons when timeout occurs
         for item in self.children:
             item.disabled = True
@@ -854,7 +1283,9 @@ class TeamInvitationView(discord.ui.View):
             return await interaction.response.send_message("❌ This invitation is not for you.", ephemeral=True)
 
         guild_id = self.guild_id
-        guild_str = str(guild_id)
+
+        if not team_invitations.is_pending(guild_id, self.inviter.id, self.invitee.id):
+            return await interaction.response.send_message("❌ This invitation has expired.", ephemeral=True)
 
         # Check if users are already in teams
         inviter_team = get_team_id(guild_id, self.inviter.id)
@@ -868,9 +1299,7 @@ class TeamInvitationView(discord.ui.View):
         team_id = create_team(guild_id, self.inviter, self.invitee)
 
         # Remove invitation
-        if guild_str in team_invitations and str(self.invitee.id) in team_invitations[guild_str]:
-            if self.inviter.id in team_invitations[guild_str][str(self.invitee.id)]:
-                team_invitations[guild_str][str(self.invitee.id)].remove(self.inviter.id)
+        team_invitations.remove(guild_id, self.inviter.id, self.invitee.id)
 
         team_name = get_team_display_name(guild_id, [self.inviter, self.invitee])
 
@@ -881,22 +1310,15 @@ class TeamInvitationView(discord.ui.View):
         await interaction.response.edit_message(content=f"✅ Team created: **{team_name}**", view=self)
 
         # Notify inviter
-        try:
-            await self.inviter.send(f"✅ {self.invitee.display_name} accepted your team invitation! Team: **{team_name}**")
-        except:
-            pass
+        dm_service.send(self.inviter, f"✅ {self.invitee.display_name} accepted your team invitation! Team: **{team_name}**")
 
     @discord.ui.button(label="Reject", style=discord.ButtonStyle.red)
     async def reject_invitation(self, interaction: discord.Interaction, button: discord.ui.Button):
         if interaction.user.id != self.invitee.id:
             return await interaction.response.send_message("❌ This invitation is not for you.", ephemeral=True)
 
-        guild_str = str(self.guild_id)
-
         # Remove invitation
-        if guild_str in team_invitations and str(self.invitee.id) in team_invitations[guild_str]:
-            if self.inviter.id in team_invitations[guild_str][str(self.invitee.id)]:
-                team_invitations[guild_str][str(self.invitee.id)].remove(self.inviter.id)
+        team_invitations.remove(self.guild_id, self.inviter.id, self.invitee.id)
 
         # Disable buttons
         for item in self.children:
@@ -905,10 +1327,80 @@ class TeamInvitationView(discord.ui.View):
         await interaction.response.edit_message(content="❌ Team invitation rejected.", view=self)
 
         # Notify inviter
-        try:
-            await self.inviter.send(f"❌ {self.invitee.display_name} rejected your team invitation.")
-        except:
-            pass
+        dm_service.send(self.inviter, f"❌ {self.invitee.display_name} rejected your team invitation.")
+
+# Static part of the hoster registration embed, the hoster list and slots are added per session
+HOSTER_EMBED_TEMPLATES = {
+    'open': {
+        'title': "🎯 Hoster Registration",
+        'description': "Here the hosters will register to host tournaments!",
+        'color': 0x00ff00
+    },
+    'closed': {
+        'title': "🎯 Hoster Registration - CLOSED",
+        'description': "Hoster registration has been closed by a moderator.",
+        'color': 0xff0000
+    }
+}
+
+def create_hoster_session(guild_id, event, max_hosters, channel_id):
+    """Start a hoster registration session, replacing an earlier one for the same event"""
+    session = {
+        'event': event,
+        'active': True,
+        'max_hosters': max_hosters,
+        'hosters': [],  # User IDs in registration order
+        'hoster_set': set(),  # Same IDs for O(1) membership checks, not saved
+        'channel_id': channel_id,
+        'message_id': None,
+        'created': datetime.now().isoformat()
+    }
+    host_registrations.setdefault(str(guild_id), {})[event] = session
+    return session
+
+def prune_hoster_sessions(guild_id):
+    """Drop a guild's hoster sessions older than HOSTER_SESSION_HOURS, returns the sessions left"""
+    guild_str = str(guild_id)
+    guild_sessions = host_registrations.get(guild_str, {})
+    expired_before = (datetime.now() - timedelta(hours=HOSTER_SESSION_HOURS)).isoformat()
+    expired = [event for event, session in guild_sessions.items() if session['created'] < expired_before]
+    for event in expired:
+        del guild_sessions[event]
+    if expired:
+        if not guild_sessions:
+            host_registrations.pop(guild_str, None)
+        save_data()
+    return guild_sessions
+
+def get_hoster_session(guild_id, message_id):
+    """Find the hoster registration session that owns a registration message"""
+    for session in prune_hoster_sessions(guild_id).values():
+        if session['message_id'] == message_id:
+            return session
+    return None
+
+def build_hoster_embed(guild, session):
+    """Rebuild a session's registration embed from the cached template"""
+    closed = not session['active']
+    template = HOSTER_EMBED_TEMPLATES['closed' if closed else 'open']
+    title = template['title']
+    if session['event'] != "default":
+        title += f" - {session['event']}"
+    embed = discord.Embed(title=title, description=template['description'], color=template['color'])
+
+    hoster_list = ""
+    for i, hoster_id in enumerate(session['hosters'], 1):
+        hoster = guild.get_member(hoster_id)
+        if hoster:
+            hoster_name = hoster.nick if hoster.nick else hoster.display_name
+        else:
+            hoster_name = f"<@{hoster_id}>"
+        hoster_list += f"{i}. {hoster_name}\n"
+
+    prefix = "Final " if closed else ""
+    embed.add_field(name=f"{prefix}Hosters registered:", value=hoster_list or ("None" if closed else "None yet"), inline=False)
+    embed.add_field(name=f"{prefix}Slots:", value=f"{len(session['hosters'])}/{session['max_hosters']}", inline=True)
+    return embed
 
 class HosterRegistrationView(discord.ui.View):
     def __init__(self):
@@ -919,67 +1411,37 @@ class HosterRegistrationView(discord.ui.View):
 
     @discord.ui.button(label="Register", style=discord.ButtonStyle.green, custom_id="hoster_register")
     async def register_hoster(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not host_registrations['active']:
+        session = get_hoster_session(interaction.guild.id, interaction.message.id)
+        if not session or not session['active']:
             return await interaction.response.send_message("❌ Hoster registration is not active.", ephemeral=True)
 
-        if interaction.user in host_registrations['hosters']:
+        if interaction.user.id in session['hoster_set']:
             return await interaction.response.send_message("❌ You are already registered as a hoster.", ephemeral=True)
 
-        if len(host_registrations['hosters']) >= host_registrations['max_hosters']:
+        if len(session['hosters']) >= session['max_hosters']:
             return await interaction.response.send_message("❌ Maximum number of hosters reached.", ephemeral=True)
 
-        host_registrations['hosters'].append(interaction.user)
-
-        # Update the embed
-        embed = discord.Embed(
-            title="🎯 Hoster Registration",
-            description="Here the hosters will register to host tournaments!",
-            color=0x00ff00
-        )
-
-        if host_registrations['hosters']:
-            hoster_list = ""
-            for i, hoster in enumerate(host_registrations['hosters'], 1):
-                hoster_name = hoster.nick if hoster.nick else hoster.display_name
-                hoster_list += f"{i}. {hoster_name}\n"
-            embed.add_field(name="Hosters registered:", value=hoster_list, inline=False)
-        else:
-            embed.add_field(name="Hosters registered:", value="None yet", inline=False)
-
-        embed.add_field(name="Slots:", value=f"{len(host_registrations['hosters'])}/{host_registrations['max_hosters']}", inline=True)
+        session['hosters'].append(interaction.user.id)
+        session['hoster_set'].add(interaction.user.id)
+        save_data()
 
-        await interaction.response.edit_message(embed=embed, view=self)
+        await interaction.response.edit_message(embed=build_hoster_embed(interaction.guild, session), view=self)
         await interaction.followup.send(f"✅ {interaction.user.display_name} registered as a hoster!", ephemeral=True)
 
     @discord.ui.button(label="Unregister", style=discord.ButtonStyle.red, custom_id="hoster_unregister")
     async def unregister_hoster(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not host_registrations['active']:
+        session = get_hoster_session(interaction.guild.id, interaction.message.id)
+        if not session or not session['active']:
             return await interaction.response.send_message("❌ Hoster registration is not active.", ephemeral=True)
 
-        if interaction.user not in host_registrations['hosters']:
+        if interaction.user.id not in session['hoster_set']:
             return await interaction.response.send_message("❌ You are not registered as a hoster.", ephemeral=True)
 
-        host_registrations['hosters'].remove(interaction.user)
-
-        # Update the embed
-        embed = discord.Embed(
-            title="🎯 Hoster Registration",
-            description="Here the hosters will register to host tournaments!",
-            color=0x00ff00
-        )
-
-        if host_registrations['hosters']:
-            hoster_list = ""
-            for i, hoster in enumerate(host_registrations['hosters'], 1):
-                hoster_name = hoster.nick if hoster.nick else hoster.display_name
-                hoster_list += f"{i}. {hoster_name}\n"
-            embed.add_field(name="Hosters registered:", value=hoster_list, inline=False)
-        else:
-            embed.add_field(name="Hosters registered:", value="None yet", inline=False)
-
-        embed.add_field(name="Slots:", value=f"{len(host_registrations['hosters'])}/{host_registrations['max_hosters']}", inline=True)
+        session['hosters'].remove(interaction.user.id)
+        session['hoster_set'].discard(interaction.user.id)
+        save_data()
 
-        await interaction.response.edit_message(embed=embed, view=self)
+        await interaction.response.edit_message(embed=build_hoster_embed(interaction.guild, session), view=self)
         await interaction.followup.send(f"✅ {interaction.user.display_name} unregistered from hosting.", ephemeral=True)
 
     @discord.ui.button(label="End Register", style=discord.ButtonStyle.secondary, custom_id="end_hoster_register")
@@ -987,46 +1449,28 @@ class HosterRegistrationView(discord.ui.View):
         if not has_permission(interaction.user, interaction.guild.id, 'tlr') and not interaction.user.guild_permissions.manage_channels:
             return await interaction.response.send_message("❌ You don't have permission to end registration.", ephemeral=True)
 
-        host_registrations['active'] = False
-
-        # Keep the existing embed but disable all buttons
-        embed = discord.Embed(
-            title="🎯 Hoster Registration - CLOSED",
-            description="Hoster registration has been closed by a moderator.",
-            color=0xff0000
-        )
-
-        if host_registrations['hosters']:
-            hoster_list = ""
-            for i, hoster in enumerate(host_registrations['hosters'], 1):
-                hoster_name = hoster.nick if hoster.nick else hoster.display_name
-                hoster_list += f"{i}. {hoster_name}\n"
-            embed.add_field(name="Final Hosters registered:", value=hoster_list, inline=False)
-        else:
-            embed.add_field(name="Final Hosters registered:", value="None", inline=False)
+        session = get_hoster_session(interaction.guild.id, interaction.message.id)
+        if not session:
+            return await interaction.response.send_message("❌ Hoster registration is not active.", ephemeral=True)
 
-        embed.add_field(name="Final Slots:", value=f"{len(host_registrations['hosters'])}/{host_registrations['max_hosters']}", inline=True)
+        session['active'] = False
+        save_data()
 
         # Disable all buttons
         for item in self.children:
             item.disabled = True
 
-        await interaction.response.edit_message(embed=embed, view=self)
+        await interaction.response.edit_message(embed=build_hoster_embed(interaction.guild, session), view=self)
 
-# Global host registrations
-host_registrations = {
-    'active': False,
-    'max_hosters': 0,
-        'hosters': [],
-    'channel': None,
-    'message': None
-}
+# Hoster registration sessions
+host_registrations = {}  # {guild_id: {event: session}}, see create_hoster_session
+HOSTER_SESSION_HOURS = 24  # Hosters of a session get match assignments for this long after it was started
 
 # Bracket roles data
 bracket_roles = {}
 
 @bot.command()
-async def create(ctx, channel: discord.TextChannel):
+async def create(ctx, channel: discord.TextChannel, preset: str = None):
     try:
         await ctx.message.delete()
     except Exception as e:
@@ -1036,8 +1480,21 @@ async def create(ctx, channel: discord.TextChannel):
     if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
         return await ctx.send("❌ You don't have permission to create tournaments.", delete_after=5)
 
-    tournament = get_tournament(ctx.guild.id)
-    tournament.target_channel = channel
+    if preset:
+        # Quick-create: post the registration message straight from a saved preset
+        name = preset.removeprefix("preset:").lower()
+        settings = tournament_presets.get(str(ctx.guild.id), {}).get(name)
+        if not settings:
+            return await ctx.send(f"❌ No preset named `{name}`. Use `!preset list` to see the saved presets.", delete_after=5)
+
+        tournament, error = await open_tournament(ctx.guild.id, channel, settings)
+        if error:
+            return await ctx.send(f"{error} (preset `{name}`)", delete_after=10)
+
+        await ctx.send(f"✅ Tournament created from preset `{name}` in {channel.mention}! (ID: {tournament.id})", delete_after=10)
+        details = f"Preset: {name}, ID: {tournament.id}, Target channel: {channel.mention}"
+        await log_command(ctx.guild.id, ctx.author, "!create", details)
+        return
 
     embed= discord.Embed(
         title="🏆 Tournament Setup",
@@ -1051,190 +1508,1683 @@ async def create(ctx, channel: discord.TextChannel):
     await log_command(ctx.guild.id, ctx.author, "!create", f"Target channel: {channel.mention}")
 
 @bot.command()
-async def start(ctx):
+async def preset(ctx, action: str = None, name: str = None, *, details: str = None):
+    """Save, list or delete the tournament presets !create can post from"""
     try:
         await ctx.message.delete()
     except:
         pass
 
     if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
-        return await ctx.send("❌ You don't have permission to start tournaments.", delete_after=5)
+        return await ctx.send("❌ You don't have permission to manage tournament presets.", delete_after=5)
 
-    tournament = get_tournament(ctx.guild.id)
+    guild_str = str(ctx.guild.id)
+    guild_presets = tournament_presets.get(guild_str, {})
+    action = (action or "").lower()
+    name = name.lower() if name else None
+
+    if action == "list":
+        if not guild_presets:
+            return await ctx.send("📋 No presets saved yet. Use `!preset save <name> ...` to add one.", delete_after=10)
+        embed = discord.Embed(title="📋 Tournament Presets", color=0x3498db)
+        for preset_name, settings in sorted(guild_presets.items()):
+            sp_table = " ".join(str(sp) for sp in settings.get('sp_rewards') or DEFAULT_SP_REWARDS)
+            embed.add_field(
+                name=f"{preset_name} - {settings['title']}",
+                value=f"{settings['setup']} • {settings['map']} • {settings['abilities']}\nPrize: {settings['prize']} • SP: {sp_table}",
+                inline=False
+            )
+        embed.set_footer(text="Create one with !create #channel preset:<name>")
+        return await ctx.send(embed=embed)
+
+    if action == "delete" and name:
+        if name not in guild_presets:
+            return await ctx.send(f"❌ No preset named `{name}`.", delete_after=5)
+        del guild_presets[name]
+        if not guild_presets:
+            tournament_presets.pop(guild_str, None)
+        save_data()
+        await ctx.send(f"🗑️ Preset `{name}` deleted.", delete_after=5)
+        await log_command(ctx.guild.id, ctx.author, "!preset delete", f"Preset: {name}")
+        return
 
-    await log_command(ctx.guild.id, ctx.author, "!start", f"Players: {len(tournament.players)}")
+    if action == "save" and name and details:
+        fields = [field.strip() for field in details.split("|")]
+        if len(fields) not in [5, 6] or not all(fields):
+            return await ctx.send("❌ Use: `!preset save <name> <title> | <map> | <abilities> | <mode maxplayers [format]> | <prize> [| <sp table>]`", delete_after=15)
+        if name not in guild_presets and len(guild_presets) >= MAX_PRESETS:
+            return await ctx.send(f"❌ This server already has {MAX_PRESETS} presets. Delete one first.", delete_after=10)
+        title, map_name, abilities, setup, prize = fields[:5]
+        _, error = parse_tournament_setup(setup)
+        if error:
+            return await ctx.send(error, delete_after=10)
+        sp_rewards = parse_sp_rewards(fields[5]) if len(fields) == 6 else list(DEFAULT_SP_REWARDS)
+        if sp_rewards is None:
+            return await ctx.send(f"❌ SP table must be 1 to {MAX_SP_PLACES} whole numbers for 1st place onwards (e.g., '5 3 2 1').", delete_after=10)
+
+        tournament_presets.setdefault(guild_str, {})[name] = {
+            'title': title,
+            'map': map_name,
+            'abilities': abilities,
+            'setup': setup,
+            'prize': prize,
+            'sp_rewards': sp_rewards,
+        }
+        save_data()
+        await ctx.send(f"✅ Preset `{name}` saved. Post it with `!create #channel preset:{name}`", delete_after=10)
+        await log_command(ctx.guild.id, ctx.author, "!preset save", f"Preset: {name}, Setup: {setup}, SP: {sp_rewards}")
+        return
 
-    if tournament.max_players == 0:
-        return await ctx.send("❌ No tournament has been created yet. Use `!create #channel` first.", delete_after=5)
+    await ctx.send("❌ Use: `!preset save <name> <title> | <map> | <abilities> | <mode maxplayers [format]> | <prize> [| <sp table>]`, `!preset list` or `!preset delete <name>`", delete_after=15)
 
-    if tournament.active:
-        return await ctx.send("❌ Tournament already started.", delete_after=5)
+@bot.command()
+async def schedule(ctx, preset: str = None, channel: discord.TextChannel = None, start_after: int = None, *, when: str = None):
+    """Open a tournament from a preset at a set time or on a weekly pattern, and start it start_after minutes later"""
+    try:
+        await ctx.message.delete()
+    except:
+        pass
 
-    if len(tournament.players) < 2:
-        return await ctx.send("❌ Not enough players to start tournament (minimum 2 players).", delete_after=5)
+    if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to schedule tournaments.", delete_after=5)
 
-    # Auto-fill with bots to make even number
-    if tournament.mode == "2v2":
-        current_teams = len(tournament.players) // 2
-        bots_added = 0
-        # Add bots one by one until we have an even number of teams
-        while current_teams % 2 != 0:
-            # Create bot team
-            bot1_name = f"Bot{tournament.fake_count}"
-            bot1_id = 761557952975420886 + tournament.fake_count
-            bot1 = FakePlayer(bot1_name, bot1_id)
-            tournament.fake_count += 1
+    usage = "❌ Use: `!schedule <preset> #channel <minutes until start> <when>`, when is `18:00`, `2026-10-20 18:00`, `daily 18:00`, `weekdays 18:00`, `weekends 18:00` or `mon,wed,fri 18:00`"
+    if not preset or not channel or start_after is None or not when:
+        return await ctx.send(usage, delete_after=20)
 
-            bot2_name = f"Bot{tournament.fake_count}"
-            bot2_id = 761557952975420886 + tournament.fake_count
-            bot2 = FakePlayer(bot2_name, bot2_id)
-            tournament.fake_count += 1
+    guild_str = str(ctx.guild.id)
+    preset = preset.removeprefix("preset:").lower()
+    if preset not in tournament_presets.get(guild_str, {}):
+        return await ctx.send(f"❌ No preset named `{preset}`. Use `!preset list` to see the saved presets.", delete_after=5)
+    if start_after < 1 or start_after > MAX_START_AFTER_MINUTES:
+        return await ctx.send(f"❌ The tournament must start between 1 and {MAX_START_AFTER_MINUTES} minutes after registration opens.", delete_after=10)
+
+    now = datetime.now()
+    when = when.strip().lower()
+    if len(when.split()) == 1:
+        # A bare time is a one-off at its next occurrence
+        run = next_occurrence(f"daily {when}", now) if parse_schedule_time(f"daily {when}") else None
+        when = f"{run:%Y-%m-%d %H:%M}" if run else when
+    if not parse_schedule_time(when):
+        return await ctx.send(usage, delete_after=20)
+    next_run = next_occurrence(when, now)
+    if not next_run:
+        return await ctx.send("❌ That time has already passed.", delete_after=5)
+
+    guild_schedules = tournament_schedules.setdefault(guild_str, {})
+    if len(guild_schedules) >= MAX_SCHEDULES:
+        return await ctx.send(f"❌ This server already has {MAX_SCHEDULES} schedules. Remove one with `!unschedule <id>` first.", delete_after=10)
+    schedule_id = str(max((int(existing) for existing in guild_schedules), default=0) + 1)
+    guild_schedules[schedule_id] = {
+        'preset': preset,
+        'channel_id': channel.id,
+        'when': when,
+        'start_after': start_after,
+        'next_run': next_run.isoformat(),
+        'tournament_id': None,
+        'start_at': None,
+    }
+    heapq.heappush(schedule_timers, (next_run, guild_str, schedule_id, "open"))
+    save_data()
 
-            tournament.players.extend([bot1, bot2])
-            current_teams += 1
-            bots_added += 1
+    await ctx.send(f"✅ Schedule {schedule_id}: preset `{preset}` opens in {channel.mention} {when}, starting {start_after} minutes later. Next: {next_run.strftime('%d.%m.%Y %H:%M')}", delete_after=15)
+    await log_command(ctx.guild.id, ctx.author, "!schedule", f"Schedule {schedule_id}, Preset: {preset}, Channel: {channel.mention}, When: {when}, Start after: {start_after} minutes")
 
-        if bots_added > 0:
-            await ctx.send(f"Adding {bots_added} bot team(s) to make even bracket...", delete_after=5)
+@bot.command()
+async def schedules(ctx):
+    """List this server's tournament schedules"""
+    try:
+        await ctx.message.delete()
+    except:
+        pass
 
-        # Group players by teams (keep real teams together)
-        team_groups = []
-        processed_players = set()
+    guild_schedules = tournament_schedules.get(str(ctx.guild.id), {})
+    if not guild_schedules:
+        return await ctx.send("📅 No tournaments scheduled. Use `!schedule <preset> #channel <minutes> <when>` to add one.", delete_after=10)
+
+    embed = discord.Embed(title="📅 Scheduled Tournaments", color=0x3498db)
+    for schedule_id, schedule in sorted(guild_schedules.items(), key=lambda item: int(item[0])):
+        lines = [f"<#{schedule['channel_id']}> • {schedule['when']} • starts after {schedule['start_after']} min"]
+        if schedule.get('next_run'):
+            lines.append(f"Next: {datetime.fromisoformat(schedule['next_run']).strftime('%d.%m.%Y %H:%M')}")
+        if schedule.get('start_at'):
+            lines.append(f"Tournament {schedule['tournament_id']} starts {datetime.fromisoformat(schedule['start_at']).strftime('%H:%M')}")
+        embed.add_field(name=f"{schedule_id} - {schedule['preset']}", value="\n".join(lines), inline=False)
+    embed.set_footer(text="Remove one with !unschedule <id>")
+    await ctx.send(embed=embed)
 
-        for player in tournament.players:
-            if player in processed_players or isinstance(player, FakePlayer):
-                continue
+@bot.command()
+async def unschedule(ctx, schedule_id: str = None):
+    """Remove a tournament schedule, a tournament it already opened stays open"""
+    try:
+        await ctx.message.delete()
+    except:
+        pass
 
-            team_id = get_team_id(ctx.guild.id, player.id)
-            if team_id:
-                teammate = get_teammate(ctx.guild.id, player.id)
-                if teammate and teammate in tournament.players:
-                    team_groups.append([player, teammate])
-                    processed_players.add(player)
-                    processed_players.add(teammate)
-                else:
-                    # Player has team but teammate not in tournament
-                    team_groups.append([player])
-                    processed_players.add(player)
-            else:
-                # Player not in a team
-                team_groups.append([player])
-                processed_players.add(player)
-
-        # Add fake player teams
-        fake_players = [p for p in tournament.players if isinstance(p, FakePlayer)]
-        for i in range(0, len(fake_players), 2):
-            if i + 1 < len(fake_players):
-                team_groups.append([fake_players[i], fake_players[i+1]])
-
-        # Shuffle team order but keep teammates together
-        random.shuffle(team_groups)
-        tournament.players = []
-        for team in team_groups:
-            tournament.players.extend(team)
+    if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to remove schedules.", delete_after=5)
 
-    else:
-        bots_added = 0
-        # Add bots one by one until we have an even number of players
-        while len(tournament.players) % 2 != 0:
-            bot_name = f"Bot{tournament.fake_count}"
-            bot_id = 761557952975420886 + tournament.fake_count
-            bot = FakePlayer(bot_name, bot_id)
-            tournament.players.append(bot)
-            tournament.fake_count += 1
-            bots_added += 1
+    guild_str = str(ctx.guild.id)
+    guild_schedules = tournament_schedules.get(guild_str, {})
+    if schedule_id not in guild_schedules:
+        return await ctx.send("❌ No schedule with that ID. Use `!schedules` to see them.", delete_after=5)
+
+    # Drop its timer heap entries too, a new schedule can get the same ID and time
+    removed = guild_schedules.pop(schedule_id)
+    schedule_timers[:] = [entry for entry in schedule_timers if entry[1:3] != (guild_str, schedule_id)]
+    heapq.heapify(schedule_timers)
+    if not guild_schedules:
+        tournament_schedules.pop(guild_str, None)
+    save_data()
 
-        if bots_added > 0:
-            await ctx.send(f"Adding {bots_added} bot player(s) to make even bracket...", delete_after=5)
+    note = f" Tournament {removed['tournament_id']} stays open, start it with `!start`." if removed.get('tournament_id') in tournaments else ""
+    await ctx.send(f"🗑️ Schedule {schedule_id} removed.{note}", delete_after=10)
+    await log_command(ctx.guild.id, ctx.author, "!unschedule", f"Schedule {schedule_id}, Preset: {removed['preset']}")
 
-        # Shuffle players for 1v1
-        random.shuffle(tournament.players)
+@bot.command()
+async def start(ctx, tournament_id: str = None):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
 
-    tournament.active = True
-    tournament.results = []
-    tournament.rounds = []
+    if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to start tournaments.", delete_after=5)
 
-    if tournament.mode == "2v2":
-        # Create team pairs for 2v2
-        team_pairs = []
-        for i in range(0, len(tournament.players), 4):
-            team_a = [tournament.players[i], tournament.players[i+1]]
-            team_b = [tournament.players[i+2], tournament.players[i+3]]
-            team_pairs.append((team_a, team_b))
-        tournament.rounds.append(team_pairs)
-        current_round = team_pairs
-    else:
-        round_pairs = [(tournament.players[i], tournament.players[i+1]) for i in range(0, len(tournament.players), 2)]
-        tournament.rounds.append(round_pairs)
-        current_round = round_pairs
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
 
-    embed = discord.Embed(
-        title=f"🏆 {tournament.title} - Round 1",
-        description=f"**Map:** {tournament.map}\n**Abilities:** {tournament.abilities}",
-        color=0x3498db
-    )
+    if not tournament or tournament.max_players == 0:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
 
-    if tournament.mode == "2v2":
-        for i, match in enumerate(current_round, 1):
-            team_a, team_b = match
-            # Get bracket names for team members WITH emojis
-            team_a_display = []
-            team_b_display = []
-
-            guild_str = str(ctx.guild.id)
-
-            for player in team_a:
-                player_name = get_player_display_name(player, ctx.guild.id)
-                if guild_str in bracket_roles and str(player.id) in bracket_roles[guild_str] and not isinstance(player, FakePlayer):
-                    emojis = ''.join(bracket_roles[guild_str][str(player.id)])
-                    player_name = f"{player_name} {emojis}"
-                team_a_display.append(player_name)
-
-            for player in team_b:
-                player_name = get_player_display_name(player, ctx.guild.id)
-                if guild_str in bracket_roles and str(player.id) in bracket_roles[guild_str] and not isinstance(player, FakePlayer):
-                    emojis = ''.join(bracket_roles[guild_str][str(player.id)])
-                    player_name = f"{player_name} {emojis}"
-                team_b_display.append(player_name)
-
-            team_a_str = " & ".join(team_a_display)
-            team_b_str = " & ".join(team_b_display)
+    await log_command(ctx.guild.id, ctx.author, "!start", f"Tournament {tournament.id}, Players: {len(tournament.players)}")
+    await start_tournament(ctx, tournament)
 
-            embed.add_field(
-                name=f"⚔️ Match {i}",
-                value=f"**{team_a_str}** <:VS:1402690899485655201> **{team_b_str}**\n<:Crown:1409926966236283012> Winner: *Waiting...*",
-                inline=False
-            )
-    else:
-        for i, match in enumerate(current_round, 1):
-            a, b = match
-            # Get bracket names
-            player_a = get_player_display_name(a, ctx.guild.id)
-            player_b = get_player_display_name(b, ctx.guild.id)
+async def start_tournament(ctx, tournament):
+    """Close registration and post the first round, the tournament stays inactive if it can't start"""
+    async with tournament_lock(tournament, "start"):
+        if tournament.active:
+            return await ctx.send("❌ Tournament already started.", delete_after=5)
 
-            guild_str = str(ctx.guild.id)
-            if guild_str in bracket_roles and str(a.id) in bracket_roles[guild_str] and not isinstance(a, FakePlayer):
-                emojis = ''.join(bracket_roles[guild_str][str(a.id)])
-                player_a = f"{player_a} {emojis}"
+        # Rounds are posted here, so commands in this channel default to this tournament
+        bind_tournament_channel(tournament, ctx.channel)
 
-            if guild_str in bracket_roles and str(b.id) in bracket_roles[guild_str] and not isinstance(b, FakePlayer):
-                emojis = ''.join(bracket_roles[guild_str][str(b.id)])
-                player_b = f"{player_b} {emojis}"
+        dropped = prune_unchecked(tournament)
+        if dropped:
+            await ctx.send(f"🚫 Removed {dropped} {'team' if tournament.mode == '2v2' else 'player'}{'s' if dropped != 1 else ''} who didn't check in.", delete_after=10)
 
-            embed.add_field(
-                name=f"⚔️ Match {i}",
-                value=f"**{player_a}** <:VS:1402690899485655201> **{player_b}**\n<:Crown:1409926966236283012> Winner: *Waiting...*",
-                inline=False
+        if tournament.mode == "2v2":
+            formed, leftover = form_solo_teams(ctx.guild.id, tournament)
+            await announce_solo_teams(ctx, ctx.guild.id, tournament, formed, leftover)
+
+        if len(tournament.players) < 2:
+            return await ctx.send("❌ Not enough players to start tournament (minimum 2 players).", delete_after=5)
+
+        if tournament.format != "single":
+            if len(get_entrants(ctx.guild.id, tournament)) < 2:
+                return await ctx.send("❌ Not enough teams to start tournament (minimum 2 teams).", delete_after=5)
+            return await start_bracket_engine(ctx, ctx.guild.id, tournament)
+
+        # Auto-fill with bots to make even number
+        if tournament.mode == "2v2":
+            current_teams = len(tournament.players) // 2
+            bots_added = 0
+            # Add bots one by one until we have an even number of teams
+            while current_teams % 2 != 0:
+                # Create bot team
+                bot1_name = f"Bot{tournament.fake_count}"
+                bot1_id = 761557952975420886 + tournament.fake_count
+                bot1 = FakePlayer(bot1_name, bot1_id)
+                tournament.fake_count += 1
+
+                bot2_name = f"Bot{tournament.fake_count}"
+                bot2_id = 761557952975420886 + tournament.fake_count
+                bot2 = FakePlayer(bot2_name, bot2_id)
+                tournament.fake_count += 1
+
+                tournament.players.extend([bot1, bot2])
+                current_teams += 1
+                bots_added += 1
+
+            if bots_added > 0:
+                await ctx.send(f"Adding {bots_added} bot team(s) to make even bracket...", delete_after=5)
+
+            # Group players by teams (keep real teams together)
+            team_groups = []
+            processed_players = set()
+
+            for player in tournament.players:
+                if player in processed_players or isinstance(player, FakePlayer):
+                    continue
+
+                team_id = get_team_id(ctx.guild.id, player.id)
+                if team_id:
+                    teammate = get_teammate(ctx.guild.id, player.id)
+                    if teammate and teammate in tournament.players:
+                        team_groups.append([player, teammate])
+                        processed_players.add(player)
+                        processed_players.add(teammate)
+                    else:
+                        # Player has team but teammate not in tournament
+                        team_groups.append([player])
+                        processed_players.add(player)
+                else:
+                    # Player not in a team
+                    team_groups.append([player])
+                    processed_players.add(player)
+
+            # Add fake player teams
+            fake_players = [p for p in tournament.players if isinstance(p, FakePlayer)]
+            for i in range(0, len(fake_players), 2):
+                if i + 1 < len(fake_players):
+                    team_groups.append([fake_players[i], fake_players[i+1]])
+
+            # Shuffle team order but keep teammates together
+            random.shuffle(team_groups)
+            tournament.players = []
+            for team in team_groups:
+                tournament.players.extend(team)
+
+        else:
+            bots_added = 0
+            # Add bots one by one until we have an even number of players
+            while len(tournament.players) % 2 != 0:
+                bot_name = f"Bot{tournament.fake_count}"
+                bot_id = 761557952975420886 + tournament.fake_count
+                bot = FakePlayer(bot_name, bot_id)
+                tournament.players.append(bot)
+                tournament.fake_count += 1
+                bots_added += 1
+
+            if bots_added > 0:
+                await ctx.send(f"Adding {bots_added} bot player(s) to make even bracket...", delete_after=5)
+
+            # Shuffle players for 1v1
+            random.shuffle(tournament.players)
+
+        tournament.active = True
+        tournament.results = []
+        tournament.match_winners = {}
+        tournament.rounds = []
+
+        if tournament.mode == "2v2":
+            # Create team pairs for 2v2
+            team_pairs = []
+            for i in range(0, len(tournament.players), 4):
+                team_a = [tournament.players[i], tournament.players[i+1]]
+                team_b = [tournament.players[i+2], tournament.players[i+3]]
+                team_pairs.append((team_a, team_b))
+            tournament.rounds.append(team_pairs)
+            current_round = team_pairs
+        else:
+            round_pairs = [(tournament.players[i], tournament.players[i+1]) for i in range(0, len(tournament.players), 2)]
+            tournament.rounds.append(round_pairs)
+            current_round = round_pairs
+
+        embed = discord.Embed(
+            title=f"🏆 {tournament.title} - Round 1",
+            description=f"**Map:** {tournament.map}\n**Abilities:** {tournament.abilities}",
+            color=0x3498db
+        )
+
+        if tournament.mode == "2v2":
+            for i, match in enumerate(current_round, 1):
+                team_a, team_b = match
+                # Get bracket names for team members WITH emojis
+                team_a_display = []
+                team_b_display = []
+
+                guild_str = str(ctx.guild.id)
+
+                for player in team_a:
+                    player_name = get_player_display_name(player, ctx.guild.id)
+                    if guild_str in bracket_roles and str(player.id) in bracket_roles[guild_str] and not isinstance(player, FakePlayer):
+                        emojis = ''.join(bracket_roles[guild_str][str(player.id)])
+                        player_name = f"{player_name} {emojis}"
+                    team_a_display.append(player_name)
+
+                for player in team_b:
+                    player_name = get_player_display_name(player, ctx.guild.id)
+                    if guild_str in bracket_roles and str(player.id) in bracket_roles[guild_str] and not isinstance(player, FakePlayer):
+                        emojis = ''.join(bracket_roles[guild_str][str(player.id)])
+                        player_name = f"{player_name} {emojis}"
+                    team_b_display.append(player_name)
+
+                team_a_str = " & ".join(team_a_display)
+                team_b_str = " & ".join(team_b_display)
+
+                embed.add_field(
+                    name=f"⚔️ Match {i}",
+                    value=f"**{team_a_str}** <:VS:1402690899485655201> **{team_b_str}**\n<:Crown:1409926966236283012> Winner: *Waiting...*",
+                    inline=False
+                )
+        else:
+            for i, match in enumerate(current_round, 1):
+                a, b = match
+                # Get bracket names
+                player_a = get_player_display_name(a, ctx.guild.id)
+                player_b = get_player_display_name(b, ctx.guild.id)
+
+                guild_str = str(ctx.guild.id)
+                if guild_str in bracket_roles and str(a.id) in bracket_roles[guild_str] and not isinstance(a, FakePlayer):
+                    emojis = ''.join(bracket_roles[guild_str][str(a.id)])
+                    player_a = f"{player_a} {emojis}"
+
+                if guild_str in bracket_roles and str(b.id) in bracket_roles[guild_str] and not isinstance(b, FakePlayer):
+                    emojis = ''.join(bracket_roles[guild_str][str(b.id)])
+                    player_b = f"{player_b} {emojis}"
+
+                embed.add_field(
+                    name=f"⚔️ Match {i}",
+                    value=f"**{player_a}** <:VS:1402690899485655201> **{player_b}**\n<:Crown:1409926966236283012> Winner: *Waiting...*",
+                    inline=False
+                )
+
+        embed.set_footer(text=ROUND_FOOTER)
+
+        tournament.message = await ctx.send(embed=embed, view=build_round_view(tournament))
+        record_round(tournament)
+        await assign_round_hosters(ctx.guild.id, tournament)
+
+class MessageEditor:
+    """Coalesces edits of a message so it gets at most one edit in flight.
+
+    Updates queued while an edit is waiting or in flight are merged, and the most recent
+    state of each edited field (embed, view, ...) always wins.
+    """
+    def __init__(self, debounce=1.0):
+        self.debounce = debounce
+        self.pending = {}  # {message_id: (message, {field: value})}
+        self.tasks = {}  # {message_id: asyncio.Task}
+        self.retry_at = {}  # {message_id: loop time when the message's rate limit bucket frees up}
+        self.locks = {}  # {message_id: asyncio.Lock}
+        self.lock_users = {}  # {message_id: applies holding or waiting for the lock}
+
+    def queue(self, message, **fields):
+        """Queue the latest state of some message fields and schedule a debounced flush"""
+        queued = self.pending.get(message.id, (message, {}))[1]
+        self.pending[message.id] = (message, {**queued, **fields})
+        task = self.tasks.get(message.id)
+        if task is None or task.done():
+            self.tasks[message.id] = asyncio.create_task(self._flush_later(message.id))
+
+    async def flush(self, message):
+        """Apply any pending edit for a message right away"""
+        await self._apply(message.id)
+
+    async def _flush_later(self, message_id):
+        loop = asyncio.get_running_loop()
+        try:
+            while message_id in self.pending:
+                delay = max(self.debounce, self.retry_at.get(message_id, 0) - loop.time())
+                await asyncio.sleep(delay)
+                await self._apply(message_id)
+        finally:
+            self.tasks.pop(message_id, None)
+
+    async def _apply(self, message_id):
+        lock = self.locks.setdefault(message_id, asyncio.Lock())
+        self.lock_users[message_id] = self.lock_users.get(message_id, 0) + 1
+        try:
+            async with lock:
+                if message_id not in self.pending:
+                    return
+                message, fields = self.pending.pop(message_id)
+                try:
+                    await message.edit(**fields)
+                    self.retry_at.pop(message_id, None)
+                except discord.RateLimited as e:
+                    self._requeue(message, fields, e.retry_after)
+                except discord.HTTPException as e:
+                    if e.status == 429:
+                        self._requeue(message, fields, self.debounce * 5)
+                    else:
+                        print(f"Error updating tournament message: {e}")
+                except Exception as e:
+                    print(f"Error updating tournament message: {e}")
+        finally:
+            # Only drop the lock once no other apply waits on it, or a later one would
+            # get a fresh lock and edit alongside the waiter
+            self.lock_users[message_id] -= 1
+            if not self.lock_users[message_id]:
+                del self.lock_users[message_id]
+                if message_id not in self.pending:
+                    self.locks.pop(message_id, None)
+
+    def _requeue(self, message, fields, retry_after):
+        # A newer state queued during the failed edit takes precedence
+        queued = self.pending.get(message.id, (message, {}))[1]
+        self.pending[message.id] = (message, {**fields, **queued})
+        self.retry_at[message.id] = asyncio.get_running_loop().time() + retry_after
+        task = self.tasks.get(message.id)
+        if task is None or task.done():
+            self.tasks[message.id] = asyncio.create_task(self._flush_later(message.id))
+
+round_editor = MessageEditor()
+REGISTRATION_COUNTER_INTERVAL = 2.0  # Seconds between participant counter edits of a registration message
+registration_editor = MessageEditor(debounce=REGISTRATION_COUNTER_INTERVAL)
+
+DM_WORKERS = 10  # DMs in flight at once, keeps bursts well under the global rate limit
+DM_RETRIES = 3  # Extra attempts for transient failures (rate limits, server errors, timeouts)
+DM_CLOSED_TTL = 6 * 60 * 60  # Seconds before a user whose DMs were closed is tried again
+
+class DMService:
+    """Delivers every DM the bot sends from one queue worked by a fixed pool of tasks.
+
+    Identical messages still waiting for the same user are only sent once, transient
+    failures are retried with exponential backoff, and users whose DMs are closed are
+    skipped without an API call until DM_CLOSED_TTL has passed.
+    """
+    def __init__(self, workers=DM_WORKERS):
+        self.worker_count = workers
+        self.loop = None
+        self.queue = None
+        self.workers = []
+        self.pending = {}  # {(user_id, content, embed): future of the queued delivery}
+        self.closed = {}  # {user_id: loop time a send was refused}
+        self.stats = {
+            'queued': 0, 'deduped': 0, 'delivered': 0, 'failed': 0, 'skipped_closed': 0,
+            'retries': 0, 'total_latency': 0.0, 'max_latency': 0.0, 'max_depth': 0,
+        }
+
+    def send(self, recipient, content=None, *, embed=None, view=None):
+        """Queue a DM. Returns a future for (message or None, error or None).
+
+        Callers that don't care about the outcome can drop the future.
+        """
+        loop = self._start()
+        future = loop.create_future()
+        if self.dms_closed(recipient.id):
+            self.stats['skipped_closed'] += 1
+            future.set_result((None, "DMs closed"))
+            return future
+
+        # Messages carrying a view are interactive, each one is sent
+        key = None
+        if view is None:
+            key = (recipient.id, content, json.dumps(embed.to_dict(), sort_keys=True) if embed else None)
+            if key in self.pending:
+                self.stats['deduped'] += 1
+                return self.pending[key]
+            self.pending[key] = future
+
+        self.queue.put_nowait((recipient, content, embed, view, key, future, loop.time()))
+        self.stats['queued'] += 1
+        self.stats['max_depth'] = max(self.stats['max_depth'], self.queue.qsize())
+        return future
+
+    def dms_closed(self, user_id):
+        """Whether a recent send to this user was refused"""
+        refused_at = self.closed.get(user_id)
+        if refused_at is None:
+            return False
+        if asyncio.get_running_loop().time() - refused_at < DM_CLOSED_TTL:
+            return True
+        del self.closed[user_id]
+        return False
+
+    def depth(self):
+        return self.queue.qsize() if self.queue else 0
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # First use, or the bot was restarted on a new event loop
+            self.loop = loop
+            self.queue = asyncio.Queue()
+            self.workers = []
+            self.pending.clear()
+        self.workers = [worker for worker in self.workers if not worker.done()]
+        while len(self.workers) < self.worker_count:
+            self.workers.append(loop.create_task(self._work()))
+        return loop
+
+    async def _work(self):
+        while True:
+            recipient, content, embed, view, key, future, queued_at = await self.queue.get()
+            # Later identical messages queue a new delivery once this one is under way
+            if key is not None and self.pending.get(key) is future:
+                del self.pending[key]
+            try:
+                message, error = await self._deliver(recipient, content, embed, view)
+            except Exception as e:
+                message, error = None, str(e) or type(e).__name__
+
+            latency = self.loop.time() - queued_at
+            if error is None:
+                self.stats['delivered'] += 1
+                self.stats['total_latency'] += latency
+                self.stats['max_latency'] = max(self.stats['max_latency'], latency)
+            else:
+                self.stats['failed'] += 1
+            if not future.done():
+                future.set_result((message, error))
+            self.queue.task_done()
+
+    async def _deliver(self, recipient, content, embed, view):
+        fields = {key: value for key, value in (('embed', embed), ('view', view)) if value is not None}
+        for attempt in range(DM_RETRIES + 1):
+            if attempt:
+                self.stats['retries'] += 1
+            try:
+                message = await recipient.send(content, **fields)
+                self.closed.pop(recipient.id, None)
+                return message, None
+            except discord.Forbidden:
+                self.closed[recipient.id] = self.loop.time()
+                return None, "DMs closed"
+            except discord.RateLimited as e:
+                delay = e.retry_after
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    retry_after = e.response.headers.get('Retry-After') if e.response is not None else None
+                    delay = float(retry_after) if retry_after else 2 ** attempt
+                elif e.status >= 500:
+                    delay = 2 ** attempt
+                else:
+                    return None, f"HTTP {e.status}"
+            except (asyncio.TimeoutError, OSError):
+                delay = 2 ** attempt
+            if attempt < DM_RETRIES:
+                await asyncio.sleep(delay)
+        return None, "kept failing"
+
+dm_service = DMService()
+
+async def fan_out_dms(recipients, content, views=None):
+    """DM many users through the DM service and wait for every delivery.
+
+    `views` optionally maps recipients to a view sent along with their DM.
+    Returns [(recipient, seconds until delivered or given up, error or None)] in recipient order.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def deliver(recipient):
+        _, error = await dm_service.send(recipient, content, view=(views or {}).get(recipient))
+        return recipient, loop.time() - started, error
+
+    return await asyncio.gather(*(deliver(recipient) for recipient in recipients))
+
+def summarize_dm_results(results):
+    """Delivery stats line and failure list for a fan_out_dms result"""
+    delivered = [latency for _, latency, error in results if error is None]
+    failed = [
+        f"{recipient.nick if recipient.nick else recipient.display_name} ({error})"
+        for recipient, _, error in results if error is not None
+    ]
+    stats = ""
+    if delivered:
+        stats = f" (avg {sum(delivered) / len(delivered) * 1000:.0f}ms, slowest {max(delivered) * 1000:.0f}ms)"
+    return len(delivered), stats, failed
+
+class HosterScheduler:
+    """Assigns the matches of a round to registered hosters, least loaded hoster first.
+
+    Each hoster works through their matches in order. The head of a queue is the match
+    being hosted, the rest wait and can be moved to another hoster when loads drift apart.
+    """
+    def __init__(self, hosters):
+        self.hosters = {hoster.id: hoster for hoster in hosters}
+        self.queues = {hoster.id: deque() for hoster in hosters}  # {hoster_id: deque(match_index)}
+        self.assignments = {}  # {match_index: hoster_id}
+        self.order = itertools.count()
+        # (load, tie breaker, hoster_id), entries whose load is outdated are skipped when popped
+        self.heap = [(0, next(self.order), hoster.id) for hoster in hosters]
+        heapq.heapify(self.heap)
+        # Same with negated loads to find the busiest hoster
+        self.busy_heap = [(0, next(self.order), hoster.id) for hoster in hosters]
+        heapq.heapify(self.busy_heap)
+
+    def load(self, hoster_id):
+        return len(self.queues[hoster_id])
+
+    def least_loaded(self):
+        while self.heap:
+            load, _, hoster_id = self.heap[0]
+            if hoster_id in self.queues and load == self.load(hoster_id):
+                return hoster_id
+            heapq.heappop(self.heap)
+        return None
+
+    def most_loaded(self):
+        while self.busy_heap:
+            load, _, hoster_id = self.busy_heap[0]
+            if hoster_id in self.queues and -load == self.load(hoster_id):
+                return hoster_id
+            heapq.heappop(self.busy_heap)
+        return None
+
+    def push(self, hoster_id):
+        heapq.heappush(self.heap, (self.load(hoster_id), next(self.order), hoster_id))
+        heapq.heappush(self.busy_heap, (-self.load(hoster_id), next(self.order), hoster_id))
+
+    def assign(self, match_index):
+        """Give a match to the least loaded hoster, returns the hoster"""
+        hoster_id = self.least_loaded()
+        if hoster_id is None:
+            return None
+        self.queues[hoster_id].append(match_index)
+        self.assignments[match_index] = hoster_id
+        self.push(hoster_id)
+        return self.hosters[hoster_id]
+
+    def release(self, match_index):
+        """Free a finished match and rebalance, returns the moves as (match_index, from_hoster, to_hoster)"""
+        hoster_id = self.assignments.pop(match_index, None)
+        if hoster_id is None:
+            return []
+        self.queues[hoster_id].remove(match_index)
+        self.push(hoster_id)
+
+        # Move waiting matches from the busiest hoster while that evens out the loads
+        moves = []
+        while True:
+            idle_id = self.least_loaded()
+            busiest_id = self.most_loaded()
+            if idle_id is None or self.load(busiest_id) - self.load(idle_id) < 2:
+                break
+            moved = self.queues[busiest_id].pop()
+            self.queues[idle_id].append(moved)
+            self.assignments[moved] = idle_id
+            self.push(busiest_id)
+            self.push(idle_id)
+            moves.append((moved, self.hosters[busiest_id], self.hosters[idle_id]))
+        return moves
+
+def get_registered_hosters(guild_id):
+    """Hosters registered in the current hoster registration sessions of a guild.
+
+    Sessions expire HOSTER_SESSION_HOURS after they were started or are removed with
+    !hosterclear, so hosters of past events stop getting matches.
+    """
+    guild = bot.get_guild(guild_id)
+    if not guild:
+        return []
+
+    # Ordered and without duplicates when someone registered for several events
+    hoster_ids = dict.fromkeys(
+        hoster_id
+        for session in prune_hoster_sessions(guild_id).values()
+        for hoster_id in session['hosters']
+    )
+    return [hoster for hoster in map(guild.get_member, hoster_ids) if hoster]
+
+def is_bot_entrant(entrant):
+    members = entrant if isinstance(entrant, list) else [entrant]
+    return all(isinstance(member, FakePlayer) for member in members)
+
+def describe_match(guild_id, tournament, match_index):
+    side_a, side_b = tournament.rounds[-1][match_index]
+    return f"Match {match_index + 1}: {get_entrant_display_name(guild_id, side_a)} vs {get_entrant_display_name(guild_id, side_b)}"
+
+async def assign_round_hosters(guild_id, tournament):
+    """Spread the matches of a freshly posted round over the registered hosters and DM each their batch"""
+    tournament.hoster_scheduler = None
+    hosters = get_registered_hosters(guild_id)
+    if not hosters:
+        return
+
+    scheduler = HosterScheduler(hosters)
+    tournament.hoster_scheduler = scheduler
+    for match_index, (side_a, side_b) in enumerate(tournament.rounds[-1]):
+        # Walkovers against bots don't need a hoster
+        if is_bot_entrant(side_a) or is_bot_entrant(side_b):
+            continue
+        scheduler.assign(match_index)
+
+    for hoster_id, queue in scheduler.queues.items():
+        if not queue:
+            continue
+        match_list = "\n".join(describe_match(guild_id, tournament, match_index) for match_index in queue)
+        dm_service.send(scheduler.hosters[hoster_id], f"🎯 **{tournament.title}** - Round {len(tournament.rounds)}\nYou are hosting these matches, in this order:\n{match_list}")
+
+async def release_match_hoster(guild_id, tournament, match_index):
+    """Free the hoster of a finished match and DM hosters whose matches were moved"""
+    if not tournament.hoster_scheduler:
+        return
+    for moved, from_hoster, to_hoster in tournament.hoster_scheduler.release(match_index):
+        match_text = describe_match(guild_id, tournament, moved)
+        dm_service.send(to_hoster, f"➡️ **{tournament.title}**: you now also host {match_text}")
+        dm_service.send(from_hoster, f"↪️ **{tournament.title}**: {match_text} was moved to {to_hoster.display_name}")
+
+def round_match_finder(tournament):
+    """Lookup from a user ID to the index of their current round match (or None).
+
+    Bracket engines already index entrants by user, plain rounds are indexed once here
+    so callers looking up many players don't scan the round for each of them.
+    """
+    if tournament.bracket:
+        def find(user_id):
+            match = tournament.bracket.match_for(user_id)
+            return match.field_index if match and match.wave == len(tournament.rounds) else None
+        return find
+
+    match_by_user = {}
+    for match_index, sides in enumerate(tournament.rounds[-1] if tournament.rounds else []):
+        for side in sides:
+            for player in (side if isinstance(side, list) else [side]):
+                match_by_user[getattr(player, 'id', None)] = match_index
+    return match_by_user.get
+
+def find_round_match(tournament, user_id):
+    """Index of the current round match a user plays in, or None"""
+    return round_match_finder(tournament)(user_id)
+
+def arm_match_deadline(tournament, match_index):
+    """Start (or restart) the no-show deadline of a current round match"""
+    key = (len(tournament.rounds), match_index)
+    deadline = datetime.now() + timedelta(minutes=tournament.forfeit_minutes)
+    tournament.match_deadlines[key] = deadline
+    tournament.match_presence.setdefault(key, set())
+    heapq.heappush(forfeit_timers, (deadline, tournament.id, *key))
+
+def clear_match_deadline(tournament, match_index):
+    """Stop the no-show deadline of a decided match, its heap entry is skipped when it comes up"""
+    key = (len(tournament.rounds), match_index)
+    tournament.match_deadlines.pop(key, None)
+    tournament.match_presence.pop(key, None)
+
+def confirm_presence(tournament, user_id, round_num=None):
+    """Mark a player as present for their pending match. Returns an error message or None."""
+    match_index = find_round_match(tournament, user_id) if tournament.active else None
+    key = (len(tournament.rounds), match_index)
+    if match_index is None or key not in tournament.match_deadlines or round_num not in (None, key[0]):
+        return "❌ You have no match waiting for you to confirm."
+    tournament.match_presence[key].add(user_id)
+    return None
+
+class MatchPresenceView(discord.ui.View):
+    """Sent with the room code so players can confirm they showed up before the deadline"""
+    def __init__(self, tournament):
+        super().__init__(timeout=tournament.forfeit_minutes * 60)
+        self.tournament_id = tournament.id
+        self.round_num = len(tournament.rounds)
+
+    @discord.ui.button(label="I'm here", style=discord.ButtonStyle.green, emoji="✅")
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        tournament = tournaments.get(self.tournament_id)
+        error = confirm_presence(tournament, interaction.user.id, self.round_num) if tournament else "❌ This tournament is over."
+        await interaction.response.send_message(error or "✅ You're marked as present. Good luck!", ephemeral=True)
+
+class TimerContext:
+    """Stands in for a command context when the bot acts without a command (timers, buttons)"""
+    def __init__(self, channel):
+        self.channel = channel
+        self.guild = channel.guild
+
+    async def send(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+def round_channel(tournament):
+    """Channel the current round is posted in, which isn't the registration channel when started elsewhere"""
+    message = tournament.round_messages[0] if tournament.round_messages else tournament.message
+    return message.channel if message else tournament.channel
+
+async def forfeit_no_show(tournament, round_num, match_index):
+    """Award a match whose deadline passed to the only side that confirmed it is present"""
+    async with tournament_lock(tournament, "forfeit"):
+        key = (round_num, match_index)
+        tournament.match_deadlines.pop(key, None)
+        present = tournament.match_presence.pop(key, set())
+        if not tournament.active or round_num != len(tournament.rounds) or match_index in tournament.match_winners:
+            return
+
+        channel = round_channel(tournament)
+        sides = tournament.rounds[-1][match_index]
+        showed_up = [side for side in sides if all(player_id in present for player_id in get_entrant_ids(side))]
+        if len(showed_up) != 1:
+            if not showed_up:
+                await channel.send(f"⏰ Nobody confirmed for {describe_match(tournament.guild_id, tournament, match_index)}. A host needs to decide this match.", delete_after=60)
+            return
+
+        member = showed_up[0][0] if isinstance(showed_up[0], list) else showed_up[0]
+        match_index, winner_name = await report_match_winner(TimerContext(channel), tournament, member)
+
+    if match_index is not None:
+        await channel.send(f"⏰ {winner_name} wins by forfeit, their opponent didn't show up.", delete_after=30)
+
+@tasks.loop(seconds=FORFEIT_CHECK_INTERVAL)
+async def forfeit_timer():
+    """Forfeit every match whose no-show deadline passed, one loop for all tournaments"""
+    now = datetime.now()
+    while forfeit_timers and forfeit_timers[0][0] <= now:
+        deadline, tournament_id, round_num, match_index = heapq.heappop(forfeit_timers)
+        tournament = tournaments.get(tournament_id)
+        # Entries of decided matches, re-sent codes and finished tournaments are stale
+        if not tournament or tournament.match_deadlines.get((round_num, match_index)) != deadline:
+            continue
+        try:
+            await forfeit_no_show(tournament, round_num, match_index)
+        except Exception as e:
+            print(f"Error forfeiting match: {e}")
+
+@tasks.loop(seconds=INVITATION_SWEEP_INTERVAL)
+async def sweep_invitations():
+    """Evict expired team invitations in one pass"""
+    team_invitations.sweep()
+
+def parse_schedule_time(spec):
+    """Split a schedule like 'daily 18:00', 'mon,fri 18:00', 'weekends 12:30' or '2026-10-20 18:00'.
+
+    Returns (weekdays, date, time of day) with weekdays None for a one-off on date,
+    or None if the schedule is not valid.
+    """
+    parts = spec.lower().split()
+    if len(parts) != 2:
+        return None
+    day_text, time_text = parts
+    try:
+        at = datetime.strptime(time_text, "%H:%M").time()
+    except ValueError:
+        return None
+
+    if day_text == "daily":
+        return set(range(7)), None, at
+    if day_text == "weekdays":
+        return set(range(5)), None, at
+    if day_text == "weekends":
+        return {5, 6}, None, at
+    if all(day in WEEKDAYS for day in day_text.split(",")):
+        return {WEEKDAYS.index(day) for day in day_text.split(",")}, None, at
+    try:
+        return None, datetime.strptime(day_text, "%Y-%m-%d").date(), at
+    except ValueError:
+        return None
+
+def next_occurrence(spec, after):
+    """First time after `after` a schedule fires, None once a one-off has passed"""
+    weekdays, date, at = parse_schedule_time(spec)
+    if date:
+        run = datetime.combine(date, at)
+        return run if run > after else None
+    for offset in range(8):
+        run = datetime.combine(after.date() + timedelta(days=offset), at)
+        if run > after and run.weekday() in weekdays:
+            return run
+    return None
+
+def rebuild_schedule_timers():
+    """Fill the schedule timer heap from the saved schedules"""
+    schedule_timers.clear()
+    for guild_str, guild_schedules in tournament_schedules.items():
+        for schedule_id, schedule in guild_schedules.items():
+            if schedule.get('next_run'):
+                schedule_timers.append((datetime.fromisoformat(schedule['next_run']), guild_str, schedule_id, "open"))
+            if schedule.get('start_at'):
+                schedule_timers.append((datetime.fromisoformat(schedule['start_at']), guild_str, schedule_id, "start"))
+    heapq.heapify(schedule_timers)
+
+def drop_finished_schedule(guild_str, schedule_id, schedule):
+    """Remove a one-off schedule that has nothing left to open or start"""
+    if not schedule.get('next_run') and not schedule.get('start_at'):
+        guild_schedules = tournament_schedules.get(guild_str, {})
+        guild_schedules.pop(schedule_id, None)
+        if not guild_schedules:
+            tournament_schedules.pop(guild_str, None)
+
+def retire_schedule(guild_str, schedule_id, schedule):
+    """Drop a one-off schedule once it has nothing left to open or start, then save"""
+    drop_finished_schedule(guild_str, schedule_id, schedule)
+    save_data()
+
+async def open_scheduled_tournament(guild_str, schedule_id, schedule, run, now):
+    """Post the registration message of a schedule's preset and queue its start"""
+    # Move on to the next occurrence first, so a failed opening doesn't stall the schedule
+    next_run = next_occurrence(schedule['when'], max(run, now))
+    schedule['next_run'] = next_run.isoformat() if next_run else None
+    if next_run:
+        heapq.heappush(schedule_timers, (next_run, guild_str, schedule_id, "open"))
+
+    channel = bot.get_channel(schedule['channel_id'])
+    settings = tournament_presets.get(guild_str, {}).get(schedule['preset'])
+    if now - run > timedelta(minutes=SCHEDULE_GRACE_MINUTES) or not channel or not settings:
+        if not channel or not settings:
+            print(f"Skipping schedule {schedule_id}: channel or preset '{schedule['preset']}' is gone")
+        return retire_schedule(guild_str, schedule_id, schedule)
+
+    tournament, error = await open_tournament(int(guild_str), channel, settings)
+    if error:
+        await channel.send(f"{error} (scheduled preset `{schedule['preset']}`)", delete_after=60)
+        return retire_schedule(guild_str, schedule_id, schedule)
+
+    start_at = now + timedelta(minutes=schedule['start_after'])
+    schedule['tournament_id'] = tournament.id
+    schedule['start_at'] = start_at.isoformat()
+    heapq.heappush(schedule_timers, (start_at, guild_str, schedule_id, "start"))
+    save_data()
+
+    details = f"Schedule {schedule_id}, Preset: {schedule['preset']}, ID: {tournament.id}, Starts: {start_at.strftime('%H:%M')}"
+    await log_command(channel.guild.id, channel.guild.me, "Scheduled Tournament Opened", details)
+
+async def start_scheduled_tournament(guild_str, schedule_id, schedule):
+    """Start a scheduled tournament when its registration window is over, cancel it if too few signed up"""
+    tournament = tournaments.get(schedule['tournament_id'])
+    schedule['tournament_id'] = schedule['start_at'] = None
+    retire_schedule(guild_str, schedule_id, schedule)
+    # Cancelled or started by hand in the meantime
+    if not tournament or tournament.active or not tournament.channel:
+        return
+
+    channel = tournament.channel
+    await start_tournament(TimerContext(channel), tournament)
+    if not tournament.active and tournaments.get(tournament.id) is tournament:
+        async with tournament_lock(tournament, "cancel"):
+            cancelled_id = tournament.id
+            remove_tournament(tournament)
+        await channel.send(f"❌ Scheduled tournament {cancelled_id} cancelled, not enough players signed up.", delete_after=60)
+
+@tasks.loop(seconds=SCHEDULE_CHECK_INTERVAL)
+async def schedule_timer():
+    """Open and start every scheduled tournament that is due, one loop for all schedules"""
+    now = datetime.now()
+    while schedule_timers and schedule_timers[0][0] <= now:
+        run, guild_str, schedule_id, action = heapq.heappop(schedule_timers)
+        schedule = tournament_schedules.get(guild_str, {}).get(schedule_id)
+        # Entries of retired schedules and of starts that already happened are stale
+        if not schedule or schedule.get('next_run' if action == "open" else 'start_at') != run.isoformat():
+            continue
+        try:
+            if action == "open":
+                await open_scheduled_tournament(guild_str, schedule_id, schedule, run, now)
+            else:
+                await start_scheduled_tournament(guild_str, schedule_id, schedule)
+        except Exception as e:
+            print(f"Error running tournament schedule: {e}")
+
+ROUND_EMBED_FIELDS = 25  # Discord's limit of fields per embed
+ROUND_FOOTER = "Pick winners in the menu below or use !winner @player"
+WINNER_SELECT_MATCHES = 12  # Matches per winner menu, two options each within Discord's 25 option limit
+
+class MatchWinnerSelect(discord.ui.DynamicItem[discord.ui.Select], template=r'match_winner:(?P<tournament_id>\d+):(?P<round_num>\d+):(?P<first_match>\d+)'):
+    """Winner menu on round messages.
+
+    The custom_id encodes tournament, round and first match, so every menu of every round
+    is routed to this one dispatcher, also after a restart, without storing a view per message.
+    """
+    def __init__(self, tournament_id, round_num, first_match, options=None):
+        super().__init__(discord.ui.Select(
+            custom_id=f"match_winner:{tournament_id}:{round_num}:{first_match}",
+            placeholder="🏆 Record a match winner",
+            options=options or [discord.SelectOption(label="No open matches", value="none")]
+        ))
+        self.tournament_id = tournament_id
+        self.round_num = round_num
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match['tournament_id'], int(match['round_num']), int(match['first_match']), item.options)
+
+    async def callback(self, interaction: discord.Interaction):
+        if not has_permission(interaction.user, interaction.guild.id, 'htr') and not has_permission(interaction.user, interaction.guild.id, 'tlr') and not interaction.user.guild_permissions.manage_channels:
+            return await interaction.response.send_message("❌ You don't have permission to set winners.", ephemeral=True)
+
+        # Tournament IDs start over after a restart, so a menu left on an old message can
+        # carry the ID of an unrelated tournament. Only the current round messages count.
+        tournament = tournaments.get(self.tournament_id)
+        messages = (tournament.round_messages or [tournament.message]) if tournament else []
+        if (not tournament or not tournament.active or tournament.guild_id != interaction.guild.id
+                or interaction.message.id not in {message.id for message in messages if message}):
+            return await interaction.response.send_message("❌ This menu belongs to a round that is over.", ephemeral=True)
+
+        # Recording the last result of a round posts the next one, acknowledge before that
+        await interaction.response.defer()
+
+        match_index, slot = (int(value) for value in self.item.values[0].split(':'))
+        async with tournament_lock(tournament, "winner"):
+            if self.round_num != len(tournament.rounds):
+                error = "❌ This round is already over."
+            elif match_index in tournament.match_winners:
+                error = "❌ This match already has a winner."
+            else:
+                entrant = tournament.rounds[-1][match_index][slot]
+                recorded, error = await report_match_winner(TimerContext(interaction.channel), tournament, entrant)
+                if recorded is not None:
+                    error = None
+
+        if error:
+            return await interaction.followup.send(error, ephemeral=True)
+
+        # Show the pick right away instead of after the editor's debounce
+        await round_editor.flush(interaction.message)
+
+def build_round_view(tournament, part=0):
+    """Winner menus for the open matches shown on one message of the current round"""
+    view = discord.ui.View(timeout=None)
+    round_pairs = tournament.rounds[-1]
+    first = part * ROUND_EMBED_FIELDS
+    open_matches = [
+        match_index for match_index in range(first, min(first + ROUND_EMBED_FIELDS, len(round_pairs)))
+        if match_index not in tournament.match_winners
+    ]
+
+    for start in range(0, len(open_matches), WINNER_SELECT_MATCHES):
+        chunk = open_matches[start:start + WINNER_SELECT_MATCHES]
+        options = [
+            discord.SelectOption(
+                label=f"Match {match_index + 1}: {get_entrant_display_name(tournament.guild_id, side)}"[:100],
+                value=f"{match_index}:{slot}"
             )
+            for match_index in chunk
+            for slot, side in enumerate(round_pairs[match_index])
+        ]
+        view.add_item(MatchWinnerSelect(tournament.id, len(tournament.rounds), chunk[0], options))
+    return view
+
+
+def get_match_message(tournament, match_index):
+    """Get the round message that shows a match and the match's field index in its embed"""
+    messages = tournament.round_messages or ([tournament.message] if tournament.message else [])
+    message_index, field_index = divmod(match_index, ROUND_EMBED_FIELDS)
+    if message_index >= len(messages) or not messages[message_index].embeds:
+        return None, field_index
+    return messages[message_index], field_index
+
+def set_match_winner_field(embed, match_index, winner_display):
+    """Update a round embed's match field to show the winner"""
+    if match_index < 0 or match_index >= len(embed.fields):
+        return False
+
+    field = embed.fields[match_index]
+    if "Match" not in field.name:
+        return False
+
+    lines = field.value.split('\n')
+    lines[1] = f"<:Crown:1409926966236283012> Winner: **{winner_display}**"
+    embed.set_field_at(match_index, name=field.name, value='\n'.join(lines), inline=field.inline)
+    return True
+
+DEFAULT_RATING = 1000
+RATING_K = 32  # Max rating change per match
+
+def get_rating(guild_id, player):
+    """Get a player's Elo rating"""
+    return ratings.get(str(guild_id), {}).get(str(player.id), DEFAULT_RATING)
+
+def get_entrant_rating(guild_id, entrant):
+    """Rating of an entrant, a 2v2 team plays at the average of its members"""
+    members = entrant if isinstance(entrant, list) else [entrant]
+    return sum(get_rating(guild_id, member) for member in members) / len(members)
+
+def update_ratings(guild_id, winner, loser):
+    """Elo update for one match, every team member moves by the team's rating change"""
+    winner_members = winner if isinstance(winner, list) else [winner]
+    loser_members = loser if isinstance(loser, list) else [loser]
+    # Results against bots say nothing about skill
+    if any(isinstance(member, FakePlayer) for member in winner_members + loser_members):
+        return
+
+    expected = 1 / (1 + 10 ** ((get_entrant_rating(guild_id, loser) - get_entrant_rating(guild_id, winner)) / 400))
+    change = RATING_K * (1 - expected)
+
+    guild_ratings = ratings.setdefault(str(guild_id), {})
+    for member in winner_members:
+        guild_ratings[str(member.id)] = round(get_rating(guild_id, member) + change, 1)
+    for member in loser_members:
+        guild_ratings[str(member.id)] = round(get_rating(guild_id, member) - change, 1)
+    save_data()
+
+def log_match_result(guild_id, tournament, round_num, match_index, winner, loser, replaying=False):
+    """Keep a recorded match for the history archive, update ratings and log the result event"""
+    tournament.match_log.append((round_num, winner, loser))
+    if replaying:
+        return
+
+    # Ratings live outside the tournament, the event keeps what undo has to put back
+    members = [member for side in (winner, loser) for member in (side if isinstance(side, list) else [side])]
+    guild_ratings = ratings.get(str(guild_id), {})
+    ratings_before = {str(member.id): guild_ratings.get(str(member.id)) for member in members if not isinstance(member, FakePlayer)}
+    update_ratings(guild_id, winner, loser)
+    record_event(tournament, "result", round_num=round_num, match_index=match_index, winner=winner, loser=loser, ratings_before=ratings_before)
+
+def record_match_winner(guild_id, tournament, member):
+    """Record the member's side as winner of their current round match.
+
+    Returns (match_index, winner_name), or (None, error_message) when no result can be recorded.
+    """
+    match_index, winner_name = apply_match_winner(guild_id, tournament, member)
+    if match_index is not None and tournament.snapshots and len(tournament.events) - tournament.snapshots[-1][0] > SNAPSHOT_INTERVAL:
+        take_snapshot(tournament)
+    return match_index, winner_name
+
+def apply_match_winner(guild_id, tournament, member, replaying=False):
+    """Apply a result to the tournament state, see record_match_winner"""
+    if tournament.bracket:
+        match = tournament.bracket.match_for(member.id)
+        if match is None or match.wave != len(tournament.rounds):
+            return None, "❌ This player/team is not in the current round."
+
+        winner_slot = 0 if member.id in get_entrant_ids(match.slots[0]) else 1
+        winner_entrant = match.slots[winner_slot]
+        log_match_result(guild_id, tournament, match.wave, match.field_index, winner_entrant, match.slots[1 - winner_slot], replaying)
+        tournament.eliminated.extend(tournament.bracket.report(match, winner_slot))
+        tournament.results.append(winner_entrant)
+        tournament.match_winners[match.field_index] = winner_entrant
+        return match.field_index, get_entrant_display_name(guild_id, winner_entrant)
+
+    current_round = tournament.rounds[-1]
+
+    match_index = -1
+    for i, match in enumerate(current_round):
+        side_a, side_b = match
+        if tournament.mode == "2v2":
+            if member in side_a or member in side_b:
+                match_index = i
+                break
+        elif member == side_a or member == side_b:
+            match_index = i
+            break
+
+    if match_index < 0:
+        return None, "❌ This player/team is not in the current round."
+
+    if match_index in tournament.match_winners:
+        return None, "❌ This match already has a winner."
+
+    side_a, side_b = current_round[match_index]
+    if tournament.mode == "2v2":
+        winner_team, loser_team = (side_a, side_b) if member in side_a else (side_b, side_a)
+        tournament.results.append(winner_team)
+        tournament.eliminated.append(loser_team)
+        tournament.match_winners[match_index] = winner_team
+        log_match_result(guild_id, tournament, len(tournament.rounds), match_index, winner_team, loser_team, replaying)
+        winner_name = get_team_display_name(guild_id, winner_team)
+    else:
+        loser = side_a if member == side_b else side_b
+        tournament.results.append(member)
+        tournament.eliminated.append(loser)
+        tournament.match_winners[match_index] = member
+        log_match_result(guild_id, tournament, len(tournament.rounds), match_index, member, loser, replaying)
+        winner_name = get_player_display_name(member, guild_id)
+
+    return match_index, winner_name
+
+SNAPSHOT_INTERVAL = 20  # Result events between snapshots, bounds how much an undo replays
+SNAPSHOT_FIELDS = (
+    'players', 'active', 'rounds', 'results', 'match_winners', 'match_log', 'eliminated',
+    'fake_count', 'bracket', 'round_matches', 'round_messages', 'message',
+)
+
+def record_event(tournament, kind, **data):
+    """Append a state change to the tournament's event log"""
+    event = {'seq': len(tournament.events), 'kind': kind, 'time': datetime.now(), **data}
+    tournament.events.append(event)
+    return event
+
+def record_round(tournament):
+    """Log a freshly posted round and checkpoint the state, replays never have to post rounds"""
+    messages = tournament.round_messages or ([tournament.message] if tournament.message else [])
+    record_event(tournament, "round", round_num=len(tournament.rounds), messages=list(messages))
+    take_snapshot(tournament)
+
+def shared_state_objects(state):
+    """deepcopy memo that keeps players, bots, BYE and messages shared instead of copying them"""
+    memo = {id(BYE): BYE}
+    objects = list(state['players']) + list(state['round_messages'])
+    if state['message']:
+        objects.append(state['message'])
+    for round_pairs in state['rounds']:
+        for match in round_pairs:
+            for side in match:
+                objects.extend(side if isinstance(side, list) else [side])
+    for obj in objects:
+        memo[id(obj)] = obj
+    return memo
+
+def take_snapshot(tournament):
+    """Checkpoint the tournament state at the latest event"""
+    state = {field: getattr(tournament, field) for field in SNAPSHOT_FIELDS}
+    tournament.snapshots.append((len(tournament.events) - 1, copy.deepcopy(state, shared_state_objects(state))))
+
+def restore_state(guild_id, tournament, seq):
+    """Rebuild the tournament state as it was right after event `seq`.
+
+    Starts from the latest snapshot at or before it and replays the result events in between.
+    """
+    snapshot_seq, state = next(snapshot for snapshot in reversed(tournament.snapshots) if snapshot[0] <= seq)
+    for field, value in copy.deepcopy(state, shared_state_objects(state)).items():
+        setattr(tournament, field, value)
+
+    # Snapshots are taken at every round and undo, so only results lie in between
+    for event in tournament.events[snapshot_seq + 1:seq + 1]:
+        if event['kind'] == "result":
+            winner = event['winner']
+            apply_match_winner(guild_id, tournament, winner[0] if isinstance(winner, list) else winner, replaying=True)
+
+def live_events(tournament, kind):
+    """Events of a kind that no undo has rolled back"""
+    undone = {seq for event in tournament.events if event['kind'] == "undo" for seq in event['undone']}
+    return [event for event in tournament.events if event['kind'] == kind and event['seq'] not in undone]
+
+def undo_results(guild_id, tournament, count):
+    """Roll the tournament back to before its last `count` results.
+
+    Rounds posted after the first undone result are rolled back with it.
+    Returns (undone result events, undone round events).
+    """
+    results = live_events(tournament, "result")[-count:]
+    if not results:
+        return [], []
+    target = results[0]['seq'] - 1
+    rounds = [event for event in live_events(tournament, "round") if event['seq'] > target]
+
+    restore_state(guild_id, tournament, target)
+
+    # No-show deadlines aren't part of snapshots and are keyed by round number, so a reposted
+    # round would inherit them. Drop those of rolled back rounds and of reopened matches.
+    round_num = len(tournament.rounds)
+    reopened = {event['match_index'] for event in results if event['round_num'] == round_num}
+    for key in set(tournament.match_deadlines) | set(tournament.match_presence):
+        if key[0] > round_num or (key[0] == round_num and key[1] in reopened):
+            tournament.match_deadlines.pop(key, None)
+            tournament.match_presence.pop(key, None)
+
+    guild_ratings = ratings.setdefault(str(guild_id), {})
+    for event in reversed(results):
+        for user_id, rating in event['ratings_before'].items():
+            if rating is None:
+                guild_ratings.pop(user_id, None)
+            else:
+                guild_ratings[user_id] = rating
+    save_data()
+
+    if rounds:
+        # The hoster queues belonged to a round that no longer exists, the restored round gets new ones
+        hosters = get_registered_hosters(guild_id)
+        tournament.hoster_scheduler = HosterScheduler(hosters) if hosters else None
+
+    # Recording a result released the match's hoster, reopened matches need one again
+    scheduler = tournament.hoster_scheduler
+    for match_index in sorted(reopened):
+        if not scheduler or match_index in scheduler.assignments:
+            continue
+        if any(is_bot_entrant(side) for side in tournament.rounds[-1][match_index]):
+            continue
+        hoster = scheduler.assign(match_index)
+        if hoster:
+            dm_service.send(hoster, f"↩️ **{tournament.title}**: a result was undone, you now host {describe_match(guild_id, tournament, match_index)}")
+    tournament.snapshots = [snapshot for snapshot in tournament.snapshots if snapshot[0] <= target]
+    record_event(tournament, "undo", undone=[event['seq'] for event in results + rounds])
+    take_snapshot(tournament)
+    return results, rounds
+
+def clear_match_winner_field(embed, match_index):
+    """Put a round embed's match field back to waiting for a winner"""
+    if match_index < 0 or match_index >= len(embed.fields):
+        return False
 
-    embed.set_footer(text="Use !winner @player to record match results")
+    field = embed.fields[match_index]
+    lines = field.value.split('\n')
+    lines[1] = "<:Crown:1409926966236283012> Winner: *Waiting...*"
+    embed.set_field_at(match_index, name=field.name, value='\n'.join(lines), inline=field.inline)
+    return True
+
+def parse_result_list(guild, text):
+    """Resolve a pasted result list (mentions, IDs or names) into members.
+
+    Returns (members, unresolved_entries).
+    """
+    members = []
+    unresolved = []
+    for entry in re.split(r'[\n,]+', text):
+        entry = entry.strip()
+        # Allow numbered lists like "1. @player" or "- player"
+        entry = re.sub(r'^(\d+[.)]|[-*•])\s*', '', entry).strip()
+        if not entry:
+            continue
+
+        member = None
+        id_match = re.fullmatch(r'<@!?(\d+)>|(\d{15,20})', entry)
+        if id_match:
+            member = guild.get_member(int(id_match.group(1) or id_match.group(2)))
+        else:
+            member = guild.get_member_named(entry.lstrip('@'))
+
+        if member:
+            members.append(member)
+        else:
+            unresolved.append(entry)
+
+    return members, unresolved
+
+def format_bracket_name(player, guild_id):
+    """Get player display name with their bracket emojis"""
+    player_name = get_player_display_name(player, guild_id)
+    guild_str = str(guild_id)
+    if guild_str in bracket_roles and str(player.id) in bracket_roles[guild_str] and not isinstance(player, FakePlayer):
+        emojis = ''.join(bracket_roles[guild_str][str(player.id)])
+        player_name = f"{player_name} {emojis}"
+    return player_name
+
+def get_entrant_display_name(guild_id, entrant):
+    """Get display name for a bracket entrant (player or team)"""
+    if isinstance(entrant, list):
+        if len(entrant) == 2:
+            return get_team_display_name(guild_id, entrant)
+        return " & ".join(get_player_display_name(player, guild_id) for player in entrant)
+    return get_player_display_name(entrant, guild_id)
+
+def get_entrants(guild_id, tournament):
+    """Group registered players into bracket entrants (players for 1v1, teams for 2v2)"""
+    if tournament.mode != "2v2":
+        return list(tournament.players)
+
+    entrants = []
+    processed_players = set()
+    fake_players = []
+
+    for player in tournament.players:
+        if player in processed_players:
+            continue
+        if isinstance(player, FakePlayer):
+            fake_players.append(player)
+            continue
+
+        teammate = get_teammate(guild_id, player.id)
+        if teammate and teammate in tournament.players:
+            entrants.append([player, teammate])
+            processed_players.add(teammate)
+        else:
+            # Player has no teammate in the tournament
+            entrants.append([player])
+        processed_players.add(player)
+
+    # Pair fake players into bot teams
+    for i in range(0, len(fake_players) - 1, 2):
+        entrants.append([fake_players[i], fake_players[i+1]])
+
+    return entrants
+
+def get_entrant_sp(guild_id, entrant):
+    """Get current SP of a player, or the combined SP of a team"""
+    guild_sp = sp_data.get(str(guild_id), {})
+    players = entrant if isinstance(entrant, list) else [entrant]
+    return sum(guild_sp.get(str(player.id), 0) for player in players if not isinstance(player, FakePlayer))
+
+def build_round_embed(guild_id, tournament, round_pairs, round_num, labels=None, first_match=1, part=""):
+    """Build the embed listing the matches of a round"""
+    embed = discord.Embed(
+        title=f"🏆 {tournament.title} - Round {round_num}{part}",
+        description=f"**Map:** {tournament.map}\n**Abilities:** {tournament.abilities}",
+        color=0x3498db
+    )
+
+    for i, match in enumerate(round_pairs, first_match):
+        side_a, side_b = match
+        if tournament.mode == "2v2":
+            side_a_str = " & ".join(format_bracket_name(player, guild_id) for player in side_a)
+            side_b_str = " & ".join(format_bracket_name(player, guild_id) for player in side_b)
+        else:
+            side_a_str = format_bracket_name(side_a, guild_id)
+            side_b_str = format_bracket_name(side_b, guild_id)
+
+        field_name = f"⚔️ Match {i}"
+        if labels:
+            field_name += f" • {labels[i-first_match]}"
+
+        embed.add_field(
+            name=field_name,
+            value=f"**{side_a_str}** <:VS:1402690899485655201> **{side_b_str}**\n<:Crown:1409926966236283012> Winner: *Waiting...*",
+            inline=False
+        )
+
+    embed.set_footer(text=ROUND_FOOTER)
+    return embed
+
+async def post_bracket_round(destination, guild_id, tournament):
+    """Post the matches the bracket engine has ready as the next round"""
+    ready = tournament.bracket.ready_matches()
+    round_num = len(tournament.rounds) + 1
+
+    for i, match in enumerate(ready):
+        match.wave = round_num
+        match.field_index = i
+
+    round_pairs = [tuple(match.slots) for match in ready]
+    tournament.rounds.append(round_pairs)
+    tournament.round_matches = ready
+    tournament.results = []
+    tournament.match_winners = {}
+
+    # Large rounds are split over several messages to stay within the embed field limit
+    labels = [match.label for match in ready]
+    parts = max(1, -(-len(round_pairs) // ROUND_EMBED_FIELDS))
+    tournament.round_messages = []
+    for part in range(parts):
+        start = part * ROUND_EMBED_FIELDS
+        end = start + ROUND_EMBED_FIELDS
+        part_title = f" ({part + 1}/{parts})" if parts > 1 else ""
+        embed = build_round_embed(guild_id, tournament, round_pairs[start:end], round_num, labels[start:end], start + 1, part_title)
+
+        tournament.round_messages.append(await destination.send(embed=embed, view=build_round_view(tournament, part)))
+
+    tournament.message = tournament.round_messages[0]
+    record_round(tournament)
+    await assign_round_hosters(guild_id, tournament)
+
+async def start_bracket_engine(destination, guild_id, tournament):
+    """Start a tournament that is driven by a bracket engine instead of plain rounds"""
+    entrants = get_entrants(guild_id, tournament)
+    random.shuffle(entrants)
+
+    options = dict(tournament.format_options)
+    if tournament.format == "seeded" or options.pop('seeding', None) == "sp":
+        # Highest SP gets the first seed, ties keep their random order
+        entrants.sort(key=lambda entrant: get_entrant_sp(guild_id, entrant), reverse=True)
+
+    tournament.active = True
+    tournament.rounds = []
+    tournament.eliminated = []
+    tournament.bracket = BRACKET_FORMATS[tournament.format](entrants, **options)
+
+    await post_bracket_round(destination, guild_id, tournament)
+
+async def start_playoffs(destination, guild_id, tournament):
+    """Move group stage qualifiers into a seeded single elimination bracket, byes go to the best seeds"""
+    tournament.bracket = SingleEliminationBracket(tournament.bracket.qualifiers())
+    tournament.eliminated = []
+    await post_bracket_round(destination, guild_id, tournament)
+
+def entrant_record(guild_id, entrant):
+    """Name and real player IDs of an entrant, for the history archive"""
+    members = entrant if isinstance(entrant, list) else [entrant]
+    return {
+        'name': get_entrant_display_name(guild_id, entrant),
+        'ids': [str(member.id) for member in members if not isinstance(member, FakePlayer)]
+    }
 
-    # Create a new view without buttons for active tournament
-    active_tournament_view = discord.ui.View()
-    tournament.message = await ctx.send(embed=embed, view=active_tournament_view)
+def get_player_stats(guild_id, user_id):
+    """Get (and create) the stats index entry of a player"""
+    return player_stats.setdefault(str(guild_id), {}).setdefault(str(user_id), {
+        'tournaments': 0, 'matches': 0, 'wins': 0, 'best_placement': None, 'head_to_head': {}
+    })
+
+def archive_tournament(guild_id, tournament, placement_entrants):
+    """Append a finished tournament to the history archive and update the per-player stats index"""
+    rounds = {}
+    for round_num, winner, loser in tournament.match_log:
+        rounds.setdefault(round_num, []).append({
+            'winner': entrant_record(guild_id, winner),
+            'loser': entrant_record(guild_id, loser)
+        })
+
+    record = {
+        'id': tournament.id,
+        'guild_id': str(guild_id),
+        'title': tournament.title,
+        'mode': tournament.mode,
+        'format': tournament.format,
+        'map': tournament.map,
+        'abilities': tournament.abilities,
+        'prize': tournament.prize,
+        'finished_at': datetime.now().isoformat(timespec='seconds'),
+        'rounds': [rounds[round_num] for round_num in sorted(rounds)],
+        'placements': [entrant_record(guild_id, entrant) for entrant in placement_entrants]
+    }
+
+    try:
+        with open(TOURNAMENT_HISTORY_FILE, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+    except Exception as e:
+        print(f"Error archiving tournament: {e}")
+
+    # Index update only touches the players of this tournament
+    for player in tournament.players:
+        if not isinstance(player, FakePlayer):
+            get_player_stats(guild_id, player.id)['tournaments'] += 1
+
+    for match in record['rounds']:
+        for result in match:
+            winner_ids, loser_ids = result['winner']['ids'], result['loser']['ids']
+            for user_id in winner_ids:
+                stats = get_player_stats(guild_id, user_id)
+                stats['matches'] += 1
+                stats['wins'] += 1
+                for opponent_id in loser_ids:
+                    stats['head_to_head'].setdefault(opponent_id, [0, 0])[0] += 1
+            for user_id in loser_ids:
+                stats = get_player_stats(guild_id, user_id)
+                stats['matches'] += 1
+                for opponent_id in winner_ids:
+                    stats['head_to_head'].setdefault(opponent_id, [0, 0])[1] += 1
+
+    for place, entrant in enumerate(record['placements'], 1):
+        for user_id in entrant['ids']:
+            stats = get_player_stats(guild_id, user_id)
+            if stats['best_placement'] is None or place < stats['best_placement']:
+                stats['best_placement'] = place
+
+    save_data()
+
+async def finish_tournament(ctx, tournament, placement_entrants):
+    """Announce final rankings, award SP and reset the tournament"""
+    sp_rewards = tournament.sp_rewards
+    placements = [] # List of (place, entrant, sp_reward)
+
+    for place, entrant in enumerate(placement_entrants[:len(sp_rewards)], 1):
+        sp = sp_rewards[place - 1]
+        placements.append((place, entrant, sp))
+
+        for player in (entrant if isinstance(entrant, list) else [entrant]):
+            if hasattr(player, 'id') and not isinstance(player, FakePlayer):
+                await add_sp(ctx.guild.id, player.id, sp)
+
+    winner_data = placement_entrants[0]
+
+    # Create styled tournament winners embed
+    winner_display = get_entrant_display_name(ctx.guild.id, winner_data)
+
+    embed = discord.Embed(
+        title="🏆 Tournament Winners!",
+        description=f"Congratulations to **{winner_display}** for winning the\n**{tournament.title}** tournament! 🎉",
+        color=0xffd700
+    )
+
+    # Add tournament info with custom emojis
+    embed.add_field(name="<:map:1409924163346370560> Map", value=tournament.map, inline=True)
+    embed.add_field(name="<:abilities:1402690411759407185> Abilities", value=tournament.abilities, inline=True)
+    embed.add_field(name="🎮 Mode", value=tournament.mode, inline=True)
+
+    place_emojis = {
+        1: "<:Medal_Gold:1402383868505624576>",
+        2: "<:Medal_Silver:1402383899597869207>",
+        3: "<:Medal_Bronze:1402383923991806063>",
+        4: "4️⃣"
+    }
+
+    # Create results text
+    results_display = ""
+    for place, entrant, sp in placements:
+        emoji = place_emojis.get(place, "📍")
+        results_display += f"{emoji} {get_entrant_display_name(ctx.guild.id, entrant)}\n"
+
+    embed.add_field(name="🏆 Final Rankings", value=results_display, inline=False)
+
+    # Add prizes section with SP
+    prize_text = ""
+    for place, entrant, sp in placements:
+        emoji = place_emojis.get(place, "📍")
+        place_suffix = "st" if place == 1 else "nd" if place == 2 else "rd" if place == 3 else "th"
+        prize_text += f"{emoji} {place}{place_suffix}: {sp} Seasonal Points\n"
+
+    embed.add_field(name="🏆 Prizes", value=prize_text, inline=False)
+
+    # Add winner's avatar if it's a real player
+    if hasattr(winner_data, 'display_avatar') and not isinstance(winner_data, FakePlayer):
+        embed.set_thumbnail(url=winner_data.display_avatar.url)
+
+    # Add footer with tournament ID and timestamp
+    embed.set_footer(text=f"Tournament completed • {datetime.now().strftime('%d.%m.%Y %H:%M')}")
+
+    # Create a new view without buttons for the completed tournament
+    completed_view = discord.ui.View()
+    await ctx.send(embed=embed, view=completed_view)
+
+    archive_tournament(ctx.guild.id, tournament, placement_entrants)
+
+    # Remove the finished tournament
+    remove_tournament(tournament)
+
+async def advance_round(ctx, tournament):
+    """Finish the tournament or post the next round once every match of the current round has a winner.
+
+    Returns "finished", "next_round" or None if the round is still in progress.
+    """
+    current_round = tournament.rounds[-1]
+
+    # Check if round is complete
+    if len(tournament.results) != len(current_round):
+        return None
+
+    # The finished round messages must show their final state before anything new is posted
+    for message in tournament.round_messages or ([tournament.message] if tournament.message else []):
+        await round_editor.flush(message)
+
+    if tournament.bracket:
+        if tournament.bracket.complete:
+            if hasattr(tournament.bracket, 'qualifiers') and len(tournament.bracket.qualifiers()) > 1:
+                await start_playoffs(ctx, ctx.guild.id, tournament)
+                return "next_round"
+            await finish_tournament(ctx, tournament, tournament.bracket.placements())
+            return "finished"
+
+        await post_bracket_round(ctx, ctx.guild.id, tournament)
+        return "next_round"
+
+    if len(tournament.results) == 1:
+        # Tournament finished - placements are based on elimination order, last out places highest,
+        # so SP tables of any length are paid out
+        placement_entrants = [tournament.results[0]] + tournament.eliminated[::-1]
+        await finish_tournament(ctx, tournament, placement_entrants)
+        return "finished"
+
+    # Create next round
+    next_round_winners = tournament.results.copy()
+
+    # Add fake players if odd number of winners, a bot team in 2v2
+    while len(next_round_winners) % 2 != 0:
+        bots = []
+        for _ in range(2 if tournament.mode == "2v2" else 1):
+            bots.append(FakePlayer(f"Bot{tournament.fake_count}", 761557952975420886 + tournament.fake_count))
+            tournament.fake_count += 1
+        next_round_winners.append(bots if tournament.mode == "2v2" else bots[0])
+
+    next_round_pairs = []
+    for i in range(0, len(next_round_winners), 2):
+        next_round_pairs.append((next_round_winners[i], next_round_winners[i+1]))
+
+    tournament.rounds.append(next_round_pairs)
+    tournament.results = []
+    tournament.match_winners = {}
+
+    embed = build_round_embed(ctx.guild.id, tournament, next_round_pairs, len(tournament.rounds))
+
+    tournament.message = await ctx.send(embed=embed, view=build_round_view(tournament))
+    record_round(tournament)
+    await assign_round_hosters(ctx.guild.id, tournament)
+    return "next_round"
 
 @bot.command()
-async def winner(ctx, member: discord.Member):
+async def winner(ctx, member: discord.Member, tournament_id: str = None):
     try:
         await ctx.message.delete()
     except Exception as e:
@@ -1244,276 +3194,230 @@ async def winner(ctx, member: discord.Member):
     if not has_permission(ctx.author, ctx.guild.id, 'htr') and not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
         return await ctx.send("❌ You don't have permission to set winners.", delete_after=5)
 
-    tournament = get_tournament(ctx.guild.id)
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
 
-    if not tournament.active:
-        return await ctx.send("❌ No active tournament.", delete_after=5)
+    if not tournament:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
 
-    current_round = tournament.rounds[-1]
+    async with tournament_lock(tournament, "winner"):
+        match_index, winner_name = await report_match_winner(ctx, tournament, member)
 
-    # Find and update the match
-    match_found = False
-    eliminated_players = []
-    match_index = -1
-    winner_team = None
-    loser_team = None
+    if match_index is None:
+        return await ctx.send(winner_name, delete_after=5)
 
-    if tournament.mode == "2v2":
-        # Find which team the mentioned member belongs to
-        member_team_id = get_team_id(ctx.guild.id, member.id)
-        if not member_team_id:
-            return await ctx.send("❌ This player is not in a team.", delete_after=5)
-
-        member_team = get_team_members(ctx.guild.id, member_team_id)
-
-        for i, match in enumerate(current_round):
-            team_a, team_b = match
-            if member in team_a:
-                winner_team = team_a
-                loser_team = team_b
-                tournament.results.append(team_a)
-                eliminated_players.extend(team_b)
-                match_found = True
-                match_index = i
-                break
-            elif member in team_b:
-                winner_team = team_b
-                loser_team = team_a
-                tournament.results.append(team_b)
-                eliminated_players.extend(team_a)
-                match_found = True
-                match_index = i
-                break
+    await ctx.send(f"✅ {winner_name} wins their match!", delete_after=5)
 
-        if match_found:
-            winner_name = get_team_display_name(ctx.guild.id, winner_team)
+async def report_match_winner(ctx, tournament, winner):
+    """Record a match winner, show it on the round message and advance the round.
 
-    else:  # 1v1 mode
-        for i, match in enumerate(current_round):
-            a, b = match
-            if member == a or member == b:
-                tournament.results.append(member)
-                eliminated_players.extend([a if member == b else b])
-                match_found = True
-                match_index = i
-                break
+    Shared by !winner, the winner menus and the forfeit timer, the caller holds the tournament lock.
+    winner is a member of the winning side, or the whole entrant when it was picked from a menu.
+    Returns (match_index, winner_name), or (None, error_message).
+    """
+    member = winner[0] if isinstance(winner, list) else winner
+    if not tournament.active:
+        return None, "❌ No active tournament."
 
-        if match_found:
-            winner_name = get_player_display_name(member, ctx.guild.id)
+    # Bracket engines resolve members, bot teams and solo teams through match_for themselves
+    if tournament.mode == "2v2" and not tournament.bracket and not isinstance(member, FakePlayer) and not get_team_id(ctx.guild.id, member.id):
+        return None, "❌ This player is not in a team."
 
-    if not match_found:
-        return await ctx.send("❌ This player/team is not in the current round.", delete_after=5)
+    match_index, winner_name = record_match_winner(ctx.guild.id, tournament, member)
+    if match_index is None:
+        return None, winner_name
 
-    # Add eliminated players to elimination list
-    tournament.eliminated.extend(eliminated_players)
+    clear_match_deadline(tournament, match_index)
+    await release_match_hoster(ctx.guild.id, tournament, match_index)
 
     # Update current tournament message to show the winner
-    if tournament.message:
-        try:
-            current_embed = tournament.message.embeds[0]
-
-            # Find and update the specific match field
-            if match_index >= 0 and match_index < len(current_embed.fields):
-                field = current_embed.fields[match_index]
-                if "Match" in field.name:
-                    field_value = field.value
-                    lines = field_value.split('\n')
-                    lines[1] = f"<:Crown:1409926966236283012> Winner: **{get_player_display_name(member, ctx.guild.id)}**"
-
-                    current_embed.set_field_at(match_index, name=field.name, value='\n'.join(lines), inline=field.inline)
-                    await tournament.message.edit(embed=current_embed)
+    message, field_index = get_match_message(tournament, match_index)
+    if message:
+        current_embed = message.embeds[0]
+        winner_display = get_entrant_display_name(ctx.guild.id, tournament.match_winners[match_index])
+        if set_match_winner_field(current_embed, field_index, winner_display):
+            round_editor.queue(message, embed=current_embed, view=build_round_view(tournament, match_index // ROUND_EMBED_FIELDS))
+
+    await advance_round(ctx, tournament)
+    return match_index, winner_name
+
+TOURNAMENT_ID_ARGUMENT = re.compile(r'#(\d+)')  # Leading tournament ID of commands with a variable number of arguments
+
+def parse_tournament_id_argument(argument):
+    """Get the ID from a '#<id>' argument, None for anything else"""
+    match = TOURNAMENT_ID_ARGUMENT.fullmatch(argument.strip())
+    return match.group(1) if match else None
+
+class TournamentIdArgument(commands.Converter):
+    """Optional '#<id>' in front of a variable number of arguments, where a trailing ID can't go"""
+    async def convert(self, ctx, argument):
+        tournament_id = parse_tournament_id_argument(argument)
+        if tournament_id is None:
+            raise commands.BadArgument(f"{argument} is not a tournament ID")
+        return tournament_id
+
+async def record_bulk_winners(ctx, members, command_name, unresolved=None, tournament_id=None):
+    """Record several match winners in one pass with one embed edit per round message and one summary reply"""
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
+
+    if not tournament:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
+
+    async with tournament_lock(tournament, "winner"):
+        if not tournament.active:
+            return await ctx.send("❌ No active tournament.", delete_after=5)
+
+        recorded = []
+        failed = [f"{entry} (unknown player)" for entry in (unresolved or [])]
+        touched_messages = {}  # {message_id: message}
+        rounds_started = 0
+        finished = False
+
+        for member in members:
+            if not tournament.active:
+                failed.append(f"{member.display_name} (tournament already finished)")
+                continue
 
-        except Exception as e:
-            print(f"Error updating tournament message: {e}")
+            if tournament.mode == "2v2" and not tournament.bracket and not get_team_id(ctx.guild.id, member.id):
+                failed.append(f"{member.display_name} (not in a team)")
+                continue
 
-    # Check if round is complete
-    if len(tournament.results) == len(current_round):
-        if len(tournament.results) == 1:
-            # Tournament finished - determine placements and award SP
-            winner_data = tournament.results[0]
-
-            # Calculate placements based on elimination order
-            all_eliminated = tournament.eliminated
-
-            # Get the final 4 placements
-            placements = [] # List of (place, player, sp_reward)
-
-            # 1st place (winner)
-            placements.append((1, winner_data, 3))
-            if hasattr(winner_data, 'id') and not isinstance(winner_data, FakePlayer):
-                await add_sp(ctx.guild.id, winner_data.id, 3)
-
-            # 2nd place (last eliminated)
-            if len(all_eliminated) >= 1:
-                placements.append((2, all_eliminated[-1], 2))
-                player = all_eliminated[-1]
-                if hasattr(player, 'id') and not isinstance(player, FakePlayer):
-                    await add_sp(ctx.guild.id, player.id, 2)
+            match_index, winner_name = record_match_winner(ctx.guild.id, tournament, member)
+            if match_index is None:
+                failed.append(f"{member.display_name} ({winner_name.lstrip('❌ ').rstrip('.')})")
+                continue
 
-            # 3rd and 4th place
-            if len(all_eliminated) >= 2:
-                placements.append((3, all_eliminated[-2], 1))
-                player = all_eliminated[-2]
-                if hasattr(player, 'id') and not isinstance(player, FakePlayer):
-                    await add_sp(ctx.guild.id, player.id, 1)
-            if len(all_eliminated) >= 3:
-                placements.append((4, all_eliminated[-3], 1))
-                player = all_eliminated[-3]
-                if hasattr(player, 'id') and not isinstance(player, FakePlayer):
-                    await add_sp(ctx.guild.id, player.id, 1)
+            recorded.append(winner_name)
+            clear_match_deadline(tournament, match_index)
+            await release_match_hoster(ctx.guild.id, tournament, match_index)
+
+            message, field_index = get_match_message(tournament, match_index)
+            if message:
+                winner_display = get_entrant_display_name(ctx.guild.id, tournament.match_winners[match_index])
+                if set_match_winner_field(message.embeds[0], field_index, winner_display):
+                    round_editor.queue(message, embed=message.embeds[0], view=build_round_view(tournament, match_index // ROUND_EMBED_FIELDS))
+                    touched_messages[message.id] = message
+
+            if len(tournament.results) == len(tournament.rounds[-1]):
+                status = await advance_round(ctx, tournament)
+                if status == "next_round":
+                    rounds_started += 1
+                elif status == "finished":
+                    finished = True
+
+        # One edit per affected message, applied before the summary goes out
+        for message in touched_messages.values():
+            await round_editor.flush(message)
+
+    summary = f"✅ Recorded {len(recorded)} result{'s' if len(recorded) != 1 else ''}"
+    if recorded:
+        summary += ": " + ", ".join(recorded)
+    if rounds_started:
+        summary += f"\n➡️ Started {rounds_started} new round{'s' if rounds_started != 1 else ''}"
+    if finished:
+        summary += "\n🏆 Tournament finished!"
+    if failed:
+        summary += f"\n❌ Skipped: {', '.join(failed)}"
+
+    await ctx.send(summary, delete_after=15 if failed else 10)
+
+    details = f"Recorded {len(recorded)} results, skipped {len(failed)}"
+    await log_command(ctx.guild.id, ctx.author, command_name, details)
 
-            # Create styled tournament winners embed
-            winner_display = get_player_display_name(winner_data, ctx.guild.id)
+@bot.command()
+async def winners(ctx, tournament_id: Optional[TournamentIdArgument] = None, *members: discord.Member):
+    try:
+        await ctx.message.delete()
+    except Exception as e:
+        print(f"Failed to delete message: {e}")
+        pass
 
-            embed = discord.Embed(
-                title="🏆 Tournament Winners!",
-                description=f"Congratulations to **{winner_display}** for winning the\n**{tournament.title}** tournament! 🎉",
-                color=0xffd700
-            )
+    if not has_permission(ctx.author, ctx.guild.id, 'htr') and not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to set winners.", delete_after=5)
 
-            # Add tournament info with custom emojis
-            embed.add_field(name="<:map:1409924163346370560> Map", value=tournament.map, inline=True)
-            embed.add_field(name="<:abilities:1402690411759407185> Abilities", value=tournament.abilities, inline=True)
-            embed.add_field(name="🎮 Mode", value="1v1", inline=True)
-
-            # Create results text
-            results_display = ""
-            for place, player_obj, sp in placements:
-                if place == 1:
-                    emoji = "<:Medal_Gold:1402383868505624576>"
-                elif place == 2:
-                    emoji = "<:Medal_Silver:1402383899597869207>"
-                elif place == 3:
-                    emoji = "<:Medal_Bronze:1402383923991806063>"
-                elif place == 4:
-                    emoji = "4️⃣"
-                else:
-                    emoji = "📍"
-
-                player_str = get_player_display_name(player_obj, ctx.guild.id)
-                results_display += f"{emoji} {player_str}\n"
-
-            embed.add_field(name="🏆 Final Rankings", value=results_display, inline=False)
-
-            # Add prizes section with SP
-            prize_text = ""
-            for place, player_obj, sp in placements:
-                if place == 1:
-                    emoji = "<:Medal_Gold:1402383868505624576>"
-                elif place == 2:
-                    emoji = "<:Medal_Silver:1402383899597869207>"
-                elif place == 3:
-                    emoji = "<:Medal_Bronze:1402383923991806063>"
-                elif place == 4:
-                    emoji = "4️⃣"
-                else:
-                    emoji = "📍"
+    if not members:
+        return await ctx.send("❌ Please mention at least one winner. Usage: `!winners [#id] @player1 @player2 ...`", delete_after=5)
 
-                place_suffix = "st" if place == 1 else "nd" if place == 2 else "rd" if place == 3 else "th"
-                prize_text += f"{emoji} {place}{place_suffix}: {sp} Seasonal Points\n"
+    await record_bulk_winners(ctx, members, "!winners", tournament_id=tournament_id)
 
-            embed.add_field(name="🏆 Prizes", value=prize_text, inline=False)
+@bot.command()
+async def importresults(ctx, *, results: str):
+    try:
+        await ctx.message.delete()
+    except Exception as e:
+        print(f"Failed to delete message: {e}")
+        pass
 
-            # Add winner's avatar if it's a real player
-            winner_player_obj = winner_data
-            if hasattr(winner_player_obj, 'display_avatar') and not isinstance(winner_player_obj, FakePlayer):
-                embed.set_thumbnail(url=winner_player_obj.display_avatar.url)
+    if not has_permission(ctx.author, ctx.guild.id, 'htr') and not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to set winners.", delete_after=5)
 
-            # Add footer with tournament ID and timestamp
-            embed.set_footer(text=f"Tournament completed • {datetime.now().strftime('%d.%m.%Y %H:%M')}")
+    # The list can start with a '#<id>' tournament ID
+    first, *rest = results.split(None, 1)
+    tournament_id = parse_tournament_id_argument(first)
+    if tournament_id:
+        results = rest[0] if rest else ""
 
-            # Create a new view without buttons for the completed tournament
-            completed_view = discord.ui.View()
-            await ctx.send(embed=embed, view=completed_view)
+    members, unresolved = parse_result_list(ctx.guild, results)
+    if not members:
+        return await ctx.send("❌ No players found in the pasted list. Put one winner (mention, ID or name) per line.", delete_after=5)
 
-            # Reset tournament
-            tournament.__init__()
-        else:
-            # Create next round
-            next_round_winners = tournament.results.copy()
+    await record_bulk_winners(ctx, members, "!importresults", unresolved, tournament_id)
 
-            # Add fake players if odd number of winners
-            while len(next_round_winners) % 2 != 0:
-                bot_name = f"Bot{tournament.fake_count}"
-                bot_id = 761557952975420886 + tournament.fake_count
-                bot = FakePlayer(bot_name, bot_id)
-                next_round_winners.append(bot)
-                tournament.fake_count += 1
+@bot.command()
+async def undo(ctx, count: int = 1, tournament_id: str = None):
+    try:
+        await ctx.message.delete()
+    except Exception as e:
+        print(f"Failed to delete message: {e}")
+        pass
 
-            next_round_pairs = []
-            for i in range(0, len(next_round_winners), 2):
-                next_round_pairs.append((next_round_winners[i], next_round_winners[i+1]))
+    if not has_permission(ctx.author, ctx.guild.id, 'htr') and not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to undo results.", delete_after=5)
 
-            tournament.rounds.append(next_round_pairs)
-            tournament.results = []
+    if not 1 <= count <= 50:
+        return await ctx.send("❌ You can undo between 1 and 50 results at once.", delete_after=5)
 
-            round_num = len(tournament.rounds)
-            embed = discord.Embed(
-                title=f"🏆 {tournament.title} - Round {round_num}",
-                description=f"**Map:** {tournament.map}\n**Abilities:** {tournament.abilities}",
-                color=0x3498db
-            )
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
 
-            if tournament.mode == "2v2":
-                for i, match in enumerate(next_round_pairs, 1):
-                    team_a, team_b = match
-                    # Get bracket names for team members WITH emojis
-                    team_a_display = []
-                    team_b_display = []
-
-                    guild_str = str(ctx.guild.id)
-
-                    for player in team_a:
-                        player_name = get_player_display_name(player, ctx.guild.id)
-                        if guild_str in bracket_roles and str(player.id) in bracket_roles[guild_str] and not isinstance(player, FakePlayer):
-                            emojis = ''.join(bracket_roles[guild_str][str(player.id)])
-                            player_name = f"{player_name} {emojis}"
-                        team_a_display.append(player_name)
-
-                    for player in team_b:
-                        player_name = get_player_display_name(player, ctx.guild.id)
-                        if guild_str in bracket_roles and str(player.id) in bracket_roles[guild_str] and not isinstance(player, FakePlayer):
-                            emojis = ''.join(bracket_roles[guild_str][str(player.id)])
-                            player_name = f"{player_name} {emojis}"
-                        team_b_display.append(player_name)
-
-                    team_a_str = " & ".join(team_a_display)
-                    team_b_str = " & ".join(team_b_display)
-
-                    embed.add_field(
-                        name=f"⚔️ Match {i}",
-                        value=f"**{team_a_str}** <:VS:1402690899485655201> **{team_b_str}**\n<:Crown:1409926966236283012> Winner: *Waiting...*",
-                        inline=False
-                    )
-            else:
-                for i, match in enumerate(next_round_pairs, 1):
-                    a, b = match
-                    # Get bracket names WITH emojis for next rounds
-                    player_a = get_player_display_name(a, ctx.guild.id)
-                    player_b = get_player_display_name(b, ctx.guild.id)
-
-                    guild_str = str(ctx.guild.id)
-                    if guild_str in bracket_roles and str(a.id) in bracket_roles[guild_str] and not isinstance(a, FakePlayer):
-                        emojis = ''.join(bracket_roles[guild_str][str(a.id)])
-                        player_a = f"{player_a} {emojis}"
-
-                    if guild_str in bracket_roles and str(b.id) in bracket_roles[guild_str] and not isinstance(b, FakePlayer):
-                        emojis = ''.join(bracket_roles[guild_str][str(b.id)])
-                        player_b = f"{player_b} {emojis}"
-
-                    embed.add_field(
-                        name=f"⚔️ Match {i}",
-                        value=f"**{player_a}** <:VS:1402690899485655201> **{player_b}**\n<:Crown:1409926966236283012> Winner: *Waiting...*",
-                        inline=False
-                    )
+    if not tournament:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
 
-            embed.set_footer(text="Use !winner @player to record match results")
+    async with tournament_lock(tournament, "undo"):
+        if not tournament.active:
+            return await ctx.send("❌ No active tournament.", delete_after=5)
 
-            # Create a new view without buttons for active tournament
-            active_tournament_view = discord.ui.View()
-            tournament.message = await ctx.send(embed=embed, view=active_tournament_view)
+        results, rounds = undo_results(ctx.guild.id, tournament, count)
+        if not results:
+            return await ctx.send("❌ There are no results to undo.", delete_after=5)
 
-    await ctx.send(f"✅ {winner_name} wins their match!", delete_after=5)
+        # Rolled back rounds disappear, their matches are open again in the round before
+        for event in rounds:
+            for message in event['messages']:
+                round_editor.pending.pop(message.id, None)
+                try:
+                    await message.delete()
+                except:
+                    pass
+
+        # Only the round messages showing an undone result are edited
+        touched_messages = {}  # {message_id: (message, part)}
+        for event in results:
+            if event['round_num'] != len(tournament.rounds):
+                continue
+            message, field_index = get_match_message(tournament, event['match_index'])
+            if message and clear_match_winner_field(message.embeds[0], field_index):
+                touched_messages[message.id] = (message, event['match_index'] // ROUND_EMBED_FIELDS)
+        for message, part in touched_messages.values():
+            round_editor.queue(message, embed=message.embeds[0], view=build_round_view(tournament, part))
+
+    undone_names = ", ".join(get_entrant_display_name(ctx.guild.id, event['winner']) for event in results)
+    summary = f"↩️ Undid {len(results)} result{'s' if len(results) != 1 else ''}: {undone_names}"
+    if rounds:
+        summary += f"\n🗑️ Rolled back round{'s' if len(rounds) != 1 else ''} {', '.join(str(event['round_num']) for event in rounds)}"
+    if tournament.forfeit_minutes:
+        summary += "\n⏰ Reopened matches have no no-show deadline, send their room code again with `!code` to start one."
+    await ctx.send(summary, delete_after=10)
+
+    await log_command(ctx.guild.id, ctx.author, "!undo", f"Tournament {tournament.id}, {len(results)} results")
 
 class FakePlayer:
     def __init__(self, name, user_id):
@@ -1526,8 +3430,501 @@ class FakePlayer:
     def __str__(self):
         return self.mention
 
+class Bye:
+    """Empty bracket slot; whoever meets a bye advances automatically"""
+    def __repr__(self):
+        return "BYE"
+
+BYE = Bye()
+
+class BracketMatch:
+    """A match node in a precomputed bracket graph"""
+    __slots__ = ('match_id', 'label', 'stage', 'slots', 'winner', 'loser', 'winner_to', 'loser_to', 'wave', 'field_index')
+
+    def __init__(self, match_id, label, stage=0):
+        self.match_id = match_id
+        self.label = label
+        self.stage = stage  # Bracket depth, later stages place higher
+        self.slots = [None, None]  # None = waiting for an entrant, BYE = empty slot
+        self.winner = None
+        self.loser = None
+        self.winner_to = None  # (BracketMatch, slot) the winner moves to
+        self.loser_to = None  # (BracketMatch, slot) the loser moves to, None = eliminated
+        self.wave = None  # Round number the match was posted in
+        self.field_index = None  # Field index in that round's embed
+
+def get_entrant_ids(entrant):
+    """Get the user IDs that make up a bracket entrant"""
+    if isinstance(entrant, list):
+        return [player.id for player in entrant]
+    return [entrant.id]
+
+class EliminationBracket:
+    """Base for bracket engines built on a match graph.
+
+    Every match knows where its winner and loser go, so reporting a result only touches
+    the match itself and its two destinations.
+    """
+    def __init__(self):
+        self.matches = []
+        self.entrant_match = {}  # {user_id: BracketMatch} the entrant's next unplayed match
+        self.ready = {}  # {match_id: BracketMatch} matches with both entrants known, insertion ordered
+        self.eliminated = []  # Entrants in elimination order
+        self.elimination_stages = []  # Stage each entrant in self.eliminated was knocked out at
+        self.champion = None
+        self.complete = False
+
+    def new_match(self, label, stage):
+        match = BracketMatch(len(self.matches), label, stage)
+        self.matches.append(match)
+        return match
+
+    def match_for(self, user_id):
+        """Get the next unplayed match of the entrant containing this user"""
+        return self.entrant_match.get(user_id)
+
+    def ready_matches(self):
+        """Get all matches that can be played right now"""
+        return list(self.ready.values())
+
+    def place(self, match, slot, entrant):
+        """Put an entrant into a match slot and resolve byes"""
+        pending = [(match, slot, entrant)]
+        while pending:
+            match, slot, entrant = pending.pop()
+            match.slots[slot] = entrant
+            if entrant is not BYE:
+                for user_id in get_entrant_ids(entrant):
+                    self.entrant_match[user_id] = match
+
+            side_a, side_b = match.slots
+            if side_a is None or side_b is None:
+                continue
+
+            if side_a is BYE or side_b is BYE:
+                winner_slot = 1 if side_a is BYE else 0
+                pending.extend(self.resolve(match, winner_slot))
+            else:
+                self.ready[match.match_id] = match
+
+    def report(self, match, winner_slot):
+        """Record the winner of a ready match.
+
+        Returns the list of entrants eliminated by this result.
+        """
+        eliminated_before = len(self.eliminated)
+        self.ready.pop(match.match_id, None)
+        for match_slot in self.resolve(match, winner_slot):
+            self.place(*match_slot)
+        return self.eliminated[eliminated_before:]
+
+    def resolve(self, match, winner_slot):
+        """Set a match result and return the (match, slot, entrant) placements it causes"""
+        match.winner = match.slots[winner_slot]
+        match.loser = match.slots[1 - winner_slot]
+        placements = []
+
+        if match.winner_to:
+            placements.append((*match.winner_to, match.winner))
+        elif match.winner is not BYE:
+            self.finish(match.winner)
+
+        if match.loser_to:
+            placements.append((*match.loser_to, match.loser))
+        elif match.loser is not BYE:
+            self.eliminate(match.loser, match.stage)
+
+        return placements
+
+    def eliminate(self, entrant, stage):
+        self.eliminated.append(entrant)
+        self.elimination_stages.append(stage)
+        for user_id in get_entrant_ids(entrant):
+            self.entrant_match.pop(user_id, None)
+
+    def finish(self, champion):
+        self.champion = champion
+        self.complete = True
+        for user_id in get_entrant_ids(champion):
+            self.entrant_match.pop(user_id, None)
+
+    def placements(self):
+        """Get the final standings, best first.
+
+        Entrants knocked out at a later stage place higher; within a stage the later elimination wins.
+        """
+        order = sorted(range(len(self.eliminated)), key=lambda i: (self.elimination_stages[i], i), reverse=True)
+        return [self.champion] + [self.eliminated[i] for i in order]
+
+    @staticmethod
+    def bracket_size(entrant_count):
+        size = 2
+        while size < entrant_count:
+            size *= 2
+        return size
+
+    @staticmethod
+    def seeded_slots(entrants, size):
+        """Place entrants (best seed first) in standard bracket order.
+
+        Seed s meets seed size + 1 - s, so the missing seeds become byes for the top seeds
+        and no first round match is bye against bye.
+        """
+        order = [1]
+        while len(order) < size:
+            count = len(order) * 2
+            order = [seed for top in order for seed in (top, count + 1 - top)]
+        return [entrants[seed - 1] if seed <= len(entrants) else BYE for seed in order]
+
+class SingleEliminationBracket(EliminationBracket):
+    """Seeded single elimination where byes advance top seeds instead of bot opponents"""
+    def __init__(self, entrants):
+        super().__init__()
+        size = self.bracket_size(len(entrants))
+        rounds = size.bit_length() - 1
+
+        bracket = []
+        for r in range(1, rounds + 1):
+            count = size >> r
+            label = {1: "Final", 2: "Semifinal", 4: "Quarterfinal"}.get(count, f"Round of {count * 2}")
+            bracket.append([self.new_match(label, r) for _ in range(count)])
+        for r in range(rounds - 1):
+            for i, match in enumerate(bracket[r]):
+                match.winner_to = (bracket[r + 1][i // 2], i % 2)
+
+        slots = self.seeded_slots(entrants, size)
+        for i, match in enumerate(bracket[0]):
+            self.place(match, 0, slots[2 * i])
+            self.place(match, 1, slots[2 * i + 1])
+
+class DoubleEliminationBracket(EliminationBracket):
+    """Double elimination with winners bracket, losers bracket and grand finals (with bracket reset)"""
+    def __init__(self, entrants):
+        super().__init__()
+        size = self.bracket_size(len(entrants))
+        rounds = size.bit_length() - 1
+
+        # Winners bracket: round r has size / 2^r matches
+        winners = []
+        for r in range(1, rounds + 1):
+            label = "Winners Final" if r == rounds else f"Winners R{r}"
+            winners.append([self.new_match(label, r) for _ in range(size >> r)])
+        for r in range(rounds - 1):
+            for i, match in enumerate(winners[r]):
+                match.winner_to = (winners[r + 1][i // 2], i % 2)
+
+        # Losers bracket: 2 * (rounds - 1) rounds, alternating between dropping in
+        # winners bracket losers and halving the field
+        losers = []
+        for r in range(2 * (rounds - 1)):
+            count = size >> (r // 2 + 2)
+            label = "Losers Final" if r == 2 * rounds - 3 else f"Losers R{r + 1}"
+            losers.append([self.new_match(label, rounds + r + 1) for _ in range(count)])
+
+        if losers:
+            for i, match in enumerate(winners[0]):
+                match.loser_to = (losers[0][i // 2], i % 2)
+
+            for r in range(1, len(losers)):
+                if r % 2:
+                    # Winners bracket round (r + 1) / 2 drops its losers in, in reverse order to delay rematches
+                    dropping = winners[(r + 1) // 2]
+                    for i, match in enumerate(losers[r - 1]):
+                        match.winner_to = (losers[r][i], 0)
+                    for i, match in enumerate(dropping):
+                        match.loser_to = (losers[r][len(dropping) - 1 - i], 1)
+                else:
+                    for i, match in enumerate(losers[r - 1]):
+                        match.winner_to = (losers[r][i // 2], i % 2)
+
+        self.grand_final = self.new_match("Grand Final", 3 * rounds)
+        self.bracket_reset = self.new_match("Grand Final Reset", 3 * rounds + 1)
+        winners[-1][0].winner_to = (self.grand_final, 0)
+        if losers:
+            losers[-1][0].winner_to = (self.grand_final, 1)
+        else:
+            winners[-1][0].loser_to = (self.grand_final, 1)
+
+        slots = self.seeded_slots(entrants, size)
+        for i, match in enumerate(winners[0]):
+            self.place(match, 0, slots[2 * i])
+            self.place(match, 1, slots[2 * i + 1])
+
+    def resolve(self, match, winner_slot):
+        if match is self.grand_final and winner_slot == 1 and match.slots[0] is not BYE:
+            # Losers bracket champion forces a bracket reset
+            match.winner = match.slots[1]
+            match.loser = match.slots[0]
+            return [(self.bracket_reset, 0, match.slots[0]), (self.bracket_reset, 1, match.slots[1])]
+        return super().resolve(match, winner_slot)
+
+SWISS_PAIRING_STEPS = 20000  # Backtracking steps a Swiss round may take before it settles for rematches
+
+class SwissBracket:
+    """Swiss system: entrants with equal scores meet each round, avoiding rematches.
+
+    Points and Buchholz (sum of opponents' points) are updated per result, so standings
+    never need to be recomputed from match history.
+    """
+    def __init__(self, entrants, rounds=None):
+        self.entrants = entrants
+        self.index = {}  # {user_id: entrant_index}
+        for i, entrant in enumerate(entrants):
+            for user_id in get_entrant_ids(entrant):
+                self.index[user_id] = i
+
+        count = len(entrants)
+        self.total_rounds = rounds or max(1, (count - 1).bit_length())
+        self.points = [0] * count
+        self.buchholz = [0] * count
+        self.opponents = [[] for _ in range(count)]  # A rematch counts twice towards Buchholz
+        self.had_bye = [False] * count
+        self.order = list(range(count))  # Seeding order, used as the final tiebreak
+
+        self.round_num = 0
+        self.current = {}  # {entrant_index: BracketMatch} for the current round
+        self.ready = {}  # {match_id: BracketMatch} unplayed matches of the current round
+        self.match_count = 0
+        self.eliminated = []
+        self.complete = False
+
+        self.pair_next_round()
+
+    def match_for(self, user_id):
+        """Get the unplayed current round match of the entrant containing this user"""
+        entrant_index = self.index.get(user_id)
+        match = self.current.get(entrant_index)
+        if match is None or match.winner is not None:
+            return None
+        return match
+
+    def ready_matches(self):
+        """Get all matches of the current round that still need a result"""
+        return list(self.ready.values())
+
+    def rank_key(self, i):
+        return (-self.points[i], -self.buchholz[i], self.order[i])
+
+    def add_points(self, i, points):
+        self.points[i] += points
+        for opponent in self.opponents[i]:
+            self.buchholz[opponent] += points
+
+    def pair_next_round(self):
+        """Pair entrants by score, lowest ranked entrant without a bye sits out on odd counts"""
+        self.round_num += 1
+        self.current = {}
+        ranked = sorted(range(len(self.entrants)), key=self.rank_key)
+
+        if len(ranked) % 2:
+            bye = next((i for i in reversed(ranked) if not self.had_bye[i]), ranked[-1])
+            ranked.remove(bye)
+            self.had_bye[bye] = True
+            self.add_points(bye, 1)
+
+        pairs = self.pair_without_rematches(ranked) or self.pair_greedy(ranked)
+        for first, partner in pairs:
+            match = BracketMatch(self.match_count, f"Swiss R{self.round_num}")
+            self.match_count += 1
+            match.slots = [self.entrants[first], self.entrants[partner]]
+            self.current[first] = match
+            self.current[partner] = match
+            self.ready[match.match_id] = match
+
+    def pair_without_rematches(self, ranked):
+        """Pair down the standings with the closest ranked opponent not met before.
+
+        Backtracks when a choice leaves the rest unpairable. Returns None if there is no
+        rematch free pairing, or none was found within SWISS_PAIRING_STEPS steps.
+        """
+        steps = 0
+
+        def pair(unpaired):
+            nonlocal steps
+            if not unpaired:
+                return []
+            first = unpaired[0]
+            for pos in range(1, len(unpaired)):
+                steps += 1
+                if steps > SWISS_PAIRING_STEPS:
+                    return None
+                partner = unpaired[pos]
+                if partner in self.opponents[first]:
+                    continue
+                rest = pair(unpaired[1:pos] + unpaired[pos + 1:])
+                if rest is not None:
+                    return [(first, partner)] + rest
+            return None
+
+        return pair(ranked)
+
+    def pair_greedy(self, ranked):
+        """Pair down the standings, taking a rematch only when everyone left has been played"""
+        pairs = []
+        unpaired = ranked
+        while unpaired:
+            first = unpaired[0]
+            partner_pos = next((pos for pos in range(1, len(unpaired)) if unpaired[pos] not in self.opponents[first]), 1)
+            pairs.append((first, unpaired[partner_pos]))
+            unpaired = unpaired[1:partner_pos] + unpaired[partner_pos + 1:]
+        return pairs
+
+    def report(self, match, winner_slot):
+        """Record a result and update standings. Swiss never eliminates anyone."""
+        winner = self.index[get_entrant_ids(match.slots[winner_slot])[0]]
+        loser = self.index[get_entrant_ids(match.slots[1 - winner_slot])[0]]
+        match.winner = match.slots[winner_slot]
+        match.loser = match.slots[1 - winner_slot]
+        self.ready.pop(match.match_id, None)
+
+        self.opponents[winner].append(loser)
+        self.opponents[loser].append(winner)
+        self.buchholz[winner] += self.points[loser]
+        self.buchholz[loser] += self.points[winner]
+        self.add_points(winner, 1)
+
+        if not self.ready:
+            if self.round_num >= self.total_rounds:
+                self.complete = True
+            else:
+                self.pair_next_round()
+        return []
+
+    def standings(self):
+        """Get (entrant, points, buchholz) rows, best first"""
+        ranked = sorted(range(len(self.entrants)), key=self.rank_key)
+        return [(self.entrants[i], self.points[i], self.buchholz[i]) for i in ranked]
+
+    def placements(self):
+        """Get the final standings, best first"""
+        return [entrant for entrant, points, buchholz in self.standings()]
+
+class GroupStageBracket:
+    """Round robin group stage whose top entrants advance into a single elimination playoff.
+
+    Each round plays one circle method round in every group at the same time, so an
+    entrant has at most one open match and lookups stay O(1).
+    """
+    def __init__(self, entrants, groups=None, advance=2):
+        group_count = groups or max(1, len(entrants) // 4)
+        group_count = max(1, min(group_count, len(entrants) // 2))
+        self.advance = max(1, advance)
+
+        # Deal entrants into groups like cards so group sizes differ by at most one
+        self.groups = [entrants[i::group_count] for i in range(group_count)]
+        self.index = {}  # {user_id: (group_index, position)}
+        for g, group in enumerate(self.groups):
+            for position, entrant in enumerate(group):
+                for user_id in get_entrant_ids(entrant):
+                    self.index[user_id] = (g, position)
+
+        self.wins = [[0] * len(group) for group in self.groups]
+        self.played = [[0] * len(group) for group in self.groups]
+        self.schedules = [self.circle_schedule(len(group)) for group in self.groups]
+        self.total_rounds = max(len(schedule) for schedule in self.schedules)
+
+        self.round_num = 0
+        self.current = {}  # {(group_index, position): BracketMatch} for the current round
+        self.ready = {}  # {match_id: BracketMatch} unplayed matches of the current round
+        self.match_count = 0
+        self.eliminated = []
+        self.complete = False
+
+        self.start_next_round()
+
+    @staticmethod
+    def circle_schedule(size):
+        """Round robin pairings by the circle method: one position stays fixed, the rest rotate"""
+        positions = list(range(size))
+        if size % 2:
+            positions.append(None)
+        count = len(positions)
+
+        schedule = []
+        for _ in range(count - 1):
+            pairs = [(positions[i], positions[count - 1 - i]) for i in range(count // 2)]
+            schedule.append([pair for pair in pairs if None not in pair])
+            positions = [positions[0], positions[-1]] + positions[1:-1]
+        return schedule
+
+    def start_next_round(self):
+        """Open the next circle method round in every group that still has one"""
+        while not self.ready and self.round_num < self.total_rounds:
+            self.round_num += 1
+            self.current = {}
+            for g, schedule in enumerate(self.schedules):
+                if self.round_num > len(schedule):
+                    continue
+                for a, b in schedule[self.round_num - 1]:
+                    match = BracketMatch(self.match_count, f"Group {chr(65 + g)}")
+                    self.match_count += 1
+                    match.slots = [self.groups[g][a], self.groups[g][b]]
+                    self.current[(g, a)] = match
+                    self.current[(g, b)] = match
+                    self.ready[match.match_id] = match
+
+        if not self.ready:
+            self.complete = True
+
+    def match_for(self, user_id):
+        """Get the unplayed current round match of the entrant containing this user"""
+        match = self.current.get(self.index.get(user_id))
+        if match is None or match.winner is not None:
+            return None
+        return match
+
+    def ready_matches(self):
+        """Get all matches of the current round that still need a result"""
+        return list(self.ready.values())
+
+    def report(self, match, winner_slot):
+        """Record a result and update the group table. Nobody is eliminated during the group stage."""
+        g, winner = self.index[get_entrant_ids(match.slots[winner_slot])[0]]
+        loser = self.index[get_entrant_ids(match.slots[1 - winner_slot])[0]][1]
+        match.winner = match.slots[winner_slot]
+        match.loser = match.slots[1 - winner_slot]
+        self.ready.pop(match.match_id, None)
+
+        self.wins[g][winner] += 1
+        self.played[g][winner] += 1
+        self.played[g][loser] += 1
+
+        if not self.ready:
+            self.start_next_round()
+        return []
+
+    def group_standings(self, g):
+        """Get (entrant, wins, losses) rows of a group, best first"""
+        ranked = sorted(range(len(self.groups[g])), key=lambda i: (-self.wins[g][i], self.played[g][i] - self.wins[g][i], i))
+        return [(self.groups[g][i], self.wins[g][i], self.played[g][i] - self.wins[g][i]) for i in ranked]
+
+    def qualifiers(self):
+        """Get the entrants that advance, best seed first: every group winner, then every runner-up, ...
+
+        Seeded slots pair the top seeds with the lowest, so group winners meet runners-up of other groups.
+        """
+        seeds = []
+        for rank in range(self.advance):
+            for g in range(len(self.groups)):
+                group = self.group_standings(g)
+                if rank < len(group):
+                    seeds.append(group[rank][0])
+        return seeds
+
+    def placements(self):
+        """Get the group stage ranking across all groups, best first"""
+        rows = [row for g in range(len(self.groups)) for row in self.group_standings(g)]
+        return [entrant for entrant, wins, losses in sorted(rows, key=lambda row: (-row[1], row[2]))]
+
+BRACKET_FORMATS = {
+    "seeded": SingleEliminationBracket,
+    "double": DoubleEliminationBracket,
+    "swiss": SwissBracket,
+    "groups": GroupStageBracket
+}
+
 @bot.command()
-async def fake(ctx, number: int = 1):
+async def fake(ctx, number: int = 1, tournament_id: str = None):
     try:
         await ctx.message.delete()
     except:
@@ -1536,39 +3933,40 @@ async def fake(ctx, number: int = 1):
     if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
         return await ctx.send("❌ You don't have permission to add fake players.", delete_after=5)
 
-    tournament = get_tournament(ctx.guild.id)
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
 
     if number < 1 or number > 16:
         return await ctx.send("❌ Number must be between 1 and 16.", delete_after=5)
 
-    if tournament.max_players == 0:
-        return await ctx.send("❌ No tournament created yet.", delete_after=5)
+    if not tournament or tournament.max_players == 0:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
 
-    if tournament.active:
-        return await ctx.send("❌ Tournament already started.", delete_after=5)
+    async with tournament_lock(tournament, "fake"):
+        if tournament.active:
+            return await ctx.send("❌ Tournament already started.", delete_after=5)
 
-    available_spots = tournament.max_players - len(tournament.players)
+        available_spots = tournament.max_players - len(tournament.players)
 
-    if number > available_spots:
-        return await ctx.send(f"❌ Only {available_spots} spots available.", delete_after=5)
+        if number > available_spots:
+            return await ctx.send(f"❌ Only {available_spots} spots available.", delete_after=5)
 
-    # Create fake players as proper objects
-    fake_players = []
-    for i in range(number):
-        fake_name = f"FakePlayer{tournament.fake_count}"
-        fake_id = 761557952975420886 + tournament.fake_count
-        fake_player = FakePlayer(fake_name, fake_id)
-        fake_players.append(fake_player)
-        tournament.fake_count += 1
+        # Create fake players as proper objects
+        fake_players = []
+        for i in range(number):
+            fake_name = f"FakePlayer{tournament.fake_count}"
+            fake_id = 761557952975420886 + tournament.fake_count
+            fake_player = FakePlayer(fake_name, fake_id)
+            fake_players.append(fake_player)
+            tournament.fake_count += 1
 
-    tournament.players.extend(fake_players)
+        tournament.players.extend(fake_players)
 
     fake_list = ", ".join([f.display_name for f in fake_players])
     await ctx.send(f"🤖 Added {number} fake player{'s' if number > 1 else ''}: {fake_list}\nTotal players: {len(tournament.players)}/{tournament.max_players}", delete_after=10)
 
     await log_command(ctx.guild.id, ctx.author, "!fake", f"Added {number} fake players")
 @bot.command()
-async def code(ctx, code: str, member: discord.Member = None):
+async def code(ctx, code: str, member: Optional[discord.Member] = None, tournament_id: str = None):
     try:
         await ctx.message.delete()
     except Exception as e:
@@ -1578,7 +3976,10 @@ async def code(ctx, code: str, member: discord.Member = None):
     if not has_permission(ctx.author, ctx.guild.id, 'htr') and not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
         return await ctx.send("❌ You don't have permission to send codes.", delete_after=5)
 
-    tournament = get_tournament(ctx.guild.id)
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
+
+    if not tournament:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
 
     if not tournament.active:
         return await ctx.send("❌ No active tournament.", delete_after=5)
@@ -1590,7 +3991,11 @@ async def code(ctx, code: str, member: discord.Member = None):
         # Find the specific match the member is in and send code ONLY to that match
         target_match = None
 
-        if tournament.mode == "2v2":
+        if tournament.bracket:
+            bracket_match = tournament.bracket.match_for(member.id)
+            if bracket_match and bracket_match.wave == len(tournament.rounds):
+                target_match = tuple(bracket_match.slots)
+        elif tournament.mode == "2v2":
             # Find which match the member is in
             for match in current_round:
                 team_a, team_b = match
@@ -1640,32 +4045,43 @@ async def code(ctx, code: str, member: discord.Member = None):
     host_name = ctx.author.nick if ctx.author.nick else ctx.author.display_name
     code_message = f"🔐 **The room code is:** ```{code}```\n**Hosted by:** {host_name}"
 
-    sent_count = 0
-    failed_players = []
-
-    for player in match_players:
-        try:
-            await player.send(code_message)
-            sent_count += 1
-        except discord.Forbidden:
-            player_name = player.nick if player.nick else player.display_name
-            failed_players.append(player_name)
-        except Exception:
-            player_name = player.nick if player.nick else player.display_name
-            failed_players.append(player_name)
+    # Matches against real opponents get a no-show deadline, confirmed with a button on the code DM
+    deadline_matches = []
+    if tournament.forfeit_minutes:
+        find_match = round_match_finder(tournament)
+        candidates = [find_match(member.id)] if member else range(len(current_round))
+        deadline_matches = [
+            match_index for match_index in candidates
+            if match_index is not None and match_index not in tournament.match_winners
+            and not any(is_bot_entrant(side) for side in current_round[match_index])
+        ]
+
+    views = {}
+    if deadline_matches:
+        code_message += f"\n⏰ Press **I'm here** (or type `!here`) within {tournament.forfeit_minutes} minutes, players who don't confirm forfeit the match."
+        for player in match_players:
+            if find_match(player.id) in deadline_matches:
+                views[player] = MatchPresenceView(tournament)
+        for match_index in deadline_matches:
+            arm_match_deadline(tournament, match_index)
+
+    results = await fan_out_dms(list(match_players), code_message, views)
+    sent_count, latency_info, failed_players = summarize_dm_results(results)
 
     if member:
         target_info = f" to {member.display_name}'s match players only"
     else:
         target_info = " to all round players"
+    if deadline_matches:
+        target_info += f" (no-show deadline: {tournament.forfeit_minutes} min)"
 
     if failed_players:
-        await ctx.send(f"✅ Code sent to {sent_count} players{target_info} via DM!\n❌ Failed to send to: {', '.join(failed_players)}", delete_after=10)
+        await ctx.send(f"✅ Code sent to {sent_count} players{target_info} via DM!{latency_info}\n❌ Failed to send to: {', '.join(failed_players)}", delete_after=10)
     else:
-        await ctx.send(f"✅ Code sent to {sent_count} players{target_info} via DM!", delete_after=5)
+        await ctx.send(f"✅ Code sent to {sent_count} players{target_info} via DM!{latency_info}", delete_after=5)
 
 @bot.command()
-async def cancel(ctx):
+async def cancel(ctx, tournament_id: str = None):
     try:
         await ctx.message.delete()
     except:
@@ -1674,43 +4090,328 @@ async def cancel(ctx):
     if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
         return await ctx.send("❌ You don't have permission to cancel tournaments.", delete_after=5)
 
-    tournament = get_tournament(ctx.guild.id)
-    tournament.__init__()
-    await ctx.send("❌ Tournament cancelled.", delete_after=5)
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
+
+    if not tournament:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
+
+    async with tournament_lock(tournament, "cancel"):
+        cancelled_id = tournament.id
+        remove_tournament(tournament)
+    await ctx.send(f"❌ Tournament {cancelled_id} cancelled.", delete_after=5)
 
-    await log_command(ctx.guild.id, ctx.author, "!cancel", "Tournament cancelled")
+    await log_command(ctx.guild.id, ctx.author, "!cancel", f"Tournament {cancelled_id} cancelled")
 
 @bot.command()
-async def hosterregist(ctx, max_hosters: int):
+async def soloqueue(ctx, balance: str = "sp", tournament_id: str = None):
     try:
         await ctx.message.delete()
     except:
         pass
 
     if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
-        return await ctx.send("❌ You don't have permission to start hoster registration.", delete_after=5)
+        return await ctx.send("❌ You don't have permission to change the solo queue.", delete_after=5)
 
-    if max_hosters < 1 or max_hosters > 20:
-        return await ctx.send("❌ Maximum hosters must be between 1 and 20.", delete_after=5)
+    balance = balance.lower()
+    if balance not in ("sp", "rating", "off"):
+        return await ctx.send("❌ Usage: `!soloqueue <sp|rating|off> [id]`", delete_after=5)
+
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
+
+    if not tournament or tournament.max_players == 0:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
+
+    async with tournament_lock(tournament, "soloqueue"):
+        if tournament.mode != "2v2":
+            return await ctx.send("❌ The solo queue is only for 2v2 tournaments.", delete_after=5)
+        if tournament.active:
+            return await ctx.send("❌ Tournament already started.", delete_after=5)
+        if balance == "off" and tournament.solo_ids:
+            return await ctx.send(f"❌ {len(tournament.solo_ids)} players are registered through the solo queue, they need to unregister first.", delete_after=5)
+
+        tournament.solo_queue = None if balance == "off" else balance
+
+    if tournament.solo_queue:
+        await ctx.send(f"🎲 Solo queue open: players without a team can register and are teamed up by {'rating' if balance == 'rating' else 'SP'} at start.", delete_after=10)
+    else:
+        await ctx.send("🎲 Solo queue closed, only teams can register.", delete_after=10)
+
+    await log_command(ctx.guild.id, ctx.author, "!soloqueue", f"Tournament {tournament.id}, {balance}")
+
+@bot.command()
+async def deadline(ctx, minutes: int, tournament_id: str = None):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    if not has_permission(ctx.author, ctx.guild.id, 'htr') and not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to change the no-show deadline.", delete_after=5)
+
+    if not 0 <= minutes <= 60:
+        return await ctx.send("❌ The deadline must be between 0 (off) and 60 minutes.", delete_after=5)
+
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
+
+    if not tournament:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
+
+    # Applies to codes sent from now on, running deadlines keep their time
+    tournament.forfeit_minutes = minutes
+    if minutes:
+        await ctx.send(f"⏰ Players now have {minutes} minutes after a room code to confirm, or they forfeit.", delete_after=10)
+    else:
+        await ctx.send("⏰ No-show forfeits are off for this tournament.", delete_after=10)
+
+    await log_command(ctx.guild.id, ctx.author, "!deadline", f"Tournament {tournament.id}, {minutes} minutes")
+
+@bot.command()
+async def here(ctx, tournament_id: str = None):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
+
+    if not tournament:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
+
+    error = confirm_presence(tournament, ctx.author.id)
+    await ctx.send(error or f"✅ {ctx.author.display_name} is ready to play!", delete_after=5)
+
+@bot.command()
+async def checkin(ctx, minutes: int = CHECKIN_MINUTES, tournament_id: str = None):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to open check-in.", delete_after=5)
+
+    if minutes < 1 or minutes > 60:
+        return await ctx.send("❌ Check-in must last between 1 and 60 minutes.", delete_after=5)
+
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
+
+    if not tournament or tournament.max_players == 0:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
+
+    async with tournament_lock(tournament, "checkin"):
+        if tournament.active:
+            return await ctx.send("❌ Tournament already started.", delete_after=5)
+        if tournament.checkin_deadline:
+            return await ctx.send("❌ Check-in is already open.", delete_after=5)
+
+        # Registration closes and the registration message gets a check-in button
+        tournament.checkin_deadline = datetime.now() + timedelta(minutes=minutes)
+        tournament.checked_in = {player.id for player in tournament.players if isinstance(player, FakePlayer)}
+        view = TournamentView(tournament.id, checkin=True)
+        view.update_participant_count(tournament)
+        if tournament.message:
+            registration_editor.queue(tournament.message, view=view)
+            await registration_editor.flush(tournament.message)
+
+        players = [player for player in tournament.players if not isinstance(player, FakePlayer)]
+
+    # One reminder DM per registered player
+    channel_text = f" in {tournament.channel.mention}" if tournament.channel else ""
+    reminder = f"⏰ Check-in for **{tournament.title}** is open! Press **Check In** on the tournament message{channel_text} within {minutes} minutes or you will be removed."
+    results = await fan_out_dms(players, reminder)
+    failed = sum(1 for _, _, error in results if error is not None)
+
+    status = f"✅ Check-in open for {minutes} minutes. Reminded {len(players) - failed}/{len(players)} players."
+    if failed:
+        status += f" ({failed} couldn't be reached by DM)"
+    await ctx.send(status, delete_after=10)
+
+    await log_command(ctx.guild.id, ctx.author, "!checkin", f"Tournament {tournament.id}, {minutes} minutes, {len(players)} players")
+
+@bot.command(name="tournaments")
+async def list_tournaments(ctx):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
 
-    host_registrations['active'] = True
-    host_registrations['max_hosters'] = max_hosters
-    host_registrations['hosters'] = []
-    host_registrations['channel'] = ctx.channel
+    guild_list = get_guild_tournaments(ctx.guild.id)
 
     embed = discord.Embed(
-        title="🎯 Hoster Registration",
-        description="Here the hosters will register to host tournaments!",
-        color=0x00ff00
+        title="🏆 Tournaments",
+        color=0x3498db
+    )
+
+    if not guild_list:
+        embed.description = "No tournaments right now. Use `!create #channel` to create one."
+    else:
+        for tournament in guild_list[:ROUND_EMBED_FIELDS]:
+            if tournament.mode == "2v2":
+                count = f"{len(tournament.players) // 2}/{tournament.max_players} teams"
+            else:
+                count = f"{len(tournament.players)}/{tournament.max_players} players"
+            status = f"Round {len(tournament.rounds)}" if tournament.active else "Registration"
+            channel_text = tournament.channel.mention if tournament.channel else "-"
+            embed.add_field(
+                name=f"ID {tournament.id} • {tournament.title or 'Untitled'}",
+                value=f"{tournament.mode} {BRACKET_FORMAT_NAMES[tournament.format]} • {count}\n{status} • {channel_text}",
+                inline=False
+            )
+
+    await ctx.send(embed=embed, delete_after=30)
+
+@bot.command()
+async def lockstats(ctx):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to view lock stats.", delete_after=5)
+
+    guild_stats = lock_wait_stats.get(ctx.guild.id, {})
+
+    embed = discord.Embed(
+        title="🔒 Tournament Lock Waits",
+        description="How often tournament actions had to wait for another action to finish",
+        color=0x3498db
+    )
+
+    if not guild_stats:
+        embed.description = "No tournament actions recorded yet."
+    else:
+        for action, stats in sorted(guild_stats.items()):
+            average = stats['total_wait'] / stats['count']
+            embed.add_field(
+                name=action,
+                value=f"Calls: {stats['count']} • Waited: {stats['contended']}\nAvg: {average * 1000:.0f}ms • Max: {stats['max_wait'] * 1000:.0f}ms",
+                inline=True
+            )
+
+    await ctx.send(embed=embed, delete_after=30)
+
+@bot.command()
+async def dmstats(ctx):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to view DM stats.", delete_after=5)
+
+    stats = dm_service.stats
+    average = stats['total_latency'] / stats['delivered'] if stats['delivered'] else 0.0
+
+    embed = discord.Embed(
+        title="📨 DM Delivery",
+        description="Direct messages sent by the bot since it started",
+        color=0x3498db
+    )
+    embed.add_field(name="Queue", value=f"Waiting: {dm_service.depth()} • Peak: {stats['max_depth']}", inline=True)
+    embed.add_field(name="Latency", value=f"Avg: {average * 1000:.0f}ms • Max: {stats['max_latency'] * 1000:.0f}ms", inline=True)
+    embed.add_field(
+        name="Deliveries",
+        value=f"Sent: {stats['delivered']} • Failed: {stats['failed']} • Retries: {stats['retries']}\nDuplicates dropped: {stats['deduped']} • Skipped (DMs closed): {stats['skipped_closed']}",
+        inline=False
+    )
+
+    await ctx.send(embed=embed, delete_after=30)
+
+@bot.command()
+async def standings(ctx, tournament_id: str = None):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    tournament = get_tournament(ctx.guild.id, ctx.channel.id, tournament_id)
+
+    if not tournament:
+        return await ctx.send(tournament_not_found(ctx.guild.id), delete_after=5)
+
+    if not tournament.active:
+        return await ctx.send("❌ No active tournament.", delete_after=5)
+
+    if hasattr(tournament.bracket, 'group_standings'):
+        embed = discord.Embed(
+            title=f"📊 {tournament.title} - Group Standings",
+            description=f"Top {tournament.bracket.advance} of each group advance to the playoffs",
+            color=0x3498db
+        )
+
+        for g in range(min(len(tournament.bracket.groups), ROUND_EMBED_FIELDS)):
+            group_text = ""
+            for i, (entrant, wins, losses) in enumerate(tournament.bracket.group_standings(g), 1):
+                group_text += f"**{i}.** {get_entrant_display_name(ctx.guild.id, entrant)} - {wins}W {losses}L\n"
+            embed.add_field(name=f"Group {chr(65 + g)}", value=group_text[:1024], inline=True)
+
+        return await ctx.send(embed=embed, delete_after=30)
+
+    if not hasattr(tournament.bracket, 'standings'):
+        return await ctx.send("❌ Standings are only available for Swiss and group stage tournaments.", delete_after=5)
+
+    embed = discord.Embed(
+        title=f"📊 {tournament.title} - Standings",
+        description=f"After round {tournament.bracket.round_num - (0 if tournament.bracket.complete else 1)} of {tournament.bracket.total_rounds}",
+        color=0x3498db
     )
 
-    embed.add_field(name="Hosters registered:", value="None yet", inline=False)
-    embed.add_field(name="Slots:", value=f"0/{max_hosters}", inline=True)
+    standings_text = ""
+    for i, (entrant, points, buchholz) in enumerate(tournament.bracket.standings()[:10], 1):
+        standings_text += f"**{i}.** {get_entrant_display_name(ctx.guild.id, entrant)} - {points} pts (Buchholz {buchholz})\n"
+
+    embed.add_field(name="Top 10", value=standings_text or "No results yet", inline=False)
+    await ctx.send(embed=embed, delete_after=30)
+
+@bot.command()
+async def hosterregist(ctx, max_hosters: int, *, event: str = "default"):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to start hoster registration.", delete_after=5)
+
+    if max_hosters < 1 or max_hosters > 20:
+        return await ctx.send("❌ Maximum hosters must be between 1 and 20.", delete_after=5)
+
+    session = create_hoster_session(ctx.guild.id, event, max_hosters, ctx.channel.id)
 
     view = HosterRegistrationView()
-    host_registrations['message'] = await ctx.send(embed=embed, view=view)
+    message = await ctx.send(embed=build_hoster_embed(ctx.guild, session), view=view)
+    session['message_id'] = message.id
+    save_data()
+
+    await log_command(ctx.guild.id, ctx.author, "!hosterregist", f"Max hosters: {max_hosters}, Event: {event}")
+
+@bot.command()
+async def hosterclear(ctx, *, event: str = None):
+    """End hoster sessions so their hosters stop getting match assignments"""
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    if not has_permission(ctx.author, ctx.guild.id, 'tlr') and not ctx.author.guild_permissions.manage_channels:
+        return await ctx.send("❌ You don't have permission to clear hoster registrations.", delete_after=5)
+
+    guild_str = str(ctx.guild.id)
+    guild_sessions = prune_hoster_sessions(ctx.guild.id)
+    if event is not None and event not in guild_sessions:
+        return await ctx.send(f"❌ No hoster registration for `{event}`.", delete_after=5)
+
+    events = [event] if event is not None else list(guild_sessions)
+    for name in events:
+        del guild_sessions[name]
+    if not guild_sessions:
+        host_registrations.pop(guild_str, None)
+    save_data()
 
-    await log_command(ctx.guild.id, ctx.author, "!hosterregist", f"Max hosters: {max_hosters}")
+    await ctx.send(f"🗑️ Cleared {len(events)} hoster registration{'s' if len(events) != 1 else ''}.", delete_after=5)
+    await log_command(ctx.guild.id, ctx.author, "!hosterclear", f"Events: {', '.join(events) or 'none'}")
 
 @bot.command()
 async def bracketrole(ctx, member: discord.Member, emoji1: str, emoji2: str = "", emoji3: str = ""):
@@ -1765,10 +4466,10 @@ async def bracketname(ctx):
         color=0x3498db
     )
 
-    try:
-        await ctx.author.send(embed=embed)
+    _, error = await dm_service.send(ctx.author, embed=embed)
+    if error is None:
         await ctx.send("📨 Bracket name sent via DM!", delete_after=3)
-    except discord.Forbidden:
+    else:
         await ctx.send(embed=embed, delete_after=10)
 
 @bot.command()
@@ -1821,10 +4522,55 @@ async def sp(ctx, member: discord.Member = None):
         color=0xe74c3c
     )
 
-    try:
-        await ctx.author.send(embed=embed)
+    _, error = await dm_service.send(ctx.author, embed=embed)
+    if error is None:
         await ctx.send("📨 SP information sent via DM!", delete_after=3)
-    except discord.Forbidden:
+    else:
+        await ctx.send(embed=embed, delete_after=10)
+
+@bot.command()
+async def stats(ctx, member: discord.Member = None):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    if member is None:
+        member = ctx.author
+
+    player = player_stats.get(str(ctx.guild.id), {}).get(str(member.id))
+
+    embed = discord.Embed(
+        title="📈 Tournament Stats",
+        color=0xe74c3c
+    )
+
+    if not player:
+        embed.description = f"**Player:** {member.display_name}\nNo finished tournaments yet."
+    else:
+        win_rate = player['wins'] / player['matches'] * 100 if player['matches'] else 0
+        best = f"#{player['best_placement']}" if player['best_placement'] else "-"
+        embed.description = (
+            f"**Player:** {member.display_name}\n"
+            f"**Tournaments:** {player['tournaments']}\n"
+            f"**Matches:** {player['matches']} ({player['wins']}W - {player['matches'] - player['wins']}L, {win_rate:.0f}%)\n"
+            f"**Best placement:** {best}"
+        )
+
+        # Most played opponents
+        rivals = sorted(player['head_to_head'].items(), key=lambda item: sum(item[1]), reverse=True)[:5]
+        if rivals:
+            rivals_text = ""
+            for opponent_id, (wins, losses) in rivals:
+                opponent = ctx.guild.get_member(int(opponent_id))
+                opponent_name = opponent.display_name if opponent else "Unknown player"
+                rivals_text += f"{opponent_name}: {wins}W - {losses}L\n"
+            embed.add_field(name="⚔️ Head-to-Head", value=rivals_text, inline=False)
+
+    _, error = await dm_service.send(ctx.author, embed=embed)
+    if error is None:
+        await ctx.send("📨 Stats sent via DM!", delete_after=3)
+    else:
         await ctx.send(embed=embed, delete_after=10)
 
 @bot.command()
@@ -1858,6 +4604,69 @@ async def sp_lb(ctx):
 
     await ctx.send(embed=embed, delete_after=30)
 
+@bot.command()
+async def rating(ctx, member: discord.Member = None):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    if member is None:
+        member = ctx.author
+
+    guild_ratings = ratings.get(str(ctx.guild.id), {})
+    player_rating = guild_ratings.get(str(member.id), DEFAULT_RATING)
+    rank = sum(1 for other in guild_ratings.values() if other > player_rating) + 1
+
+    description = f"**Player:** {member.display_name}\n**Rating:** {player_rating:.0f}"
+    if str(member.id) in guild_ratings:
+        description += f"\n**Rank:** #{rank} of {len(guild_ratings)}"
+    else:
+        description += "\n*Unrated, play a tournament match to get ranked*"
+
+    embed = discord.Embed(
+        title="📊 Rating",
+        description=description,
+        color=0x9b59b6
+    )
+
+    _, error = await dm_service.send(ctx.author, embed=embed)
+    if error is None:
+        await ctx.send("📨 Rating information sent via DM!", delete_after=3)
+    else:
+        await ctx.send(embed=embed, delete_after=10)
+
+@bot.command()
+async def rating_lb(ctx):
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+
+    guild_str = str(ctx.guild.id)
+    guild_ratings = ratings.get(guild_str, {})
+
+    # Sort players by rating
+    sorted_players = sorted(guild_ratings.items(), key=lambda x: x[1], reverse=True)[:10]
+
+    embed = discord.Embed(
+        title="📊 Rating Leaderboard",
+        color=0x9b59b6
+    )
+
+    if not sorted_players:
+        embed.description = "No rated players yet!"
+    else:
+        leaderboard_text = ""
+        for i, (user_id, player_rating) in enumerate(sorted_players, 1):
+            user = ctx.guild.get_member(int(user_id))
+            if user:
+                leaderboard_text += f"**{i}.** {user.display_name} - {player_rating:.0f}\n"
+
+        embed.description = leaderboard_text
+
+    await ctx.send(embed=embed, delete_after=30)
+
 @bot.command()
 async def sp_rst(ctx):
     if not ctx.author.guild_permissions.manage_guild:
@@ -1887,7 +4696,6 @@ async def invite(ctx, member: discord.Member):
         return await ctx.send("❌ You cannot invite yourself!", delete_after=5)
 
     guild_id = ctx.guild.id
-    guild_str = str(guild_id)
 
     # Check if users are already in teams
     inviter_team = get_team_id(guild_id, ctx.author.id)
@@ -1899,19 +4707,10 @@ async def invite(ctx, member: discord.Member):
     if invitee_team:
         return await ctx.send("❌ That user is already in a team.", delete_after=5)
 
-    # Initialize invitation system for guild
-    if guild_str not in team_invitations:
-        team_invitations[guild_str] = {}
-
-    if str(member.id) not in team_invitations[guild_str]:
-        team_invitations[guild_str][str(member.id)] = []
-
-    # Check if invitation already exists
-    if ctx.author.id in team_invitations[guild_str][str(member.id)]:
-        return await ctx.send("❌ You have already sent a team invitation to this user.", delete_after=5)
-
     # Add invitation
-    team_invitations[guild_str][str(member.id)].append(ctx.author.id)
+    error = team_invitations.add(guild_id, ctx.author.id, member.id)
+    if error:
+        return await ctx.send(error, delete_after=5)
 
     # Send DM to invitee
     embed = discord.Embed(
@@ -1922,13 +4721,13 @@ async def invite(ctx, member: discord.Member):
 
     view = TeamInvitationView(ctx.author, member, ctx.guild.id)
 
-    try:
-        message = await member.send(embed=embed, view=view)
+    message, error = await dm_service.send(member, embed=embed, view=view)
+    if error is None:
         view.message = message  # Store message reference for timeout handling
         await ctx.send(f"✅ Team invitation sent to {member.display_name}!", delete_after=5)
-    except discord.Forbidden:
+    else:
         # Remove invitation if DM failed
-        team_invitations[guild_str][str(member.id)].remove(ctx.author.id)
+        team_invitations.remove(guild_id, ctx.author.id, member.id)
         await ctx.send(f"❌ Could not send DM to {member.display_name}. They may have DMs disabled.", delete_after=5)
 
 @bot.command()
@@ -1949,20 +4748,17 @@ async def leave_team(ctx):
     teammate = get_teammate(guild_id, ctx.author.id)
 
     # Check if team is registered in an active tournament
-    tournament = get_tournament(guild_id)
-    if tournament.active and tournament.mode == "2v2":
-        if any(member in tournament.players for member in team_members):
-            return await ctx.send("❌ Cannot leave team while registered in an active tournament.", delete_after=5)
+    for tournament in get_guild_tournaments(guild_id):
+        if tournament.active and tournament.mode == "2v2":
+            if any(member in tournament.players for member in team_members):
+                return await ctx.send("❌ Cannot leave team while registered in an active tournament.", delete_after=5)
 
     # Remove team
     remove_team(guild_id, team_id)
 
     # Notify teammate
     if teammate:
-        try:
-            await teammate.send(f"💔 {ctx.author.display_name} left your team. The team has been dissolved.")
-        except:
-            pass
+        dm_service.send(teammate, f"💔 {ctx.author.display_name} left your team. The team has been dissolved.")
 
     await ctx.send("✅ You left your team. The team has been dissolved.", delete_after=5)
 
@@ -1987,7 +4783,7 @@ async def commands2v2(ctx):
 
     embed.add_field(
         name="🏆 Tournament Notes",
-        value="• You must be in a team to register for 2v2 tournaments\n• When one teammate registers, the whole team is registered\n• Use `!code <code> @teammate` to send code to a specific match\n• Use `!winner @teammate` to declare your team as winners",
+        value="• You must be in a team to register for 2v2 tournaments, unless the host opened the solo queue\n• When one teammate registers, the whole team is registered\n• Use `!code <code> @teammate` to send code to a specific match\n• Use `!winner @teammate` to declare your team as winners",
         inline=False
     )
 
@@ -2022,7 +4818,7 @@ async def commands(ctx):
     if not has_htr and not has_tlr and not has_admin:
         embed.add_field(
             name="🤝 Available Commands",
-            value="`!invite @user` - Invite a user to be your teammate\n`!leave_team` - Leave your current team\n`!sp [@user]` - Check seasonal points\n`!sp_lb` - SP leaderboard\n`!bracketname` - Check your bracket name",
+            value="`!invite @user` - Invite a user to be your teammate\n`!leave_team` - Leave your current team\n`!here` - Confirm you're ready for your match\n`!sp [@user]` - Check seasonal points\n`!stats [@user]` - Tournament stats\n`!rating [@user]` - Check rating\n`!rating_lb` - Rating leaderboard\n`!sp_lb` - SP leaderboard\n`!bracketname` - Check your bracket name",
             inline=False
         )
     else:
@@ -2036,7 +4832,7 @@ async def commands(ctx):
 
         embed.add_field(
             name="🏷️ Personal Commands",
-            value="`!bracketname` - Check your bracket name\n`!sp [@user]` - Check seasonal points\n`!sp_lb` - SP leaderboard",
+            value="`!bracketname` - Check your bracket name\n`!here` - Confirm you're ready for your match\n`!sp [@user]` - Check seasonal points\n`!stats [@user]` - Tournament stats\n`!rating [@user]` - Check rating\n`!rating_lb` - Rating leaderboard\n`!sp_lb` - SP leaderboard",
             inline=False
         )
 
@@ -2044,7 +4840,7 @@ async def commands(ctx):
         if has_tlr:
             embed.add_field(
                 name="🏆 Tournament Commands (TLR)",
-                value="`!create #channel` - Create tournament (1v1/2v2)\n`!start` - Start tournament\n`!cancel` - Cancel tournament\n`!hosterregist <max>` - Start host registration\n`!fake <number>` - Add fake players",
+                value="`!create #channel [preset:<name>]` - Create tournament (1v1/2v2)\n`!preset <save|list|delete> [name]` - Saved tournament setups\n`!schedule <preset> #channel <minutes> <when>` - Open and start a preset on a schedule\n`!schedules` / `!unschedule <id>` - List or remove schedules\n`!checkin [minutes] [id]` - Open check-in\n`!soloqueue <sp|rating|off> [id]` - Let 2v2 solo players register\n`!start [id]` - Start tournament\n`!cancel [id]` - Cancel tournament\n`!tournaments` - List running tournaments\n`!lockstats` - Tournament lock contention\n`!dmstats` - DM queue and delivery stats\n`!hosterregist <max> [event]` - Start host registration\n`!hosterclear [event]` - End host registrations\n`!fake <number>` - Add fake players",
                 inline=False
             )
 
@@ -2052,7 +4848,7 @@ async def commands(ctx):
         if has_htr:
             embed.add_field(
                 name="🎯 Host Commands (HTR)",
-                value="`!winner @player` - Set match winner\n`!code <code> [@player]` - Send room code",
+                value="`!winner @player` - Set match winner\n`!winners [#id] @player1 @player2 ...` - Set several match winners\n`!importresults [#id] <list>` - Set winners from a pasted list\n`!undo [count]` - Undo the last results\n`!code <code> [@player]` - Send room code\n`!deadline <minutes> [id]` - No-show deadline after codes\n`!standings` - Swiss/group standings",
                 inline=False
             )
 
@@ -3336,6 +6132,7 @@ async def delete(ctx, amount: int):
     
 # Run the bot
 if __name__ == "__main__":
+    keep_alive()
     if not TOKEN:
         print("❌ No Discord token found! Please add your bot token to the environment variables.")
         print("Please set TOKEN environment variable with your bot token")
@@ -0,0 +1,362 @@
+"""Offline tournament simulation and benchmark.
+
+Drives full tournaments through registration, start and every !winner call without a
+Discord connection, and reports latency, allocations and API calls per operation.
+
+    python simulate.py --players 64 --mode 1v1 --format single --runs 5
+    python simulate.py --players 32 --mode 2v2 --format double --json bench.json
+    python simulate.py --players 64 --report menu
+    python simulate.py --players 7 --mode 2v2 --format groups:3:2
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+import main
+
+sim_ids = itertools.count(900000000000000000)
+
+
+class SimAPI:
+    """Counts the Discord API calls a simulated operation issues"""
+    def __init__(self):
+        self.calls = Counter()
+
+    def record(self, kind):
+        self.calls[kind] += 1
+
+    def total(self):
+        return sum(self.calls.values())
+
+
+class SimPermissions:
+    manage_channels = True
+    manage_messages = True
+    administrator = True
+
+
+class SimMessage:
+    def __init__(self, api, channel, content=None, embed=None, view=None):
+        self.api = api
+        self.id = next(sim_ids)
+        self.channel = channel
+        self.content = content
+        self.embeds = [embed] if embed else []
+        self.view = view
+
+    async def edit(self, **fields):
+        self.api.record("message.edit")
+        if 'embed' in fields:
+            self.embeds = [fields['embed']]
+        if 'view' in fields:
+            self.view = fields['view']
+        if 'content' in fields:
+            self.content = fields['content']
+        return self
+
+    async def delete(self):
+        self.api.record("message.delete")
+
+
+class SimChannel:
+    def __init__(self, api, guild):
+        self.api = api
+        self.id = next(sim_ids)
+        self.guild = guild
+        self.mention = f"<#{self.id}>"
+
+    async def send(self, content=None, embed=None, view=None, **kwargs):
+        self.api.record("channel.send")
+        return SimMessage(self.api, self, content, embed, view)
+
+
+class SimMember:
+    def __init__(self, api, guild, name):
+        self.api = api
+        self.id = next(sim_ids)
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.nick = None
+        self.mention = f"<@{self.id}>"
+        self.roles = []
+        self.bot = False
+        self.guild_permissions = SimPermissions()
+
+    async def send(self, content=None, **kwargs):
+        self.api.record("dm")
+
+    def __str__(self):
+        return self.name
+
+    def __eq__(self, other):
+        return getattr(other, 'id', None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class SimGuild:
+    def __init__(self):
+        self.id = next(sim_ids)
+        self.members = []
+
+    def get_member(self, user_id):
+        return next((member for member in self.members if member.id == user_id), None)
+
+    def get_member_named(self, name):
+        return next((member for member in self.members if member.name == name), None)
+
+
+class SimContext:
+    def __init__(self, api, guild, author, channel):
+        self.api = api
+        self.guild = guild
+        self.author = author
+        self.channel = channel
+        self.message = SimMessage(api, channel)
+
+    async def send(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+
+class SimResponse:
+    def __init__(self, api):
+        self.api = api
+        self.done = False
+
+    async def send_message(self, *args, **kwargs):
+        self.api.record("interaction.response")
+        self.done = True
+
+    async def edit_message(self, **kwargs):
+        self.api.record("interaction.response")
+        self.done = True
+
+    async def defer(self, **kwargs):
+        self.api.record("interaction.response")
+        self.done = True
+
+    def is_done(self):
+        return self.done
+
+
+class SimFollowup:
+    def __init__(self, api):
+        self.api = api
+
+    async def send(self, *args, **kwargs):
+        self.api.record("interaction.followup")
+
+
+class SimInteraction:
+    def __init__(self, api, guild, channel, user, message):
+        self.guild = guild
+        self.channel = channel
+        self.user = user
+        self.message = message
+        self.response = SimResponse(api)
+        self.followup = SimFollowup(api)
+
+
+class Benchmark:
+    """Collects latency, allocation and API call samples per operation"""
+    def __init__(self, api, trace_allocations):
+        self.api = api
+        self.trace_allocations = trace_allocations
+        self.samples = defaultdict(list)  # {operation: [(seconds, bytes, api_calls)]}
+
+    async def measure(self, operation, coro):
+        calls_before = self.api.total()
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        result = await coro
+        elapsed = time.perf_counter() - started
+        allocated = tracemalloc.get_traced_memory()[1] - memory_before if self.trace_allocations else 0
+        self.samples[operation].append((elapsed, allocated, self.api.total() - calls_before))
+        return result
+
+    def report(self):
+        rows = {}
+        for operation, samples in self.samples.items():
+            latencies = sorted(sample[0] * 1000 for sample in samples)
+            rows[operation] = {
+                'count': len(samples),
+                'mean_ms': statistics.fmean(latencies),
+                'p50_ms': latencies[len(latencies) // 2],
+                'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                'max_ms': latencies[-1],
+                'mean_alloc_kib': statistics.fmean(sample[1] for sample in samples) / 1024,
+                'api_calls': sum(sample[2] for sample in samples),
+            }
+        return rows
+
+
+async def flush_editors():
+    """Apply edits the message editors are still holding back"""
+    for editor in (main.round_editor, main.registration_editor):
+        for message, fields in list(editor.pending.values()):
+            await editor.flush(message)
+
+
+async def report_with_menu(bench, tournament, host, match_index, slot):
+    """Record a result the way a hoster does with the winner menu on the round message.
+
+    Returns False when no menu shows the match (single elimination rounds over 25 matches).
+    """
+    message, _ = main.get_match_message(tournament, match_index)
+    value = f"{match_index}:{slot}"
+    select = next((
+        item for item in (message.view.children if message else [])
+        if any(option.value == value for option in item.item.options)
+    ), None)
+    if select is None:
+        return False
+    select.item._values = [value]
+    interaction = SimInteraction(bench.api, host.guild, message.channel, host, message)
+    await bench.measure("menu", select.callback(interaction))
+    return True
+
+
+async def simulate_tournament(bench, players, mode, bracket_format, rng, report="command"):
+    """Run one tournament from registration to the final winner"""
+    api = bench.api
+    guild = SimGuild()
+    channel = SimChannel(api, guild)
+    host = SimMember(api, guild, "Host")
+    ctx = SimContext(api, guild, host, channel)
+
+    members = [SimMember(api, guild, f"Player{i + 1}") for i in range(players * (2 if mode == "2v2" else 1))]
+    guild.members = [host] + members
+    if mode == "2v2":
+        for i in range(0, len(members), 2):
+            main.create_team(guild.id, members[i], members[i + 1])
+
+    # Same setup the config modal does
+    tournament = main.create_tournament(guild.id, channel)
+    tournament.max_players = players
+    tournament.mode = mode
+    tournament.format, tournament.format_options = main.parse_bracket_format(bracket_format)
+    tournament.channel = channel
+    tournament.title = "Simulated Tournament"
+    tournament.map = "Block Dash"
+    tournament.abilities = "All"
+    tournament.prize = "SP"
+    view = main.TournamentView(tournament.id)
+    tournament.message = await channel.send(embed=None, view=view)
+
+    register = next(item for item in view.children if item.custom_id.split(':')[0] == "tournament_register")
+    registering = members[::2] if mode == "2v2" else members
+    for member in registering:
+        interaction = SimInteraction(api, guild, channel, member, tournament.message)
+        await bench.measure("register", register.callback(interaction))
+    await flush_editors()
+
+    await bench.measure("start", main.start.callback(ctx))
+
+    reports = 0
+    while tournament.active:
+        round_pairs = tournament.rounds[-1]
+        open_matches = [i for i in range(len(round_pairs)) if i not in tournament.match_winners]
+        rng.shuffle(open_matches)
+        for match_index in open_matches:
+            if not tournament.active or tournament.rounds[-1] is not round_pairs:
+                break
+            slot = rng.randrange(2)
+            if report != "menu" or not await report_with_menu(bench, tournament, host, match_index, slot):
+                winner = round_pairs[match_index][slot]
+                member = winner[0] if isinstance(winner, list) else winner
+                await bench.measure("winner", main.winner.callback(ctx, member))
+            reports += 1
+            if reports > players * 8:
+                raise RuntimeError(f"Tournament did not finish after {reports} results")
+    await flush_editors()
+
+    if mode == "2v2":
+        for team_id in list(main.teams.get(str(guild.id), {})):
+            main.remove_team(guild.id, team_id)
+    main.sp_data.pop(str(guild.id), None)
+    return reports
+
+
+async def run_benchmark(args):
+    api = SimAPI()
+    bench = Benchmark(api, not args.no_alloc)
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+
+    if bench.trace_allocations:
+        tracemalloc.start()
+    started = time.perf_counter()
+    reports = 0
+    for _ in range(args.runs):
+        reports += await simulate_tournament(bench, args.players, args.mode, args.format, rng, args.report)
+    wall_time = time.perf_counter() - started
+    if bench.trace_allocations:
+        tracemalloc.stop()
+
+    return {
+        'players': args.players,
+        'mode': args.mode,
+        'format': args.format,
+        'report': args.report,
+        'runs': args.runs,
+        'results_reported': reports,
+        'wall_time_s': wall_time,
+        'operations': bench.report(),
+        'api_calls': dict(api.calls),
+    }
+
+
+def print_report(result):
+    entrants = "teams" if result['mode'] == "2v2" else "players"
+    print(f"{result['runs']} x {result['players']} {entrants}, {result['mode']} {result['format']}: "
+          f"{result['results_reported']} results via {result['report']} in {result['wall_time_s']:.2f}s")
+    print(f"{'operation':<10}{'count':>7}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'KiB':>9}{'API':>7}")
+    for operation, row in result['operations'].items():
+        print(f"{operation:<10}{row['count']:>7}{row['mean_ms']:>10.3f}{row['p50_ms']:>9.3f}{row['p95_ms']:>9.3f}"
+              f"{row['max_ms']:>9.3f}{row['mean_alloc_kib']:>9.1f}{row['api_calls']:>7}")
+    print("API calls: " + ", ".join(f"{kind} {count}" for kind, count in sorted(result['api_calls'].items())))
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="Simulate tournaments offline and benchmark the bracket hot path")
+    parser.add_argument("--players", type=int, default=64, help="Entrants per tournament (teams in 2v2)")
+    parser.add_argument("--mode", choices=["1v1", "2v2"], default="1v1")
+    parser.add_argument("--format", default="single", help="Bracket format, as typed in the tournament setup")
+    parser.add_argument("--report", choices=["command", "menu"], default="command", help="Record results with !winner or the round message menus")
+    parser.add_argument("--runs", type=int, default=3, help="Tournaments to simulate")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-alloc", action="store_true", help="Skip allocation tracing (faster, more accurate latency)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    if main.parse_bracket_format(args.format)[0] is None:
+        parser.error(f"unknown bracket format: {args.format}")
+    if args.players < 2:
+        parser.error("--players must be at least 2")
+
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    # SP awards are saved to user_data.json, keep the real one untouched
+    os.chdir(tempfile.mkdtemp(prefix="tournament-sim-"))
+    result = asyncio.run(run_benchmark(args))
+
+    print_report(result)
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    cli()